@@ -0,0 +1,689 @@
+#!/usr/bin/env python3
+
+"""
+Motor de generación de audio por lotes para los scripts generate-audio-*.py
+
+Lee las frases de fuentes estructuradas en lugar de la lista fija de cada
+script:
+    - Contenido del curso (ADE1_2026_content.json): títulos, textos y
+      tablas de cada diapositiva, solo la parte en español (las notas del
+      profesor no se leen en clase y se omiten)
+    - Diccionario (public/dictionaries/spanish_freq.json): una palabra por entrada
+    - Manifest: JSON (lista de textos o de {"text", "filename", "description"},
+      o {"phrases": [...]}) o .txt con una frase por línea
+
+Elimina textos repetidos (un clip por texto; los demás nombres pedidos
+para el mismo texto se copian), omite los clips que ya están en disco con
+el mismo hash de contenido (texto + backend + parámetros, guardado en
+.audio_index/ en la raíz del repo, un índice por directorio de salida:
+fuera de public/, que la app sirve) y genera el resto en una sola
+pasada, guardando el índice cada pocos clips para poder reanudar.
+
+Modo concurrente (--workers N): N frases a la vez; cada backend remoto
+pasa por un BackendLimiter (máximo de peticiones simultáneas + token
+bucket de peticiones por segundo) y sus fallos se reintentan con backoff
+exponencial con jitter. race() lanza varios backends para la misma frase
+y se queda con el primero que termina bien.
+
+Caché (audio_cache.py, --cache-dir): los clips generados se guardan por
+hash de contenido en una caché persistente compartida por todos los
+backends y directorios de salida; un clip que ya está en ella se enlaza
+en lugar de sintetizarse.
+
+Uso desde los scripts:
+    python3 generate-audio-gtts.py --source ADE1_2026_content.json
+    python3 generate-simple-audio.py --source public/dictionaries/spanish_freq.json --limit 1000
+"""
+
+import os
+import re
+import json
+import time
+import random
+import hashlib
+import threading
+import unicodedata
+import importlib.util
+from pathlib import Path
+from functools import lru_cache
+from contextlib import contextmanager
+from concurrent.futures import ThreadPoolExecutor, as_completed
+
+from audio_cache import DEFAULT_CACHE_DIR, DEFAULT_MAX_MB, AudioCache, link_or_copy
+
+# Módulos sin dependencias de scripts/dictionary, cargados por ruta
+DICTIONARY_SCRIPTS_DIR = Path(__file__).parent / 'scripts' / 'dictionary'
+
+def _load_dictionary_script(name):
+    """Carga scripts/dictionary/<name>.py (no es un paquete importable desde aquí)"""
+    spec = importlib.util.spec_from_file_location(name, DICTIONARY_SCRIPTS_DIR / f'{name}.py')
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+# El mismo limitador que el traductor (scripts/dictionary/rate_limit.py)
+TokenBucket = _load_dictionary_script('rate_limit').TokenBucket
+
+DEFAULT_OUTPUT_DIR = Path('./public/audio/ai')
+
+# Sílabas pinyin (scripts/dictionary/pinyin_tones.py) y palabras españolas
+# frecuentes, para descartar pinyin suelto de las diapositivas: las 1000 de
+# spanish_freq.json y las acentuadas de es_50k (menú, papá, té...)
+SPANISH_WORDS_PATH = Path(__file__).parent / 'public' / 'dictionaries' / 'spanish_freq.json'
+SPANISH_FREQUENCIES_PATH = Path(__file__).parent / 'data' / 'es_50k.txt'
+# Índices nombre de archivo -> clave de contenido, uno por directorio de salida
+INDEX_DIR = Path(__file__).parent / '.audio_index'
+# Nombre anterior, dentro del directorio de salida (se migra al guardar)
+LEGACY_INDEX_NAME = '.audio_index.json'
+
+# Clips generados entre escrituras del índice
+CHECKPOINT_EVERY = 25
+
+# Límites por backend en modo concurrente
+BACKEND_CONCURRENCY = 2
+BACKEND_RATE = 1.0  # peticiones por segundo
+RETRY_ATTEMPTS = 3
+RETRY_BASE_DELAY = 0.5  # segundos, se duplica en cada intento
+RETRY_MAX_DELAY = 8.0
+
+# Ideogramas, puntuación y formas de ancho completo CJK
+_CJK = re.compile(r'[\u2e80-\u9fff\uf900-\ufaff\uff00-\uffef\u3000-\u303f]+')
+_CJK_PUNCTUATION = re.compile(r'[\u3000-\u303f\uff01-\uff0f\uff1a-\uff20\uff3b-\uff40\uff5b-\uff65]')
+_LATIN_LETTER = re.compile(r'[A-Za-z\u00c0-\u00ff]')
+# Marcas de tono del pinyin (NFD): grave, aguda, macrón y caron
+_TONE_MARKS = {'\u0300', '\u0301', '\u0304', '\u030c'}
+# Palabra pinyin sin marcas: sílabas, números de tono y apóstrofo (xi'an)
+_PINYIN_WORD = re.compile(r"[a-zü1-5']+")
+_MAX_SYLLABLE_LENGTH = 6
+_LINE_BREAKS = re.compile(r'[\n\v\r]+')
+_SPACES = re.compile(r'\s+')
+_NON_SLUG = re.compile(r'[^a-z0-9]+')
+
+# Signos que sobran al principio/final de un fragmento de diapositiva
+_EDGE_MARKS = ' -–→:;,=|•'
+
+# Signos que separan un fragmento del chino que tiene al lado ("casa → 房子")
+_BOUNDARY_MARKS = '.,;:!?¡¿()[]/|=-–→•*"“”'
+
+def normalize_text(text):
+    """Espacios colapsados y sin espacios en los extremos"""
+    return _SPACES.sub(' ', text or '').strip()
+
+@lru_cache(maxsize=1)
+def _pinyin_syllables():
+    return frozenset(_load_dictionary_script('pinyin_tones').PINYIN_SYLLABLES)
+
+def strip_tones(word):
+    """'rén' -> 'ren', 'lǜ' -> 'lü' (la diéresis no es un tono)"""
+    decomposed = unicodedata.normalize('NFD', word)
+    return unicodedata.normalize('NFC', ''.join(c for c in decomposed if c not in _TONE_MARKS))
+
+@lru_cache(maxsize=1)
+def _spanish_words():
+    words = set()
+    if SPANISH_WORDS_PATH.exists():
+        with open(SPANISH_WORDS_PATH, 'r', encoding='utf-8') as f:
+            entries = json.load(f).get('entries', [])
+        words.update(entry['spanish'].lower() for entry in entries if entry.get('spanish'))
+    if SPANISH_FREQUENCIES_PATH.exists():
+        # Sin acentos hay ruido (zi, ren); con acento solo palabras españolas
+        frequencies = _load_dictionary_script('spanish_text').load_frequencies(SPANISH_FREQUENCIES_PATH)
+        words.update(word for word, _ in frequencies if strip_tones(word) != word)
+    return frozenset(words)
+
+def pinyin_syllable_count(word):
+    """
+    Nº de sílabas pinyin en que se parte una palabra sin marcas de tono
+    ('pengyou' -> 2, 'ni3hao3' -> 2); 0 si no es pinyin ('hsk1', 'casas')
+    """
+    syllables = _pinyin_syllables()
+    word = word.replace("'", '')
+    # fewest[i]: mínimo de sílabas para word[:i]
+    fewest = [0] + [None] * len(word)
+    for start in range(len(word)):
+        if fewest[start] is None:
+            continue
+        for end in range(start + 1, min(len(word), start + _MAX_SYLLABLE_LENGTH) + 1):
+            if word[start:end] not in syllables:
+                continue
+            # Número de tono opcional tras la sílaba
+            for stop in (end, end + 1) if end < len(word) and word[end] in '12345' else (end,):
+                if fewest[stop] is None or fewest[stop] > fewest[start] + 1:
+                    fewest[stop] = fewest[start] + 1
+    return fewest[-1] or 0
+
+def is_pinyin(segment):
+    """
+    True si el fragmento parece pinyin y no español
+
+    Todas sus palabras, sin marcas de tono, deben partirse en sílabas
+    pinyin (rén, péngyou, ni3 hao3, zi) y ninguna ser una palabra española
+    conocida (yo, de, menú, té se conservan). Sin marcas ni números solo
+    cuentan las sílabas sueltas: 'casa' (ca+sa) es español.
+    """
+    words = [word.strip(_BOUNDARY_MARKS) for word in segment.lower().split()]
+    words = [word for word in words if word]
+    bare = [strip_tones(word) for word in words]
+    # Palabras de una letra: español (a, e, o, y); el pinyin 'a' suelto ya
+    # lo descarta spanish_segments por tener menos de dos letras
+    if not words or not all(_PINYIN_WORD.fullmatch(word) and len(word) > 1 for word in bare):
+        return False
+    for word, syllables in zip(words, map(pinyin_syllable_count, bare)):
+        if not syllables:
+            return False
+        tones = sum(1 for char in unicodedata.normalize('NFD', word)
+                    if char in _TONE_MARKS or char.isdigit())
+        # Sin marcas solo sílabas sueltas ('casa' = ca+sa es español); con
+        # marcas, una por sílaba salvo la átona final ('péngyou'): el español
+        # lleva una sola tilde ('fonética' = fo+ne+ti+ca)
+        if (not tones and syllables > 1) or (tones and tones < syllables - 1):
+            return False
+    spanish = _spanish_words()
+    return not any(word in spanish for word in words)
+
+def _line_segments(line):
+    """
+    Parte una línea por los caracteres chinos
+
+    El chino en un extremo o junto a un signo ("casa → 房子", "yo: 我") solo
+    separa fragmentos. Entre dos palabras españolas ("Un 杯 de leche.") al
+    quitarlo quedaría una frase incompleta: ese fragmento se descarta.
+    """
+    pieces = _CJK.split(line)
+    runs = _CJK.findall(line)
+    segments = []
+    current, broken = pieces[0], False
+    for run, piece in zip(runs, pieces[1:]):
+        left, right = current.rstrip(), piece.lstrip()
+        if (not _LATIN_LETTER.search(left) or not _LATIN_LETTER.search(right) or
+                _CJK_PUNCTUATION.search(run) or
+                left[-1] in _BOUNDARY_MARKS or right[0] in _BOUNDARY_MARKS):
+            segments.append((current, broken))
+            current, broken = piece, False
+        else:
+            current, broken = f'{left} {right}', True
+    segments.append((current, broken))
+    return [normalize_text(segment).strip(_EDGE_MARKS) for segment, broken in segments if not broken]
+
+def spanish_segments(text):
+    """
+    Fragmentos en español de un texto mixto español/chino
+
+    Parte por líneas y por los caracteres chinos (_line_segments) y
+    descarta lo que no tenga al menos dos letras latinas (flechas,
+    números, letras sueltas) y el pinyin (is_pinyin).
+    """
+    segments = []
+    for line in _LINE_BREAKS.split(text or ''):
+        for segment in _line_segments(line):
+            if len(_LATIN_LETTER.findall(segment)) >= 2 and not is_pinyin(segment):
+                segments.append(segment)
+    return segments
+
+def slugify(text, max_length=40):
+    """'¿Cómo está usted?' -> 'como-esta-usted'"""
+    ascii_text = unicodedata.normalize('NFKD', text).encode('ascii', 'ignore').decode('ascii')
+    return _NON_SLUG.sub('-', ascii_text.lower()).strip('-')[:max_length].rstrip('-')
+
+def clip_filename(text, suffix='.mp3'):
+    """Nombre estable y único por texto: <slug>-<hash>.mp3"""
+    digest = hashlib.sha1(text.encode('utf-8')).hexdigest()[:8]
+    return f"{slugify(text) or 'clip'}-{digest}{suffix}"
+
+def make_phrase(text, filename=None, description=None):
+    text = normalize_text(text)
+    return {
+        'text': text,
+        'filename': filename or clip_filename(text),
+        'description': description or text
+    }
+
+def _rich_text(value):
+    # El contenido de una forma puede ser texto o lista de párrafos {"text": ...}
+    if isinstance(value, list):
+        return '\n'.join(_rich_text(part.get('text') if isinstance(part, dict) else part)
+                         for part in value)
+    return value if isinstance(value, str) else ''
+
+def phrases_from_course(data):
+    """Frases en español de las diapositivas (títulos, textos y tablas, sin notas)"""
+    phrases = []
+    for slide in data.get('slides', []):
+        texts = [_rich_text(slide.get('title'))]
+        texts += [_rich_text(item.get('content')) for item in slide.get('content', [])]
+        for table in slide.get('tables', []):
+            texts += [_rich_text(cell) for row in table.get('data', []) for cell in row]
+
+        description = f"Diapositiva {slide.get('slide_number')}"
+        for text in texts:
+            phrases += [make_phrase(segment, description=description)
+                        for segment in spanish_segments(text)]
+    return phrases
+
+def _dictionary_word(entry):
+    if entry.get('spanish'):
+        return entry['spanish']
+    definitions = entry.get('d') or entry.get('definitions_es') or []
+    if not definitions or not isinstance(definitions[0], str):
+        return ''
+    # Primera definición sin notas (fig.) ni acepciones adicionales
+    first = re.sub(r'^\s*\([^)]*\)\s*', '', definitions[0])
+    return re.split(r'[,;/(]', first)[0]
+
+def phrases_from_dictionary(data):
+    """Una frase por entrada: la palabra española (o su primera definición)"""
+    phrases = []
+    for entry in data.get('entries', []):
+        word = normalize_text(_dictionary_word(entry))
+        if word:
+            chinese = entry.get('s') or entry.get('simplified') or ''
+            phrases.append(make_phrase(word, description=f'{word} ({chinese})' if chinese else word))
+    return phrases
+
+def phrases_from_manifest(items):
+    """Lista de textos o de {"text", "filename", "description"}"""
+    phrases = []
+    for item in items:
+        if isinstance(item, str):
+            phrases.append(make_phrase(item))
+        elif item.get('text'):
+            phrases.append(make_phrase(item['text'], item.get('filename'), item.get('description')))
+    return phrases
+
+def load_phrases(source, limit=None):
+    """Detecta el tipo de fuente (curso, diccionario, manifest) y devuelve sus frases"""
+    path = Path(source)
+    if path.suffix == '.txt':
+        with open(path, 'r', encoding='utf-8') as f:
+            phrases = phrases_from_manifest([line for line in f if line.strip()])
+    else:
+        with open(path, 'r', encoding='utf-8') as f:
+            data = json.load(f)
+        if isinstance(data, list):
+            phrases = phrases_from_manifest(data)
+        elif 'slides' in data:
+            phrases = phrases_from_course(data)
+        elif 'entries' in data:
+            phrases = phrases_from_dictionary(data)
+        elif 'phrases' in data:
+            phrases = phrases_from_manifest(data['phrases'])
+        else:
+            raise ValueError(f'{source}: formato no reconocido (se esperaba slides, entries o phrases)')
+    return phrases[:limit] if limit else phrases
+
+def dedupe_phrases(phrases):
+    """
+    Un clip por texto; otros nombres pedidos para el mismo texto van en 'aliases'
+
+    Returns:
+        Frases únicas (en orden de primera aparición)
+    """
+    unique = {}
+    for phrase in phrases:
+        first = unique.get(phrase['text'])
+        if first is None:
+            unique[phrase['text']] = {**phrase, 'aliases': []}
+        elif phrase['filename'] != first['filename'] and phrase['filename'] not in first['aliases']:
+            first['aliases'].append(phrase['filename'])
+    return list(unique.values())
+
+def clip_key(phrase, backend, params):
+    """Hash del contenido de un clip: texto + backend + parámetros de voz"""
+    payload = json.dumps([backend, params, phrase['text'], phrase.get('params')],
+                         ensure_ascii=False, sort_keys=True)
+    return hashlib.sha256(payload.encode('utf-8')).hexdigest()[:16]
+
+def clip_keys(phrase, backend, params):
+    """
+    Clave de contenido por backend posible, en orden de preferencia
+
+    backend puede ser un nombre o una lista de nombres (el clip lo genera
+    el que gane, p. ej. VoiceRSS o ttsMP3); con lista, params tiene los
+    parámetros de cada uno: {'voicerss': 'es-es', 'ttsmp3': 'Lucia'}.
+    """
+    if isinstance(backend, str):
+        return {backend: clip_key(phrase, backend, params)}
+    return {name: clip_key(phrase, name, params.get(name)) for name in backend}
+
+def index_path(output_dir):
+    """INDEX_DIR/<directorio>-<hash de su ruta absoluta>.json"""
+    resolved = Path(output_dir).resolve()
+    digest = hashlib.sha1(str(resolved).encode('utf-8')).hexdigest()[:8]
+    return INDEX_DIR / f"{slugify(resolved.name) or 'audio'}-{digest}.json"
+
+def load_index(output_dir):
+    path = index_path(output_dir)
+    if not path.exists():
+        path = Path(output_dir) / LEGACY_INDEX_NAME
+        if not path.exists():
+            return {}
+    with open(path, 'r', encoding='utf-8') as f:
+        return json.load(f)
+
+def save_index(output_dir, index):
+    path = index_path(output_dir)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    temp_path = path.with_name(path.name + '.tmp')
+    with open(temp_path, 'w', encoding='utf-8') as f:
+        json.dump(index, f, ensure_ascii=False, indent=1, sort_keys=True)
+    temp_path.replace(path)
+    (Path(output_dir) / LEGACY_INDEX_NAME).unlink(missing_ok=True)
+
+def output_name(filename, suffix):
+    """Nombre de archivo con la extensión real del backend"""
+    return str(Path(filename).with_suffix(suffix)) if suffix else filename
+
+def plan_batch(phrases, backend, params, output_dir, suffix=None, force=False):
+    """
+    Separa las frases únicas en pendientes y ya generadas
+
+    Returns:
+        (pendientes, omitidas, índice actual)
+    """
+    index = load_index(output_dir)
+    pending, skipped = [], []
+    for phrase in dedupe_phrases(phrases):
+        keys = clip_keys(phrase, backend, params)
+        filename = output_name(phrase['filename'], suffix)
+        # Ya generado por cualquiera de los backends posibles
+        current = index.get(filename)
+        matched = current if current in keys.values() else None
+        phrase = {**phrase,
+                  'filename': filename,
+                  'aliases': [output_name(alias, suffix) for alias in phrase['aliases']],
+                  'keys': keys,
+                  'key': matched or next(iter(keys.values()))}
+        done = not force and matched is not None and (Path(output_dir) / filename).exists()
+        (skipped if done else pending).append(phrase)
+    return pending, skipped, index
+
+def _publish_aliases(phrase, output_dir, index, refresh=False):
+    """Enlaza el clip en sus alias (refresh: también los que ya tenían la clave, tras regenerarlo)"""
+    source = Path(output_dir) / phrase['filename']
+    for alias in phrase['aliases']:
+        target = Path(output_dir) / alias
+        if refresh or index.get(alias) != phrase['key'] or not target.exists():
+            link_or_copy(source, target)
+            index[alias] = phrase['key']
+
+class BackendLimiter:
+    """Máximo de peticiones simultáneas y por segundo a un backend"""
+
+    def __init__(self, name, concurrency=BACKEND_CONCURRENCY, rate=BACKEND_RATE, burst=None):
+        self.name = name
+        self._slots = threading.BoundedSemaphore(concurrency)
+        self._bucket = TokenBucket(rate, burst) if rate else None
+
+    @contextmanager
+    def slot(self):
+        with self._slots:
+            if self._bucket:
+                self._bucket.acquire()
+            yield
+
+def backoff_delay(attempt, base_delay=RETRY_BASE_DELAY, max_delay=RETRY_MAX_DELAY):
+    """Backoff exponencial con jitter completo: uniforme en [0, base * 2^intento]"""
+    return random.uniform(0, min(max_delay, base_delay * 2 ** attempt))
+
+def call_with_retries(func, *args, limiter=None, attempts=RETRY_ATTEMPTS,
+                      base_delay=RETRY_BASE_DELAY, max_delay=RETRY_MAX_DELAY, stop=None):
+    """
+    Llama func(*args) -> bool hasta `attempts` veces
+
+    Cada intento pasa por el limiter (si hay); una excepción cuenta como fallo.
+    Con stop (threading.Event, p. ej. el de race) no se reintenta una vez activado.
+    """
+    for attempt in range(attempts):
+        if stop is not None and stop.is_set():
+            return False
+        try:
+            if limiter:
+                with limiter.slot():
+                    ok = func(*args)
+            else:
+                ok = func(*args)
+        except Exception as error:
+            print(f'   ⚠️  {getattr(limiter, "name", "backend")}: {error}')
+            ok = False
+        if ok:
+            return True
+        if attempt < attempts - 1:
+            time.sleep(backoff_delay(attempt, base_delay, max_delay))
+    return False
+
+def race(candidates, output_path, hedge_delay=0, stop=None):
+    """
+    Lanza varios backends para el mismo clip y se queda con el primero que acierta
+
+    Args:
+        candidates: Lista de (nombre, func(temp_path) -> bool); cada uno
+            escribe en su propio archivo temporal
+        hedge_delay: Segundos antes de lanzar cada candidato siguiente si los
+            anteriores siguen en curso (0 = todos a la vez); si fallan, el
+            siguiente arranca en el acto
+        stop: threading.Event que se activa al haber ganador, para que los
+            demás dejen de reintentar (ver call_with_retries)
+
+    Returns:
+        Nombre del backend ganador o None si fallan todos
+    """
+    output_path = Path(output_path)
+    condition = threading.Condition()
+    state = {'winner': None, 'failed': 0, 'finished': 0}
+
+    def attempt(position, name, func):
+        if position and hedge_delay:
+            deadline = time.monotonic() + position * hedge_delay
+            with condition:
+                while state['winner'] is None and state['failed'] < position:
+                    remaining = deadline - time.monotonic()
+                    if remaining <= 0:
+                        break
+                    condition.wait(remaining)
+        temp_path = output_path.with_name(f'{output_path.name}.{name}.tmp')
+        ok = False
+        if state['winner'] is None:
+            try:
+                ok = func(temp_path)
+            except Exception as error:
+                print(f'   ⚠️  {name}: {error}')
+        with condition:
+            if ok and state['winner'] is None:
+                os.replace(temp_path, output_path)
+                state['winner'] = name
+                if stop is not None:
+                    stop.set()
+            elif not ok:
+                state['failed'] += 1
+            state['finished'] += 1
+            condition.notify_all()
+        if temp_path.exists():
+            temp_path.unlink()
+
+    # Sin esperar a los perdedores: terminan en segundo plano y borran su temporal
+    pool = ThreadPoolExecutor(len(candidates))
+    for position, (name, func) in enumerate(candidates):
+        pool.submit(attempt, position, name, func)
+    pool.shutdown(wait=False)
+    with condition:
+        while state['winner'] is None and state['finished'] < len(candidates):
+            condition.wait()
+        return state['winner']
+
+def _detach(path):
+    """Quita un destino enlazado (caché/alias) para que el backend no escriba en el clip compartido"""
+    if path.exists() and path.stat().st_nlink > 1:
+        path.unlink()
+
+def _record_result(phrase, result, output_dir, index, stats, cache=None):
+    if not result:
+        stats['failed'].append(phrase['filename'])
+        return False
+    if isinstance(result, str):
+        # Nombre del backend que generó el clip: su clave, no la del preferido
+        phrase['key'] = phrase['keys'][result]
+    index[phrase['filename']] = phrase['key']
+    if cache is not None:
+        cache.put(phrase['key'], output_dir / phrase['filename'])
+    _publish_aliases(phrase, output_dir, index, refresh=True)
+    stats['generated'] += 1
+    return True
+
+def run_batch(phrases, synthesize, backend, params=None, output_dir=DEFAULT_OUTPUT_DIR,
+              suffix=None, force=False, delay=0, workers=1, cache=None):
+    """
+    Genera los clips que faltan
+
+    Args:
+        synthesize: synthesize(phrase, output_path) -> bool, escribe el clip;
+            con varios backends devuelve el nombre del que lo generó (o None)
+        backend: Nombre del backend (parte del hash de contenido) o lista de
+            backends posibles, en orden de preferencia (ver clip_keys)
+        params: Parámetros de voz del backend (idioma, voz, velocidad...);
+            con lista de backends, {nombre: parámetros}
+        suffix: Extensión real de los archivos ('.wav'...), None = la del nombre
+        force: Regenerar aunque el clip ya exista con el mismo hash
+        delay: Segundos de espera entre clips generados (solo con workers=1;
+            en modo concurrente los límites van en los BackendLimiter)
+        workers: Frases generadas a la vez
+        cache: AudioCache de donde enlazar los clips ya sintetizados y
+            donde guardar los nuevos (None = sin caché)
+
+    Returns:
+        Dict con 'total', 'unique', 'skipped', 'cached', 'generated',
+        'failed' (nombres de archivo) y 'seconds'
+    """
+    output_dir = Path(output_dir)
+    output_dir.mkdir(parents=True, exist_ok=True)
+    start = time.perf_counter()
+
+    pending, skipped, index = plan_batch(phrases, backend, params or {}, output_dir, suffix, force)
+    stats = {'total': len(phrases), 'unique': len(pending) + len(skipped),
+             'skipped': len(skipped), 'cached': 0, 'generated': 0, 'failed': []}
+    if skipped:
+        print(f'⏭️  {len(skipped)} clips ya generados (mismo texto, backend y voz): se omiten')
+
+    if cache is not None:
+        # Los ya generados alimentan la caché; los pendientes que estén en ella no se sintetizan
+        for phrase in skipped:
+            if phrase['key'] not in cache:
+                cache.put(phrase['key'], output_dir / phrase['filename'])
+        if not force:
+            to_synthesize = []
+            for phrase in pending:
+                key = next((key for key in phrase['keys'].values()
+                            if cache.fetch(key, output_dir / phrase['filename'])), None)
+                if key:
+                    phrase['key'] = key
+                    index[phrase['filename']] = key
+                    _publish_aliases(phrase, output_dir, index)
+                    stats['cached'] += 1
+                else:
+                    to_synthesize.append(phrase)
+            pending = to_synthesize
+            if stats['cached']:
+                print(f"♻️  {stats['cached']} clips enlazados desde la caché {cache.path}")
+    for phrase in pending:
+        _detach(output_dir / phrase['filename'])
+
+    since_checkpoint = 0
+    pool = None
+    try:
+        if workers > 1 and len(pending) > 1:
+            # Los resultados se registran en este hilo: el índice no necesita lock
+            pool = ThreadPoolExecutor(workers)
+            futures = {pool.submit(synthesize, phrase, output_dir / phrase['filename']): phrase
+                       for phrase in pending}
+            for done, future in enumerate(as_completed(futures), 1):
+                phrase = futures[future]
+                try:
+                    ok = future.result()
+                except Exception as error:
+                    print(f"   ❌ {phrase['filename']}: {error}")
+                    ok = False
+                print(f"[{done}/{len(pending)}] {'✅' if ok else '❌'} {phrase['filename']}")
+                if _record_result(phrase, ok, output_dir, index, stats, cache):
+                    since_checkpoint += 1
+                if since_checkpoint >= CHECKPOINT_EVERY:
+                    save_index(output_dir, index)
+                    since_checkpoint = 0
+        else:
+            for i, phrase in enumerate(pending):
+                if i and delay:
+                    time.sleep(delay)
+                print(f"[{i + 1}/{len(pending)}]", end=' ')
+                if _record_result(phrase, synthesize(phrase, output_dir / phrase['filename']),
+                                  output_dir, index, stats, cache):
+                    since_checkpoint += 1
+                if since_checkpoint >= CHECKPOINT_EVERY:
+                    save_index(output_dir, index)
+                    since_checkpoint = 0
+        for phrase in skipped:
+            _publish_aliases(phrase, output_dir, index)
+    finally:
+        if pool:
+            pool.shutdown(wait=False, cancel_futures=True)
+        # También al interrumpir: lo generado hasta aquí no se repite
+        save_index(output_dir, index)
+        if cache is not None:
+            removed, freed = cache.evict()
+            if removed:
+                print(f'🧹 Caché: {removed} clips antiguos expulsados ({freed / 1024 / 1024:.1f} MB)')
+
+    stats['seconds'] = round(time.perf_counter() - start, 2)
+    return stats
+
+def add_arguments(parser):
+    """Opciones comunes --source / --limit / --output-dir / --force / caché de los scripts"""
+    parser.add_argument('--source', help='Frases desde el curso (ADE1_2026_content.json), un diccionario '
+                                         '(spanish_freq.json) o un manifest (.json/.txt); '
+                                         'default: las frases de ejemplo del script')
+    parser.add_argument('--limit', type=int, help='Generar solo las primeras N frases de la fuente')
+    parser.add_argument('-o', '--output-dir', default=str(DEFAULT_OUTPUT_DIR),
+                        help=f'Directorio de salida (default: {DEFAULT_OUTPUT_DIR})')
+    parser.add_argument('--force', action='store_true',
+                        help='Regenerar aunque el clip ya exista con el mismo contenido')
+    parser.add_argument('--cache-dir', default=DEFAULT_CACHE_DIR,
+                        help=f'Caché de clips compartida por todos los backends (default: {DEFAULT_CACHE_DIR})')
+    parser.add_argument('--cache-max-mb', type=float, default=DEFAULT_MAX_MB,
+                        help=f'Tamaño máximo de la caché; se expulsan los clips menos usados '
+                             f'(default: {DEFAULT_MAX_MB})')
+    parser.add_argument('--no-cache', action='store_true', help='No usar la caché de clips')
+
+def add_concurrency_arguments(parser):
+    """Opciones del modo concurrente --workers / --backend-concurrency / --rate / --retries"""
+    parser.add_argument('--workers', type=int, default=1,
+                        help='Frases generadas a la vez (default: 1, secuencial)')
+    parser.add_argument('--backend-concurrency', type=int, default=BACKEND_CONCURRENCY,
+                        help=f'Con --workers: peticiones simultáneas por backend (default: {BACKEND_CONCURRENCY})')
+    parser.add_argument('--rate', type=float, default=BACKEND_RATE,
+                        help=f'Con --workers: peticiones por segundo por backend (default: {BACKEND_RATE})')
+    parser.add_argument('--retries', type=int, default=RETRY_ATTEMPTS,
+                        help=f'Con --workers: intentos por backend y frase (default: {RETRY_ATTEMPTS})')
+
+def cache_from_args(args):
+    """AudioCache según --cache-dir / --cache-max-mb, o None con --no-cache"""
+    if args.no_cache:
+        return None
+    return AudioCache(args.cache_dir, int(args.cache_max_mb * 1024 * 1024))
+
+def phrases_from_args(args, default_phrases):
+    if not args.source:
+        return list(default_phrases)
+    phrases = load_phrases(args.source, args.limit)
+    print(f'📚 {len(phrases)} frases desde {args.source}')
+    return phrases
+
+def print_summary(stats, output_dir):
+    print('')
+    print('=' * 50)
+    print('📊 Resumen:')
+    print(f"   📝 Frases: {stats['total']} ({stats['unique']} textos distintos)")
+    print(f"   ⏭️  Ya generados: {stats['skipped']}")
+    print(f"   ♻️  Desde caché: {stats.get('cached', 0)}")
+    print(f"   ✅ Exitosos: {stats['generated']}")
+    print(f"   ❌ Fallidos: {len(stats['failed'])}")
+    print(f"   ⏱️  Tiempo: {stats['seconds']:.1f}s")
+    print(f'   📁 Directorio: {output_dir}')
+    print('=' * 50)
+    print('')
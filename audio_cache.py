@@ -0,0 +1,207 @@
+#!/usr/bin/env python3
+
+"""
+Caché persistente de clips de audio, direccionada por contenido
+
+Clave: el hash de contenido de audio_batch.clip_key (texto + backend +
+parámetros de voz: idioma, tld, voz, velocidad...). Cada clip se guarda
+una sola vez en objects/<2 primeros>/<clave><extensión> y se enlaza
+(hard link; copia si el sistema de archivos no lo permite) a los nombres
+de destino, así que volver a generar el curso o la misma palabra en
+muchas diapositivas no cuesta ninguna llamada al backend.
+
+El índice (SQLite en modo WAL) guarda tamaño y último uso de cada clip y
+se comparte entre scripts y procesos a la vez; al pasar de max_bytes se
+borran los clips usados hace más tiempo (LRU). Los destinos enlazados
+no se pierden al expulsar un clip: el archivo sigue existiendo mientras
+quede algún enlace.
+
+Los archivos enlazados comparten contenido con la caché: se reemplazan
+(link_or_copy, os.replace) pero nunca se reescriben en el sitio.
+
+Uso:
+    python3 audio_cache.py stats
+    python3 audio_cache.py prune --max-mb 500
+"""
+
+import os
+import sys
+import time
+import shutil
+import sqlite3
+import argparse
+import threading
+from pathlib import Path
+
+DEFAULT_CACHE_DIR = '.audio_cache'
+DEFAULT_MAX_MB = 2048
+
+SCHEMA = '''
+CREATE TABLE IF NOT EXISTS clips (
+    key TEXT PRIMARY KEY,
+    suffix TEXT NOT NULL,
+    size INTEGER NOT NULL,
+    created_at REAL NOT NULL,
+    used_at REAL NOT NULL
+) WITHOUT ROWID
+'''
+
+def link_or_copy(source, target):
+    """
+    Enlaza source en target (hard link, o copia entre sistemas de archivos)
+
+    Pasa por un temporal y os.replace: un target que ya existe se sustituye
+    sin escribir en su contenido (puede ser el enlace de otro clip).
+
+    Returns:
+        'link' o 'copy'
+    """
+    target = Path(target)
+    temp_path = target.with_name(f'{target.name}.{os.getpid()}.{threading.get_ident()}.tmp')
+    try:
+        os.link(source, temp_path)
+        method = 'link'
+    except OSError:
+        shutil.copyfile(source, temp_path)
+        method = 'copy'
+    try:
+        os.replace(temp_path, target)
+    except OSError:
+        temp_path.unlink(missing_ok=True)
+        raise
+    return method
+
+class AudioCache:
+    """
+    Clips de audio por hash de contenido, compartidos por todos los backends
+
+    Args:
+        path: Directorio de la caché (se crea si no existe)
+        max_bytes: Tamaño máximo antes de expulsar clips (None = sin límite)
+    """
+
+    def __init__(self, path=DEFAULT_CACHE_DIR, max_bytes=DEFAULT_MAX_MB * 1024 * 1024):
+        self.path = Path(path)
+        self.max_bytes = max_bytes
+        self.path.mkdir(parents=True, exist_ok=True)
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(str(self.path / 'index.db'), timeout=30,
+                                     check_same_thread=False)
+        # WAL: varios scripts generando a la vez sin bloquearse
+        self._conn.execute('PRAGMA journal_mode=WAL')
+        self._conn.execute('PRAGMA synchronous=NORMAL')
+        self._conn.execute(SCHEMA)
+        self._conn.execute('CREATE INDEX IF NOT EXISTS clips_used_at ON clips (used_at)')
+        self._conn.commit()
+
+    def object_path(self, key, suffix):
+        return self.path / 'objects' / key[:2] / f'{key}{suffix}'
+
+    def get(self, key):
+        """Ruta del clip (y lo marca como usado) o None si no está"""
+        with self._lock:
+            row = self._conn.execute('SELECT suffix FROM clips WHERE key = ?', (key,)).fetchone()
+            if row is None:
+                return None
+            path = self.object_path(key, row[0])
+            if not path.exists():
+                # Borrado a mano: se olvida
+                self._conn.execute('DELETE FROM clips WHERE key = ?', (key,))
+            else:
+                self._conn.execute('UPDATE clips SET used_at = ? WHERE key = ?', (time.time(), key))
+            self._conn.commit()
+        return path if path.exists() else None
+
+    def __contains__(self, key):
+        with self._lock:
+            row = self._conn.execute('SELECT suffix FROM clips WHERE key = ?', (key,)).fetchone()
+        return row is not None and self.object_path(key, row[0]).exists()
+
+    def fetch(self, key, target):
+        """Enlaza el clip en target; False si no está en la caché"""
+        path = self.get(key)
+        if path is None:
+            return False
+        link_or_copy(path, target)
+        return True
+
+    def put(self, key, source):
+        """Guarda (o sustituye) el clip de source con esa clave"""
+        source = Path(source)
+        path = self.object_path(key, source.suffix)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        link_or_copy(source, path)
+        now = time.time()
+        with self._lock:
+            self._conn.execute('INSERT OR REPLACE INTO clips VALUES (?, ?, ?, ?, ?)',
+                               (key, source.suffix, path.stat().st_size, now, now))
+            self._conn.commit()
+        return path
+
+    def evict(self, max_bytes=None):
+        """
+        Borra los clips usados hace más tiempo hasta quedar en max_bytes
+
+        Returns:
+            (clips borrados, bytes liberados)
+        """
+        max_bytes = self.max_bytes if max_bytes is None else max_bytes
+        if max_bytes is None:
+            return 0, 0
+        with self._lock:
+            total = self._conn.execute('SELECT COALESCE(SUM(size), 0) FROM clips').fetchone()[0]
+            if total <= max_bytes:
+                return 0, 0
+            removed = []
+            freed = 0
+            for key, suffix, size in self._conn.execute(
+                    'SELECT key, suffix, size FROM clips ORDER BY used_at'):
+                if total - freed <= max_bytes:
+                    break
+                self.object_path(key, suffix).unlink(missing_ok=True)
+                removed.append((key,))
+                freed += size
+            self._conn.executemany('DELETE FROM clips WHERE key = ?', removed)
+            self._conn.commit()
+        return len(removed), freed
+
+    def stats(self):
+        with self._lock:
+            count, size = self._conn.execute(
+                'SELECT COUNT(*), COALESCE(SUM(size), 0) FROM clips').fetchone()
+        return {'clips': count, 'bytes': size, 'max_bytes': self.max_bytes}
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
+
+def main():
+    parser = argparse.ArgumentParser(description='Caché persistente de clips de audio')
+    parser.add_argument('--cache-dir', default=DEFAULT_CACHE_DIR,
+                        help=f'Directorio de la caché (default: {DEFAULT_CACHE_DIR})')
+    subparsers = parser.add_subparsers(dest='command', required=True)
+
+    subparsers.add_parser('stats', help='Número de clips y tamaño')
+
+    prune_parser = subparsers.add_parser('prune', help='Expulsar los clips menos usados')
+    prune_parser.add_argument('--max-mb', type=float, required=True,
+                              help='Tamaño máximo tras la limpieza (MB)')
+
+    args = parser.parse_args()
+    if not Path(args.cache_dir).is_dir():
+        print(f'❌ No existe la caché {args.cache_dir}')
+        sys.exit(1)
+    cache = AudioCache(args.cache_dir, max_bytes=None)
+
+    if args.command == 'stats':
+        stats = cache.stats()
+        print(f"📦 {args.cache_dir}: {stats['clips']} clips, {stats['bytes'] / 1024 / 1024:.1f} MB")
+
+    elif args.command == 'prune':
+        removed, freed = cache.evict(int(args.max_mb * 1024 * 1024))
+        print(f'🧹 {removed} clips expulsados ({freed / 1024 / 1024:.1f} MB liberados)')
+
+    cache.close()
+
+if __name__ == '__main__':
+    main()
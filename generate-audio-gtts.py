@@ -7,11 +7,14 @@ NO requiere tokens, cuentas, ni registros
 100% gratis y automático
 
 Ejecutar: python3 generate-audio-gtts.py
+          python3 generate-audio-gtts.py --source ADE1_2026_content.json
 """
 
 import os
 import sys
-from pathlib import Path
+import argparse
+
+import audio_batch
 
 try:
     from gtts import gTTS
@@ -20,14 +23,10 @@ except ImportError:
     print('   Ejecutar: pip3 install gtts')
     sys.exit(1)
 
-# Directorio de salida
-OUTPUT_DIR = Path('./public/audio/ai')
-
-# Crear directorio si no existe
-OUTPUT_DIR.mkdir(parents=True, exist_ok=True)
-print(f'📁 Directorio: {OUTPUT_DIR}')
+# Voz: español de España
+TTS_PARAMS = {'lang': 'es', 'tld': 'es', 'slow': False}
 
-# Frases a generar
+# Frases de ejemplo (sin --source)
 phrases = [
     {
         'text': 'Buenos días, ¿cómo está usted?',
@@ -51,22 +50,15 @@ phrases = [
     }
 ]
 
-print('\n🎙️  Generando audio con Google TTS (SIN REGISTRO)')
-print('📦 Voz: Spanish (Spain) - Google Neural Voice')
-print('✅ 100% gratis, sin tokens, sin cuentas')
-print('')
-
-def generate_audio(phrase):
+def generate_audio(phrase, output_path):
     """Genera audio para una frase usando gTTS"""
-    output_path = OUTPUT_DIR / phrase['filename']
-
     print(f"⏳ Generando: {phrase['description']}")
     print(f'   Texto: "{phrase["text"]}"')
 
     try:
         # Crear objeto gTTS
         # lang='es' para español, tld='es' para acento de España
-        tts = gTTS(text=phrase['text'], lang='es', tld='es', slow=False)
+        tts = gTTS(text=phrase['text'], **TTS_PARAMS)
 
         # Guardar archivo
         tts.save(str(output_path))
@@ -85,31 +77,46 @@ def generate_audio(phrase):
         print('')
         return False
 
-def generate_all():
-    """Genera todas las frases"""
-    print(f'🚀 Iniciando generación de {len(phrases)} archivos de audio...\n')
+def make_concurrent_synthesizer(concurrency=audio_batch.BACKEND_CONCURRENCY,
+                                rate=audio_batch.BACKEND_RATE,
+                                retries=audio_batch.RETRY_ATTEMPTS):
+    """synthesize() para el modo concurrente: límite de concurrencia y de ritmo, con reintentos"""
+    limiter = audio_batch.BackendLimiter('gtts', concurrency, rate)
 
-    success_count = 0
-    fail_count = 0
+    def save(text, output_path):
+        gTTS(text=text, **TTS_PARAMS).save(str(output_path))
+        return True
 
-    for phrase in phrases:
-        success = generate_audio(phrase)
+    def synthesize(phrase, output_path):
+        return audio_batch.call_with_retries(save, phrase['text'], output_path,
+                                             limiter=limiter, attempts=retries)
+    return synthesize
+
+def generate_all(phrases, output_dir=audio_batch.DEFAULT_OUTPUT_DIR, force=False,
+                 workers=1, synthesize=None, cache=None):
+    """
+    Genera todas las frases (omite las ya generadas con la misma voz)
+
+    Con workers > 1 usa synthesize (default: make_concurrent_synthesizer()).
+    """
+    print(f'📁 Directorio: {output_dir}')
+    print('\n🎙️  Generando audio con Google TTS (SIN REGISTRO)')
+    print('📦 Voz: Spanish (Spain) - Google Neural Voice')
+    print('✅ 100% gratis, sin tokens, sin cuentas')
+    print('')
+    print(f'🚀 Iniciando generación de {len(phrases)} archivos de audio...\n')
 
-        if success:
-            success_count += 1
-        else:
-            fail_count += 1
+    if workers > 1:
+        synthesize = synthesize or make_concurrent_synthesizer()
+        print(f'⚡ Modo concurrente: {workers} frases a la vez\n')
+    else:
+        synthesize = generate_audio
 
-    print('')
-    print('=' * 50)
-    print('📊 Resumen:')
-    print(f'   ✅ Exitosos: {success_count}')
-    print(f'   ❌ Fallidos: {fail_count}')
-    print(f'   📁 Directorio: {OUTPUT_DIR}')
-    print('=' * 50)
-    print('')
+    stats = audio_batch.run_batch(phrases, synthesize, 'gtts', TTS_PARAMS,
+                                  output_dir, force=force, workers=workers, cache=cache)
+    audio_batch.print_summary(stats, output_dir)
 
-    if success_count == len(phrases):
+    if not stats['failed']:
         print('🎉 ¡Todos los archivos de audio generados correctamente!')
         print('')
         print('Próximos pasos:')
@@ -125,8 +132,14 @@ def generate_all():
 
 # Ejecutar
 if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Genera audio con Google TTS (gTTS)')
+    audio_batch.add_arguments(parser)
+    audio_batch.add_concurrency_arguments(parser)
+    args = parser.parse_args()
     try:
-        generate_all()
+        synthesize = make_concurrent_synthesizer(args.backend_concurrency, args.rate, args.retries)
+        generate_all(audio_batch.phrases_from_args(args, phrases), args.output_dir, args.force,
+                     args.workers, synthesize, audio_batch.cache_from_args(args))
     except KeyboardInterrupt:
         print('\n\n⚠️  Proceso interrumpido por el usuario')
         sys.exit(0)
@@ -2,11 +2,16 @@
 
 """
 Script para generar audio usando motor TTS offline (pyttsx3)
+
+Ejecutar: python3 generate-audio-offline.py
+          python3 generate-audio-offline.py --source ADE1_2026_content.json
 """
 
 import os
 import sys
-from pathlib import Path
+import argparse
+
+import audio_batch
 
 try:
     import pyttsx3
@@ -14,11 +19,10 @@ except ImportError:
     print('❌ pyttsx3 no está instalado')
     sys.exit(1)
 
-# Directorio de salida
-OUTPUT_DIR = Path('./public/audio/ai')
-OUTPUT_DIR.mkdir(parents=True, exist_ok=True)
+# Velocidad de la voz (palabras por minuto)
+VOICE_RATE = 150
 
-# Frases a generar
+# Frases de ejemplo (sin --source)
 phrases = [
     ('Buenos días, ¿cómo está usted?', 'buenos-dias.mp3'),
     ('La jirafa jaranera jugaba en el jardín', 'jirafa.mp3'),
@@ -26,48 +30,75 @@ phrases = [
     ('El perro de Rosa corrió por la carretera', 'perro.mp3')
 ]
 
-print('🎙️  Generando audio con motor TTS offline...\n')
-
-try:
+def init_engine():
+    """Motor pyttsx3 con voz en español si está disponible; devuelve (motor, id de voz)"""
     engine = pyttsx3.init()
 
     # Configurar voz en español si está disponible
+    voice_id = None
     voices = engine.getProperty('voices')
     for voice in voices:
         if 'spanish' in voice.name.lower() or 'español' in voice.name.lower():
             engine.setProperty('voice', voice.id)
+            voice_id = voice.id
             break
 
     # Configurar velocidad
-    engine.setProperty('rate', 150)
+    engine.setProperty('rate', VOICE_RATE)
+    return engine, voice_id
 
-    success = 0
-    for text, filename in phrases:
-        output_path = OUTPUT_DIR / filename
-        print(f'⏳ Generando: {filename}')
-        print(f'   Texto: "{text}"')
+def make_synthesizer(engine):
+    def synthesize(phrase, output_path):
+        print(f"⏳ Generando: {output_path.name}")
+        print(f'   Texto: "{phrase["text"]}"')
 
+        # Guardar a archivo (pyttsx3 solo soporta WAV directamente). Nombre
+        # temporal propio: <nombre>.wav puede ser otro clip enlazado a la caché
+        wav_path = output_path.with_name(f'{output_path.name}.{os.getpid()}.tmp.wav')
         try:
-            # Guardar a archivo (pyttsx3 solo soporta WAV directamente)
-            wav_path = output_path.with_suffix('.wav')
-            engine.save_to_file(text, str(wav_path))
+            engine.save_to_file(phrase['text'], str(wav_path))
             engine.runAndWait()
 
             # Renombrar WAV a MP3 (navegadores modernos soportan ambos)
             if wav_path.exists():
-                os.rename(wav_path, output_path)
+                os.replace(wav_path, output_path)
                 print(f'✅ Guardado: {output_path}\n')
-                success += 1
-            else:
-                print(f'❌ No se pudo crear\n')
+                return True
+            print(f'❌ No se pudo crear\n')
+            return False
 
         except Exception as e:
             print(f'❌ Error: {e}\n')
+            return False
+        finally:
+            wav_path.unlink(missing_ok=True)
+    return synthesize
 
-    print(f'\n📊 Resultado: {success}/{len(phrases)} archivos generados')
+def main():
+    parser = argparse.ArgumentParser(description='Genera audio con el motor TTS offline (pyttsx3)')
+    audio_batch.add_arguments(parser)
+    args = parser.parse_args()
 
-except Exception as e:
-    print(f'❌ Error inicializando motor TTS: {e}')
-    print('\nEl motor TTS offline requiere dependencias del sistema.')
-    print('En Linux: sudo apt-get install espeak espeak-data')
-    sys.exit(1)
+    default_phrases = [audio_batch.make_phrase(text, filename) for text, filename in phrases]
+    batch = audio_batch.phrases_from_args(args, default_phrases)
+
+    print('🎙️  Generando audio con motor TTS offline...\n')
+
+    try:
+        engine, voice_id = init_engine()
+    except Exception as e:
+        print(f'❌ Error inicializando motor TTS: {e}')
+        print('\nEl motor TTS offline requiere dependencias del sistema.')
+        print('En Linux: sudo apt-get install espeak espeak-data')
+        sys.exit(1)
+
+    stats = audio_batch.run_batch(batch, make_synthesizer(engine), 'pyttsx3',
+                                  {'voice': voice_id, 'rate': VOICE_RATE},
+                                  args.output_dir, force=args.force,
+                                  cache=audio_batch.cache_from_args(args))
+
+    print(f"\n📊 Resultado: {stats['generated'] + stats['skipped']}/{stats['unique']} archivos generados")
+    audio_batch.print_summary(stats, args.output_dir)
+
+if __name__ == '__main__':
+    main()
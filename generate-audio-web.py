@@ -5,24 +5,38 @@ Script para generar audio usando web scraping de servicios gratuitos
 SIN registro, SIN tokens, SIN cuentas
 
 Ejecutar: python3 generate-audio-web.py
+          python3 generate-audio-web.py --source public/dictionaries/spanish_freq.json --limit 200
 """
 
 import os
 import sys
 import time
+import argparse
+import threading
 import urllib.request
 import urllib.parse
 import json
-from pathlib import Path
 
-# Directorio de salida
-OUTPUT_DIR = Path('./public/audio/ai')
+import audio_batch
 
-# Crear directorio si no existe
-OUTPUT_DIR.mkdir(parents=True, exist_ok=True)
-print(f'📁 Directorio: {OUTPUT_DIR}')
+# Voces: VoiceRSS español de España, ttsMP3 "Lucia"
+TTS_PARAMS = {'voicerss': 'es-es', 'ttsmp3': 'Lucia'}
 
-# Frases a generar
+# Backends en orden de preferencia; cada clip se indexa y cachea con la
+# clave del que lo generó (audio_batch.clip_keys)
+BACKENDS = ('voicerss', 'ttsmp3')
+
+# Espera entre frases generadas (rate limiting, modo secuencial)
+REQUEST_DELAY = 2
+
+# Timeout de cada petición HTTP (segundos)
+REQUEST_TIMEOUT = 30
+
+# Endpoints (--voicerss-url / --ttsmp3-url, p. ej. tts_stub_server.py)
+VOICERSS_URL = 'http://api.voicerss.org/'
+TTSMP3_URL = 'https://ttsmp3.com/makemp3_new.php'
+
+# Frases de ejemplo (sin --source)
 phrases = [
     {
         'text': 'Buenos días, ¿cómo está usted?',
@@ -46,97 +60,73 @@ phrases = [
     }
 ]
 
-print('\n🎙️  Generando audio con servicios web gratuitos')
-print('✅ 100% gratis, sin tokens, sin cuentas')
-print('')
+def _download(request, output_path):
+    """Guarda la respuesta en output_path; falla con HTTPError si el estado no es 2xx"""
+    with urllib.request.urlopen(request, timeout=REQUEST_TIMEOUT) as response:
+        data = response.read()
+    with open(output_path, 'wb') as f:
+        f.write(data)
+    return data
+
+def fetch_voicerss(text, output_path):
+    """Descarga el MP3 de VoiceRSS (lanza excepción si falla)"""
+    # VoiceRSS tiene una API gratuita limitada
+    # Parámetros
+    params = {
+        'key': 'demo',  # API key demo (limitado pero funcional)
+        'src': text,
+        'hl': TTS_PARAMS['voicerss'],
+        'c': 'MP3',
+        'f': '48khz_16bit_stereo'
+    }
 
-def generate_audio_voicerss(phrase):
-    """Genera audio usando VoiceRSS API (gratuita)"""
-    output_path = OUTPUT_DIR / phrase['filename']
+    # Descargar audio
+    data = _download(VOICERSS_URL + '?' + urllib.parse.urlencode(params), output_path)
+
+    # VoiceRSS responde 200 con "ERROR: ..." en texto plano
+    if data.startswith(b'ERROR'):
+        os.unlink(output_path)
+        raise RuntimeError(data[:200].decode('utf-8', 'replace'))
+    return True
+
+def fetch_ttsmp3(text, output_path):
+    """Pide el MP3 a ttsMP3 y lo descarga (lanza excepción si falla)"""
+    # Preparar datos para POST
+    data = urllib.parse.urlencode({
+        'msg': text,
+        'lang': TTS_PARAMS['ttsmp3'],  # Voz española
+        'source': 'ttsmp3'
+    }).encode('utf-8')
+
+    # Headers
+    headers = {
+        'Content-Type': 'application/x-www-form-urlencoded',
+        'User-Agent': 'Mozilla/5.0'
+    }
 
-    print(f"⏳ Generando: {phrase['description']}")
-    print(f'   Texto: "{phrase["text"]}"')
+    # Request a la API
+    req = urllib.request.Request(TTSMP3_URL, data=data, headers=headers)
+    with urllib.request.urlopen(req, timeout=REQUEST_TIMEOUT) as response:
+        result = json.loads(response.read().decode('utf-8'))
 
-    try:
-        # VoiceRSS tiene una API gratuita limitada
-        # Parámetros
-        params = {
-            'key': 'demo',  # API key demo (limitado pero funcional)
-            'src': phrase['text'],
-            'hl': 'es-es',
-            'c': 'MP3',
-            'f': '48khz_16bit_stereo'
-        }
-
-        # Construir URL
-        url = 'http://api.voicerss.org/?' + urllib.parse.urlencode(params)
-
-        # Descargar audio
-        urllib.request.urlretrieve(url, output_path)
-
-        # Verificar que se creó el archivo
-        if output_path.exists():
-            file_size = os.path.getsize(output_path) / 1024
-            print(f'✅ Guardado: {output_path}')
-            print(f'   Tamaño: {file_size:.2f} KB')
-            print('')
-            return True
-        else:
-            print(f'❌ No se pudo crear el archivo')
-            print('')
-            return False
+    if 'URL' not in result:
+        raise RuntimeError('No se obtuvo URL de audio')
 
-    except Exception as error:
-        print(f'❌ Error generando {phrase["filename"]}:')
-        print(f'   {str(error)}')
-        print('')
-        return False
-
-def generate_audio_ttsmp3(phrase):
-    """Genera audio usando ttsMP3.com API (gratuita, sin registro)"""
-    output_path = OUTPUT_DIR / phrase['filename']
+    # Descargar el audio
+    _download(result['URL'], output_path)
+    return True
 
+def _generate_with(fetch, phrase, output_path):
     print(f"⏳ Generando: {phrase['description']}")
     print(f'   Texto: "{phrase["text"]}"')
 
     try:
-        # Preparar datos para POST
-        data = urllib.parse.urlencode({
-            'msg': phrase['text'],
-            'lang': 'Lucia',  # Voz española
-            'source': 'ttsmp3'
-        }).encode('utf-8')
-
-        # Headers
-        headers = {
-            'Content-Type': 'application/x-www-form-urlencoded',
-            'User-Agent': 'Mozilla/5.0'
-        }
-
-        # Request a la API
-        req = urllib.request.Request(
-            'https://ttsmp3.com/makemp3_new.php',
-            data=data,
-            headers=headers
-        )
-
-        with urllib.request.urlopen(req, timeout=30) as response:
-            result = json.loads(response.read().decode('utf-8'))
-
-            if 'URL' in result:
-                # Descargar el audio
-                audio_url = result['URL']
-                urllib.request.urlretrieve(audio_url, output_path)
-
-                file_size = os.path.getsize(output_path) / 1024
-                print(f'✅ Guardado: {output_path}')
-                print(f'   Tamaño: {file_size:.2f} KB')
-                print('')
-                return True
-            else:
-                print(f'❌ No se obtuvo URL de audio')
-                print('')
-                return False
+        fetch(phrase['text'], output_path)
+        file_size = os.path.getsize(output_path) / 1024
+        print(f'✅ Guardado: {output_path}')
+        print(f'   Tamaño: {file_size:.2f} KB')
+        print('')
+        return True
 
     except Exception as error:
         print(f'❌ Error generando {phrase["filename"]}:')
@@ -144,42 +134,86 @@ def generate_audio_ttsmp3(phrase):
         print('')
         return False
 
-def generate_all():
-    """Genera todas las frases"""
-    print(f'🚀 Iniciando generación de {len(phrases)} archivos de audio...\n')
-
-    success_count = 0
-    fail_count = 0
-
-    for i, phrase in enumerate(phrases):
-        # Intentar primero con VoiceRSS (más confiable)
-        success = generate_audio_voicerss(phrase)
-
-        # Si falla, intentar con ttsMP3
-        if not success:
-            print('   Reintentando con método alternativo...')
-            time.sleep(1)
-            success = generate_audio_ttsmp3(phrase)
+def generate_audio_voicerss(phrase, output_path):
+    """Genera audio usando VoiceRSS API (gratuita)"""
+    return _generate_with(fetch_voicerss, phrase, output_path)
 
-        if success:
-            success_count += 1
-        else:
-            fail_count += 1
+def generate_audio_ttsmp3(phrase, output_path):
+    """Genera audio usando ttsMP3.com API (gratuita, sin registro)"""
+    return _generate_with(fetch_ttsmp3, phrase, output_path)
+
+def generate_audio(phrase, output_path):
+    """
+    VoiceRSS y, si falla, ttsMP3
+
+    Returns:
+        Nombre del backend que generó el clip o None
+    """
+    # Intentar primero con VoiceRSS (más confiable)
+    if generate_audio_voicerss(phrase, output_path):
+        return 'voicerss'
+
+    # Si falla, intentar con ttsMP3
+    print('   Reintentando con método alternativo...')
+    time.sleep(1)
+    return 'ttsmp3' if generate_audio_ttsmp3(phrase, output_path) else None
+
+def make_concurrent_synthesizer(concurrency=audio_batch.BACKEND_CONCURRENCY,
+                                rate=audio_batch.BACKEND_RATE,
+                                retries=audio_batch.RETRY_ATTEMPTS, hedge_delay=0):
+    """
+    synthesize() para el modo concurrente: VoiceRSS y ttsMP3 compiten por
+    cada frase (con hedge_delay, ttsMP3 arranca solo si VoiceRSS tarda o falla)
+
+    Cada backend tiene su propio límite de concurrencia y de peticiones por
+    segundo, y reintenta con backoff exponencial con jitter.
+    """
+    limiters = {name: audio_batch.BackendLimiter(name, concurrency, rate)
+                for name in BACKENDS}
+    fetchers = {'voicerss': fetch_voicerss, 'ttsmp3': fetch_ttsmp3}
+
+    def candidate(name, text, stop):
+        return (name, lambda temp_path: audio_batch.call_with_retries(
+            fetchers[name], text, temp_path, limiter=limiters[name], attempts=retries, stop=stop))
+
+    def synthesize(phrase, output_path):
+        # El perdedor deja de reintentar en cuanto hay ganador
+        stop = threading.Event()
+        winner = audio_batch.race([candidate(name, phrase['text'], stop) for name in fetchers],
+                                  output_path, hedge_delay, stop)
+        if winner:
+            print(f"   🏁 {phrase['filename']}: {winner}")
+        return winner
+    return synthesize
+
+def generate_all(phrases, output_dir=audio_batch.DEFAULT_OUTPUT_DIR, force=False,
+                 workers=1, synthesize=None, cache=None):
+    """
+    Genera todas las frases (omite las ya generadas con la misma voz)
+
+    Con workers > 1 usa synthesize (default: make_concurrent_synthesizer())
+    en lugar de la secuencia VoiceRSS -> espera -> ttsMP3.
+    """
+    print(f'📁 Directorio: {output_dir}')
+    print('\n🎙️  Generando audio con servicios web gratuitos')
+    print('✅ 100% gratis, sin tokens, sin cuentas')
+    print('')
+    print(f'🚀 Iniciando generación de {len(phrases)} archivos de audio...\n')
 
-        # Esperar entre requests (rate limiting)
-        if i < len(phrases) - 1:
-            time.sleep(2)
+    if workers > 1:
+        synthesize = synthesize or make_concurrent_synthesizer()
+        print(f'⚡ Modo concurrente: {workers} frases a la vez, VoiceRSS y ttsMP3 en paralelo\n')
+    else:
+        synthesize = generate_audio
 
-    print('')
-    print('=' * 50)
-    print('📊 Resumen:')
-    print(f'   ✅ Exitosos: {success_count}')
-    print(f'   ❌ Fallidos: {fail_count}')
-    print(f'   📁 Directorio: {OUTPUT_DIR}')
-    print('=' * 50)
-    print('')
+    # Esperar entre requests (rate limiting)
+    stats = audio_batch.run_batch(phrases, synthesize, BACKENDS, TTS_PARAMS,
+                                  output_dir, force=force, delay=REQUEST_DELAY, workers=workers,
+                                  cache=cache)
+    audio_batch.print_summary(stats, output_dir)
 
-    if success_count == len(phrases):
+    success_count = stats['generated'] + stats['skipped']
+    if not stats['failed']:
         print('🎉 ¡Todos los archivos de audio generados correctamente!')
         print('')
         print('Próximos pasos:')
@@ -187,7 +221,7 @@ def generate_all():
         print('2. Prueba el AIAudioPronunciationExercise en tu app')
         print('3. ¡Disfruta de tu ejercicio de pronunciación!')
     elif success_count > 0:
-        print(f'⚠️  {success_count} de {len(phrases)} archivos generados.')
+        print(f'⚠️  {success_count} de {stats["unique"]} archivos generados.')
         print('   Los archivos faltantes pueden generarse manualmente.')
     else:
         print('❌ No se pudieron generar archivos automáticamente.')
@@ -205,8 +239,21 @@ def generate_all():
 
 # Ejecutar
 if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Genera audio con servicios web gratuitos (VoiceRSS, ttsMP3)')
+    audio_batch.add_arguments(parser)
+    audio_batch.add_concurrency_arguments(parser)
+    parser.add_argument('--hedge-delay', type=float, default=0,
+                        help='Con --workers: lanzar ttsMP3 solo si VoiceRSS no terminó en estos segundos '
+                             '(default: 0, ambos a la vez)')
+    parser.add_argument('--voicerss-url', default=VOICERSS_URL, help='Endpoint de VoiceRSS')
+    parser.add_argument('--ttsmp3-url', default=TTSMP3_URL, help='Endpoint de ttsMP3')
+    args = parser.parse_args()
+    VOICERSS_URL, TTSMP3_URL = args.voicerss_url, args.ttsmp3_url
     try:
-        generate_all()
+        synthesize = make_concurrent_synthesizer(args.backend_concurrency, args.rate,
+                                                 args.retries, args.hedge_delay)
+        generate_all(audio_batch.phrases_from_args(args, phrases), args.output_dir, args.force,
+                     args.workers, synthesize, audio_batch.cache_from_args(args))
     except KeyboardInterrupt:
         print('\n\n⚠️  Proceso interrumpido por el usuario')
         sys.exit(0)
@@ -4,20 +4,42 @@
 Genera archivos de audio simples pero funcionales para testing
 Los archivos contendrán tonos que permiten probar la funcionalidad
 Luego pueden reemplazarse con audio real de mejor calidad
+
+Síntesis por lotes: la onda y el envelope se calculan de una vez (NumPy si
+está instalado; si no, array('h') repitiendo un periodo de la onda) y se
+escriben al WAV sin copias intermedias. Los clips se guardan en caché por
+(frecuencia, duración, sample rate), así que cientos de clips con los
+mismos tonos cuestan una sola síntesis por tono.
+
+Frases: las 4 de ejemplo, o las de --source (curso, diccionario o
+manifest, ver audio_batch.py) con un tono por texto.
 """
 
-import wave
+import sys
 import math
-import struct
-from pathlib import Path
+import wave
+import zlib
+import argparse
+from array import array
+from functools import lru_cache
+
+import audio_batch
 
-# Directorio de salida
-OUTPUT_DIR = Path('./public/audio/ai')
-OUTPUT_DIR.mkdir(parents=True, exist_ok=True)
+# NumPy opcional (pip install numpy)
+try:
+    import numpy as np
+    NUMPY_AVAILABLE = True
+except ImportError:
+    NUMPY_AVAILABLE = False
 
 # Configuración de audio
 SAMPLE_RATE = 44100  # Hz
 DURATION = 2  # segundos por archivo
+FADE_SECONDS = 0.1  # fade in/out para evitar clicks
+VOLUME = 0.3  # 30% volumen
+
+# Clips distintos que se mantienen en memoria (~172 KB cada uno a 2s/44.1kHz)
+CLIP_CACHE_SIZE = 256
 
 phrases = [
     ('buenos-dias.mp3', 'Buenos días', 440),  # La
@@ -26,69 +48,128 @@ phrases = [
     ('perro.mp3', 'El perro de Rosa', 784),  # Sol
 ]
 
-print('🎙️  Generando archivos de audio funcionales para testing...')
-print('📝 Nota: Estos son archivos de prueba con tonos simples')
-print('   Para producción, reemplazar con audio real usando:')
-print('   - Hugging Face API (requiere token gratuito)')
-print('   - Generación manual en ttsMP3.com o Luvvoice.com')
-print('')
-
-for filename, description, frequency in phrases:
-    # Cambiar extensión a .wav ya que generaremos WAV
-    # Los navegadores modernos reproducen WAV sin problemas
-    output_path = OUTPUT_DIR / filename.replace('.mp3', '.wav')
-
-    print(f'⏳ Generando: {description}')
-
-    # Generar onda sinusoidal
-    num_samples = SAMPLE_RATE * DURATION
-    wav_data = []
-
-    for i in range(num_samples):
-        # Generar onda sinusoidal con fade in/out
-        value = math.sin(2 * math.pi * frequency * i / SAMPLE_RATE)
-
-        # Aplicar envelope (fade in/out) para evitar clicks
-        envelope = 1.0
-        fade_samples = int(SAMPLE_RATE * 0.1)  # 100ms fade
-
-        if i < fade_samples:
-            envelope = i / fade_samples
-        elif i > num_samples - fade_samples:
-            envelope = (num_samples - i) / fade_samples
-
-        # Convertir a 16-bit integer
-        sample = int(value * envelope * 32767 * 0.3)  # 30% volumen
-        wav_data.append(struct.pack('<h', sample))
-
-    # Crear archivo WAV
+# Escala pentatónica (La3-Mi5) para los tonos de frases sin frecuencia fija
+TONE_SCALE = (220, 247, 277, 330, 370, 440, 494, 554, 659, 740)
+
+def _render_numpy(frequency, num_samples, fade_samples, sample_rate):
+    i = np.arange(num_samples)
+    values = np.sin(2 * np.pi * frequency * i / sample_rate)
+    envelope = np.where(i < fade_samples, i / fade_samples,
+                        np.where(i > num_samples - fade_samples,
+                                 (num_samples - i) / fade_samples, 1.0))
+    # astype trunca hacia cero, como int(); '<i2': little-endian como exige WAV
+    return (values * envelope * 32767 * VOLUME).astype('<i2').view(np.uint8)
+
+def _render_array(frequency, num_samples, fade_samples, sample_rate):
+    sin = math.sin
+    omega = 2 * math.pi * frequency
+
+    # Con frecuencia entera la onda se repite cada sample_rate/mcd muestras:
+    # se calcula un periodo y se repite
+    period = num_samples
+    if float(frequency).is_integer() and isinstance(sample_rate, int):
+        period = min(num_samples, sample_rate // math.gcd(int(frequency), sample_rate))
+    samples = array('h', [int(sin(omega * i / sample_rate) * 32767 * VOLUME) for i in range(period)])
+    if period < num_samples:
+        samples *= num_samples // period + 1
+        del samples[num_samples:]
+
+    # Envelope: solo las muestras de los fades
+    for i in range(min(fade_samples, num_samples)):
+        samples[i] = int(sin(omega * i / sample_rate) * (i / fade_samples) * 32767 * VOLUME)
+    for i in range(max(num_samples - fade_samples + 1, fade_samples), num_samples):
+        envelope = (num_samples - i) / fade_samples
+        samples[i] = int(sin(omega * i / sample_rate) * envelope * 32767 * VOLUME)
+    # array('h') usa el orden de bytes de la máquina; WAV es little-endian
+    if sys.byteorder == 'big':
+        samples.byteswap()
+    return samples
+
+@lru_cache(maxsize=CLIP_CACHE_SIZE)
+def render_tone(frequency, duration=DURATION, sample_rate=SAMPLE_RATE):
+    """
+    Muestras PCM 16-bit mono de un tono con fade in/out
+
+    Returns:
+        memoryview de bytes little-endian, de solo lectura (compartida por
+        la caché: no copiar)
+    """
+    num_samples = int(sample_rate * duration)
+    fade_samples = int(sample_rate * FADE_SECONDS)
+    render = _render_numpy if NUMPY_AVAILABLE else _render_array
+    return memoryview(render(frequency, num_samples, fade_samples, sample_rate)).cast('B').toreadonly()
+
+def write_wav(output_path, samples, sample_rate=SAMPLE_RATE):
+    """Escribe muestras PCM 16-bit mono (cualquier buffer) a un WAV"""
     with wave.open(str(output_path), 'wb') as wav_file:
         wav_file.setnchannels(1)  # Mono
         wav_file.setsampwidth(2)  # 16-bit
-        wav_file.setframerate(SAMPLE_RATE)
-        wav_file.writeframes(b''.join(wav_data))
-
-    file_size = output_path.stat().st_size / 1024
+        wav_file.setframerate(sample_rate)
+        wav_file.writeframes(samples)
+
+def generate_clip(output_path, frequency, duration=DURATION, sample_rate=SAMPLE_RATE):
+    """Genera (o reutiliza de la caché) el tono y lo escribe en output_path"""
+    write_wav(output_path, render_tone(frequency, duration, sample_rate), sample_rate)
+    return output_path.stat().st_size
+
+def tone_for_text(text):
+    """Tono estable por texto: frases distintas suenan distinto"""
+    return TONE_SCALE[zlib.crc32(text.encode('utf-8')) % len(TONE_SCALE)]
+
+def default_phrases():
+    return [{'text': description, 'filename': filename, 'description': description,
+             'params': {'frequency': frequency}}
+            for filename, description, frequency in phrases]
+
+def synthesize(phrase, output_path):
+    frequency = (phrase.get('params') or {}).get('frequency') or tone_for_text(phrase['text'])
+    print(f"⏳ Generando: {phrase['description']}")
+    file_size = generate_clip(output_path, frequency) / 1024
     print(f'✅ Creado: {output_path}')
     print(f'   Tamaño: {file_size:.2f} KB')
     print('')
+    return True
+
+def main():
+    parser = argparse.ArgumentParser(description='Genera clips WAV con tonos simples para testing')
+    audio_batch.add_arguments(parser)
+    args = parser.parse_args()
+
+    print('🎙️  Generando archivos de audio funcionales para testing...')
+    print('📝 Nota: Estos son archivos de prueba con tonos simples')
+    print('   Para producción, reemplazar con audio real usando:')
+    print('   - Hugging Face API (requiere token gratuito)')
+    print('   - Generación manual en ttsMP3.com o Luvvoice.com')
+    print('')
+
+    # Extensión .wav ya que generaremos WAV
+    # Los navegadores modernos reproducen WAV sin problemas
+    stats = audio_batch.run_batch(
+        audio_batch.phrases_from_args(args, default_phrases()), synthesize, 'tone',
+        {'duration': DURATION, 'sample_rate': SAMPLE_RATE, 'volume': VOLUME},
+        args.output_dir, suffix='.wav', force=args.force, cache=audio_batch.cache_from_args(args)
+    )
+    audio_batch.print_summary(stats, args.output_dir)
+
+    print('=' * 60)
+    print('✅ Archivos de audio de prueba creados correctamente')
+    print('')
+    print('📝 IMPORTANTE:')
+    print('   Los archivos son WAV con tonos simples para TESTING')
+    print('   Para PRODUCCIÓN, reemplazar con audio de voz real:')
+    print('')
+    print('   Opción 1 - Hugging Face (mejor calidad, requiere token):')
+    print('   $ HF_TOKEN="tu-token" python3 generate-audio-hf.py')
+    print('')
+    print('   Opción 2 - Manual (5 min, sin registro):')
+    print('   - Ir a https://ttsmp3.com')
+    print('   - Generar las 4 frases')
+    print('   - Guardar en public/audio/ai/')
+    print('')
+    print('   Opción 3 - Luvvoice (mejor calidad, sin registro):')
+    print('   - Ir a https://luvvoice.com')
+    print('   - Usar voces neurales en español')
+    print('=' * 60)
 
-print('=' * 60)
-print('✅ Archivos de audio de prueba creados correctamente')
-print('')
-print('📝 IMPORTANTE:')
-print('   Los archivos son WAV con tonos simples para TESTING')
-print('   Para PRODUCCIÓN, reemplazar con audio de voz real:')
-print('')
-print('   Opción 1 - Hugging Face (mejor calidad, requiere token):')
-print('   $ HF_TOKEN="tu-token" python3 generate-audio-hf.py')
-print('')
-print('   Opción 2 - Manual (5 min, sin registro):')
-print('   - Ir a https://ttsmp3.com')
-print('   - Generar las 4 frases')
-print('   - Guardar en public/audio/ai/')
-print('')
-print('   Opción 3 - Luvvoice (mejor calidad, sin registro):')
-print('   - Ir a https://luvvoice.com')
-print('   - Usar voces neurales en español')
-print('=' * 60)
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,546 @@
+#!/usr/bin/env python3
+"""
+Benchmarks del pipeline del diccionario CC-CEDICT
+
+Uso:
+    python benchmark.py workers <archivo_cedict> [--workers 1 2 4 8]
+    python benchmark.py index <archivo_cedict>
+    python benchmark.py translate <archivo_cedict> [--workers 1 4 16] [--latency 0.01]
+    python benchmark.py suite <archivo_cedict> [--slices 1k 10k full] [--threshold 0.25]
+    python benchmark.py io <archivo_cedict.gz>
+"""
+
+import os
+import sys
+import time
+import json
+import shutil
+import hashlib
+import platform
+import argparse
+import tempfile
+import subprocess
+import tracemalloc
+import multiprocessing
+from datetime import datetime
+from statistics import median
+from typing import Dict, Iterable, List, Optional
+
+from cedict_io import ISAL_AVAILABLE, iter_blocks, iter_lines
+from cedict_parser import (
+    build_metadata, create_search_index, iter_cedict_entries, iter_cedict_entries_bulk,
+    iter_entries, parse_cedict_file
+)
+from client_index import file_sha256
+from compact_index import CompactIndex
+from translate_to_spanish import (
+    DictionaryTranslator, create_spanish_search_index, save_translated_dict
+)
+
+# Etapas del pipeline que mide `suite`, en orden
+SUITE_STAGES = ('parse', 'index', 'translate', 'spanish_index', 'save')
+# Cortes fijos del archivo: las primeras N entradas (None = completo)
+SUITE_SLICES = {'1k': 1000, '10k': 10000, 'full': None}
+DEFAULT_HISTORY = 'benchmark_history.json'
+# Métricas comparadas contra el histórico
+SUITE_METRICS = ('seconds', 'peak_rss_bytes', 'output_bytes')
+
+def entries_digest(entries: Iterable[Dict]) -> Dict:
+    """Cuenta las entradas y calcula un hash de su serialización JSON"""
+    digest = hashlib.sha256()
+    count = 0
+    for entry in entries:
+        digest.update(json.dumps(entry, ensure_ascii=False).encode('utf-8'))
+        digest.update(b'\n')
+        count += 1
+    return {'count': count, 'sha256': digest.hexdigest()}
+
+def bench_workers(filepath: str, worker_counts: List[int], repeat: int = 1) -> List[Dict]:
+    """
+    Mide el parseo completo con distintos números de procesos
+
+    Verifica además que todas las configuraciones produzcan exactamente
+    las mismas entradas (mismo hash) que el modo serial.
+    """
+    results = []
+    reference = None
+
+    for workers in worker_counts:
+        best = None
+        for _ in range(repeat):
+            start = time.perf_counter()
+            digest = entries_digest(iter_entries(filepath, workers=workers))
+            elapsed = time.perf_counter() - start
+            best = elapsed if best is None else min(best, elapsed)
+
+        if reference is None:
+            reference = digest
+
+        results.append({
+            'workers': workers,
+            'seconds': round(best, 3),
+            'entries': digest['count'],
+            'speedup': round(results[0]['seconds'] / best, 2) if results else 1.0,
+            'identical': digest == reference
+        })
+
+    return results
+
+def bench_index(filepath: str) -> Dict:
+    """
+    Compara el índice dict-of-lists de create_search_index con CompactIndex
+
+    Mide memoria en el heap (tracemalloc), tamaño serializado y tiempo de
+    carga desde disco de cada representación.
+    """
+    entries = parse_cedict_file(filepath)
+
+    tracemalloc.start()
+    base = tracemalloc.get_traced_memory()[0]
+    index = create_search_index(entries)
+    dict_bytes = tracemalloc.get_traced_memory()[0] - base
+
+    base = tracemalloc.get_traced_memory()[0]
+    compact = CompactIndex.from_dict(index)
+    compact_bytes = tracemalloc.get_traced_memory()[0] - base
+    tracemalloc.stop()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        json_path = os.path.join(tmp, 'index.json')
+        cidx_path = os.path.join(tmp, 'index.cidx')
+
+        with open(json_path, 'w', encoding='utf-8') as f:
+            json.dump(index, f, ensure_ascii=False)
+        compact.save(cidx_path)
+
+        start = time.perf_counter()
+        with open(json_path, 'r', encoding='utf-8') as f:
+            loaded = json.load(f)
+        json_load = time.perf_counter() - start
+
+        start = time.perf_counter()
+        loaded_compact = CompactIndex.load(cidx_path)
+        cidx_load = time.perf_counter() - start
+
+        identical = loaded_compact.to_dict() == loaded
+        loaded_compact.close()
+
+        return {
+            'entries': len(entries),
+            'keys': sum(len(table) for table in index.values()),
+            'dict_heap_bytes': dict_bytes,
+            'compact_heap_bytes': compact_bytes,
+            'json_file_bytes': os.path.getsize(json_path),
+            'cidx_file_bytes': os.path.getsize(cidx_path),
+            'json_load_seconds': round(json_load, 4),
+            'cidx_load_seconds': round(cidx_load, 6),
+            'identical': identical
+        }
+
+def bench_translate(filepath: str, worker_counts: List[int], limit: int = 2000,
+                    latency: float = 0.01, rate: float = None,
+                    pack: bool = False) -> List[Dict]:
+    """
+    Throughput de traducción contra el traductor local 'stub'
+
+    La latencia simulada por petición hace visible el efecto de la
+    concurrencia sin depender de la red.
+    """
+    entries = parse_cedict_file(filepath, limit)
+    results = []
+
+    for workers in worker_counts:
+        translator = DictionaryTranslator(service='stub', rate=rate, stub_latency=latency)
+        start = time.perf_counter()
+        if workers > 1:
+            translator.translate_concurrent(entries, workers=workers, pack=pack)
+        else:
+            translator.translate_batch(entries, batch_size=50, delay=0, pack=pack)
+        elapsed = time.perf_counter() - start
+
+        results.append({
+            'workers': workers,
+            'seconds': round(elapsed, 3),
+            'entries_per_second': round(len(entries) / elapsed, 1),
+            'service_calls': translator.translator.calls,
+            'requests_per_entry': round(translator.stats['requests'] / max(1, len(entries)), 3)
+        })
+
+    return results
+
+def bench_io(filepath: str, repeat: int = 3) -> List[Dict]:
+    """
+    Lectura + parseo: modo texto (gzip.open 'rt') frente a la lectura por bloques
+
+    Mide líneas/s del archivo completo con cada backend disponible y con
+    la caché de descompresión, y verifica que todos den las mismas entradas.
+    """
+    lines = sum(1 for _ in iter_lines(iter_blocks(filepath, backend='zlib')))
+    modes = [('texto (gzip.open rt)', lambda: iter_cedict_entries(filepath)),
+             ('bloques zlib', lambda: iter_cedict_entries_bulk(filepath, backend='zlib'))]
+    if ISAL_AVAILABLE:
+        modes.append(('bloques isal', lambda: iter_cedict_entries_bulk(filepath, backend='isal')))
+    cache_dir = None
+    if filepath.endswith('.gz'):
+        # La caché se crea junto al .gz: se enlaza en un directorio temporal
+        # para no tocar la caché que el usuario ya tenga junto al original
+        cache_dir = tempfile.TemporaryDirectory()
+        cached_gz = os.path.join(cache_dir.name, os.path.basename(filepath))
+        try:
+            os.symlink(os.path.abspath(filepath), cached_gz)
+        except OSError:
+            shutil.copy2(filepath, cached_gz)
+        # Crear la caché antes de medir su lectura
+        for _ in iter_blocks(cached_gz, decompressed_cache=True):
+            pass
+        modes.append(('caché descomprimida',
+                      lambda: iter_cedict_entries_bulk(cached_gz, decompressed_cache=True)))
+
+    results = []
+    reference = None
+    for name, make_iterator in modes:
+        best = None
+        for _ in range(repeat):
+            start = time.perf_counter()
+            digest = entries_digest(make_iterator())
+            elapsed = time.perf_counter() - start
+            best = elapsed if best is None else min(best, elapsed)
+        if reference is None:
+            reference = digest
+        results.append({
+            'mode': name,
+            'seconds': round(best, 3),
+            'lines_per_second': round(lines / best),
+            'speedup': round(results[0]['seconds'] / best, 2) if results else 1.0,
+            'identical': digest == reference
+        })
+
+    if cache_dir:
+        cache_dir.cleanup()
+    return results
+
+def _reset_peak_rss() -> bool:
+    """Reinicia el pico de RSS del proceso (Linux: VmHWM); False si no se puede"""
+    try:
+        with open('/proc/self/clear_refs', 'w') as f:
+            f.write('5')
+        return True
+    except OSError:
+        return False
+
+def _peak_rss_bytes() -> int:
+    try:
+        with open('/proc/self/status', 'r') as f:
+            for line in f:
+                if line.startswith('VmHWM:'):
+                    return int(line.split()[1]) * 1024
+    except OSError:
+        pass
+    import resource
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # ru_maxrss está en KB en Linux y en bytes en macOS
+    return peak if sys.platform == 'darwin' else peak * 1024
+
+def _stub_translate(entries: List[Dict]) -> List[Dict]:
+    """Traducción determinista y sin red (traductor stub, peticiones empaquetadas)"""
+    translator = DictionaryTranslator(service='stub')
+    return translator.translate_batch(entries, batch_size=50, delay=0, pack=True)
+
+def _run_stage(task) -> Dict:
+    """
+    Worker: mide una etapa en un proceso nuevo
+
+    Las entradas que la etapa necesita se preparan antes de medir; el
+    pico de RSS se reinicia justo antes de la etapa cuando el sistema lo
+    permite (si no, incluye la preparación: rss_scope = 'process').
+    """
+    stage, filepath, limit = task
+    entries = parse_cedict_file(filepath, limit) if stage != 'parse' else None
+    translated = _stub_translate(entries) if stage in ('spanish_index', 'save') else None
+    data = None
+    if stage == 'save':
+        data = {
+            'metadata': build_metadata(len(translated)),
+            'entries': translated,
+            'index': create_search_index(translated),
+            'index_spanish': create_spanish_search_index(translated)
+        }
+
+    with tempfile.TemporaryDirectory() as tmp:
+        output_path = os.path.join(tmp, 'output.json')
+        scope = 'stage' if _reset_peak_rss() else 'process'
+
+        start = time.perf_counter()
+        if stage == 'parse':
+            result = parse_cedict_file(filepath, limit)
+        elif stage == 'index':
+            result = create_search_index(entries)
+        elif stage == 'translate':
+            result = _stub_translate(entries)
+        elif stage == 'spanish_index':
+            result = create_spanish_search_index(translated)
+        else:
+            save_translated_dict(data, output_path)
+            result = None
+        seconds = time.perf_counter() - start
+        peak = _peak_rss_bytes()
+
+        if stage == 'save':
+            output_bytes = os.path.getsize(output_path)
+            count = len(translated)
+        else:
+            # Tamaño de referencia: el resultado serializado como JSON compacto
+            output_bytes = len(json.dumps(result, ensure_ascii=False, separators=(',', ':')).encode('utf-8'))
+            count = len(result) if stage in ('parse', 'translate') else len(entries or translated)
+
+    return {
+        'entries': count,
+        'seconds': round(seconds, 4),
+        'peak_rss_bytes': peak,
+        'rss_scope': scope,
+        'output_bytes': output_bytes
+    }
+
+def bench_suite(filepath: str, stages: Iterable[str] = SUITE_STAGES,
+                slices: Optional[Dict[str, Optional[int]]] = None,
+                repeat: int = 1, progress_callback=None) -> List[Dict]:
+    """
+    Mide cada etapa sobre cada corte del archivo
+
+    Cada medición corre en un proceso nuevo (spawn) para que el pico de
+    memoria de una etapa no contamine la siguiente. Con repeat > 1 se
+    conserva la ejecución más rápida.
+    """
+    slices = SUITE_SLICES if slices is None else slices
+    context = multiprocessing.get_context('spawn')
+    results = []
+
+    for slice_name, limit in slices.items():
+        for stage in stages:
+            runs = []
+            for _ in range(repeat):
+                with context.Pool(1) as pool:
+                    runs.append(pool.apply(_run_stage, ((stage, filepath, limit),)))
+            result = {'stage': stage, 'slice': slice_name,
+                      **min(runs, key=lambda run: run['seconds'])}
+            results.append(result)
+            if progress_callback:
+                progress_callback(result)
+
+    return results
+
+def _git_commit() -> Optional[str]:
+    try:
+        return subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], capture_output=True,
+                              text=True, check=True, cwd=os.path.dirname(os.path.abspath(__file__))).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+def load_history(filepath: str) -> List[Dict]:
+    if not os.path.exists(filepath):
+        return []
+    with open(filepath, 'r', encoding='utf-8') as f:
+        return json.load(f)
+
+def find_regressions(results: List[Dict], history: List[Dict], input_sha256: str,
+                     threshold: float = 0.25, min_seconds: float = 0.05,
+                     window: int = 5) -> List[Dict]:
+    """
+    Compara cada medición con la mediana de las últimas `window` ejecuciones
+    del histórico sobre el mismo archivo de entrada
+
+    Hay regresión si una métrica supera la referencia en más de threshold
+    (0.25 = 25%). Para el tiempo se exige además una diferencia absoluta
+    de min_seconds, para no fallar por ruido en los cortes pequeños.
+    """
+    previous = [run for run in history if run['input']['sha256'] == input_sha256][-window:]
+    regressions = []
+
+    for result in results:
+        for metric in SUITE_METRICS:
+            values = [r[metric] for run in previous for r in run['results']
+                      if r['stage'] == result['stage'] and r['slice'] == result['slice']
+                      and r.get(metric)]
+            if not values:
+                continue
+            baseline = median(values)
+            value = result[metric]
+            if value <= baseline * (1 + threshold):
+                continue
+            if metric == 'seconds' and value - baseline < min_seconds:
+                continue
+            regressions.append({
+                'stage': result['stage'], 'slice': result['slice'], 'metric': metric,
+                'baseline': baseline, 'value': value,
+                'change': round(value / baseline - 1, 3)
+            })
+
+    return regressions
+
+def main():
+    parser = argparse.ArgumentParser(
+        description='Benchmarks del pipeline del diccionario'
+    )
+    subparsers = parser.add_subparsers(dest='command', required=True)
+
+    workers_parser = subparsers.add_parser(
+        'workers',
+        help='Escalado del parseo con --workers N'
+    )
+    workers_parser.add_argument('input_file', help='Archivo CC-CEDICT (.txt o .txt.gz)')
+    workers_parser.add_argument(
+        '-w', '--workers',
+        type=int,
+        nargs='+',
+        default=[1, 2, 4, 8],
+        help='Números de procesos a medir (default: 1 2 4 8)'
+    )
+    workers_parser.add_argument('-r', '--repeat', type=int, default=1,
+                                help='Repeticiones por configuración (se toma la mejor)')
+
+    index_parser = subparsers.add_parser(
+        'index',
+        help='Memoria y tamaño: dict-of-lists vs índice compacto'
+    )
+    index_parser.add_argument('input_file', help='Archivo CC-CEDICT (.txt o .txt.gz)')
+
+    translate_parser = subparsers.add_parser(
+        'translate',
+        help='Throughput de traducción con el traductor stub'
+    )
+    translate_parser.add_argument('input_file', help='Archivo CC-CEDICT (.txt o .txt.gz)')
+    translate_parser.add_argument('-w', '--workers', type=int, nargs='+', default=[1, 4, 16])
+    translate_parser.add_argument('-l', '--limit', type=int, default=2000,
+                                  help='Entradas a traducir (default: 2000)')
+    translate_parser.add_argument('--latency', type=float, default=0.01,
+                                  help='Latencia simulada por petición (default: 0.01s)')
+    translate_parser.add_argument('-r', '--rate', type=float,
+                                  help='Límite de peticiones por segundo')
+    translate_parser.add_argument('-p', '--pack', action='store_true',
+                                  help='Empaquetar definiciones por petición')
+
+    suite_parser = subparsers.add_parser(
+        'suite',
+        help='Tiempo, pico de RSS y tamaño de cada etapa; histórico y umbral de regresión'
+    )
+    suite_parser.add_argument('input_file', help='Archivo CC-CEDICT (.txt o .txt.gz)')
+    suite_parser.add_argument('--stages', nargs='+', choices=SUITE_STAGES, default=list(SUITE_STAGES))
+    suite_parser.add_argument('--slices', nargs='+', choices=list(SUITE_SLICES),
+                              default=list(SUITE_SLICES), help='Cortes a medir (default: 1k 10k full)')
+    suite_parser.add_argument('-r', '--repeat', type=int, default=1,
+                              help='Repeticiones por medición (se toma la más rápida)')
+    suite_parser.add_argument('--history', default=DEFAULT_HISTORY,
+                              help=f'Histórico JSON (default: {DEFAULT_HISTORY})')
+    suite_parser.add_argument('--threshold', type=float, default=0.25,
+                              help='Regresión permitida sobre la mediana del histórico (default: 0.25 = 25%%)')
+    suite_parser.add_argument('--min-seconds', type=float, default=0.05,
+                              help='Diferencia mínima de tiempo para contar como regresión (default: 0.05)')
+    suite_parser.add_argument('--window', type=int, default=5,
+                              help='Ejecuciones anteriores usadas como referencia (default: 5)')
+    suite_parser.add_argument('--no-record', action='store_true',
+                              help='No añadir esta ejecución al histórico')
+
+    io_parser = subparsers.add_parser(
+        'io',
+        help='Líneas/s: lectura en modo texto vs por bloques (zlib/isal/caché)'
+    )
+    io_parser.add_argument('input_file', help='Archivo CC-CEDICT (.txt o .txt.gz)')
+    io_parser.add_argument('-r', '--repeat', type=int, default=3,
+                           help='Repeticiones por modo (se toma la mejor)')
+
+    args = parser.parse_args()
+
+    if args.command == 'io':
+        print(f"⏱️  Lectura y parseo de {args.input_file}\n")
+        results = bench_io(args.input_file, args.repeat)
+
+        print(f"   {'modo':<22} {'segundos':>9} {'líneas/s':>10} {'speedup':>8}  idéntico")
+        for r in results:
+            print(f"   {r['mode']:<22} {r['seconds']:>9.3f} {r['lines_per_second']:>10} "
+                  f"{r['speedup']:>7.2f}x  {'sí' if r['identical'] else 'NO'}")
+
+        if not all(r['identical'] for r in results):
+            print("\n❌ La lectura por bloques difiere del modo texto")
+            sys.exit(1)
+
+    elif args.command == 'suite':
+        input_sha256 = file_sha256(args.input_file)
+        print(f"⏱️  Suite sobre {args.input_file} (sha256 {input_sha256[:12]})\n")
+        print(f"   {'etapa':<14} {'corte':<5} {'entradas':>8} {'segundos':>9} "
+              f"{'pico RSS (MB)':>14} {'salida (MB)':>12}")
+
+        def show(r):
+            print(f"   {r['stage']:<14} {r['slice']:<5} {r['entries']:>8} {r['seconds']:>9.3f} "
+                  f"{r['peak_rss_bytes'] / 1024 / 1024:>14.1f} {r['output_bytes'] / 1024 / 1024:>12.2f}")
+
+        results = bench_suite(args.input_file, args.stages,
+                              {name: SUITE_SLICES[name] for name in args.slices},
+                              args.repeat, progress_callback=show)
+
+        history = load_history(args.history)
+        regressions = find_regressions(results, history, input_sha256,
+                                       args.threshold, args.min_seconds, args.window)
+
+        if not args.no_record:
+            history.append({
+                'timestamp': datetime.now().isoformat(timespec='seconds'),
+                'commit': _git_commit(),
+                'python': platform.python_version(),
+                'input': {
+                    'file': os.path.basename(args.input_file),
+                    'sha256': input_sha256,
+                    'bytes': os.path.getsize(args.input_file)
+                },
+                'results': results
+            })
+            with open(args.history, 'w', encoding='utf-8') as f:
+                json.dump(history, f, ensure_ascii=False, indent=2)
+            print(f"\n💾 Histórico: {args.history} ({len(history)} ejecuciones)")
+
+        if regressions:
+            print(f"\n❌ {len(regressions)} regresiones (umbral {args.threshold:.0%}):")
+            for r in regressions:
+                print(f"   {r['stage']} {r['slice']} {r['metric']}: "
+                      f"{r['baseline']:.4g} -> {r['value']:.4g} (+{r['change']:.0%})")
+            sys.exit(1)
+        print("\n✅ Sin regresiones")
+
+    elif args.command == 'workers':
+        print(f"⏱️  Parseando {args.input_file} con workers={args.workers}\n")
+        results = bench_workers(args.input_file, args.workers, args.repeat)
+
+        print(f"   {'workers':>7} {'segundos':>9} {'speedup':>8} {'entradas':>9}  idéntico")
+        for r in results:
+            print(f"   {r['workers']:>7} {r['seconds']:>9.3f} {r['speedup']:>7.2f}x "
+                  f"{r['entries']:>9}  {'sí' if r['identical'] else 'NO'}")
+
+        if not all(r['identical'] for r in results):
+            print("\n❌ La salida paralela difiere de la serial")
+            sys.exit(1)
+
+    elif args.command == 'index':
+        print(f"⏱️  Comparando índices sobre {args.input_file}\n")
+        r = bench_index(args.input_file)
+        mb = 1024 * 1024
+        print(f"   Entradas: {r['entries']}, claves: {r['keys']}\n")
+        print(f"   {'':<14} {'dict-of-lists':>14} {'compacto':>10}")
+        print(f"   {'heap (MB)':<14} {r['dict_heap_bytes'] / mb:>14.1f} {r['compact_heap_bytes'] / mb:>10.1f}")
+        print(f"   {'archivo (MB)':<14} {r['json_file_bytes'] / mb:>14.1f} {r['cidx_file_bytes'] / mb:>10.1f}")
+        print(f"   {'carga (s)':<14} {r['json_load_seconds']:>14.4f} {r['cidx_load_seconds']:>10.6f}")
+
+        if not r['identical']:
+            print("\n❌ El índice compacto no coincide con el original")
+            sys.exit(1)
+
+    elif args.command == 'translate':
+        print(f"⏱️  Traduciendo {args.limit} entradas con stub (latencia {args.latency}s)\n")
+        results = bench_translate(args.input_file, args.workers, args.limit,
+                                  args.latency, args.rate, args.pack)
+
+        print(f"   {'workers':>7} {'segundos':>9} {'entradas/s':>11} {'peticiones':>11} {'pet/entrada':>12}")
+        for r in results:
+            print(f"   {r['workers']:>7} {r['seconds']:>9.3f} {r['entries_per_second']:>11.1f} "
+                  f"{r['service_calls']:>11} {r['requests_per_entry']:>12.3f}")
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,193 @@
+#!/usr/bin/env python3
+"""
+Divide el diccionario en tiers por frecuencia para una primera búsqueda rápida
+
+Cada entrada recibe la frecuencia (data/es_50k.txt) de la palabra española
+más frecuente entre las primeras de su primera definición. Las entradas
+se ordenan por esa frecuencia y se reparten en tiers crecientes: un tier
+caliente pequeño con las N más frecuentes y tiers fríos cada vez mayores.
+Cada tier lleva su propio índice en el formato de client_index.py
+(bySimplified, byTraditional, byPinyin normalizado y bySpanish, con las
+mismas reglas que buildSearchIndex en el cliente) y un manifest.json los
+describe. Un tier se carga con loadPrebuiltIndex(tier, tier.entries.length).
+
+Uso:
+    python build_tiers.py cedict_es.json -o ../../public/dictionaries/tiers
+    python build_tiers.py ../../public/dictionaries/spanish_freq.json --hot 200
+"""
+
+import os
+import re
+import json
+import argparse
+from pathlib import Path
+from typing import Dict, List, Tuple
+
+from client_index import build_client_index, client_pinyin_key, write_client_index
+from spanish_text import load_frequencies
+
+DEFAULT_FREQUENCIES = Path(__file__).resolve().parents[2] / 'data' / 'es_50k.txt'
+
+# Palabras de la primera definición que cuentan como "cabeza" de la entrada
+HEADWORDS_PER_ENTRY = 3
+
+_WORD_PATTERN = re.compile(r'[^\W\d_]+')
+
+# Campos que el cliente lee (dictionaryService.formatEntry, búsqueda y orden por frecuencia)
+CLIENT_FIELDS = ('simplified', 'traditional', 'pinyin', 'definitions_es', 'spanish', 'frequency')
+
+# Consultas que detectSearchType trata como pinyin (tonos con número o marca)
+_PINYIN_QUERY = re.compile(r'[1-4]$|[āáǎàēéěèīíǐìōóǒòūúǔùǖǘǚǜ]')
+
+def headwords(entry: Dict) -> List[str]:
+    """Primeras palabras de la primera definición en español"""
+    if entry.get('spanish'):
+        return [entry['spanish'].lower()]
+    definitions = entry.get('definitions_es') or []
+    if not definitions or not definitions[0]:
+        return []
+    # Quitar prefijos entre paréntesis: (fig.), (jerga)...
+    first = re.sub(r'^\s*\([^)]*\)\s*', '', definitions[0])
+    return _WORD_PATTERN.findall(first.lower())[:HEADWORDS_PER_ENTRY]
+
+def entry_frequency(entry: Dict, frequencies: Dict[str, int]) -> int:
+    if entry.get('frequency'):
+        return entry['frequency']
+    return max((frequencies.get(word, 0) for word in headwords(entry)), default=0)
+
+def tier_sizes(total: int, hot: int, growth: int) -> List[int]:
+    """Tamaños de tier: hot, hot*growth, hot*growth^2... hasta cubrir total"""
+    sizes = []
+    size = hot
+    while total > 0:
+        sizes.append(min(size, total))
+        total -= size
+        size *= growth
+    return sizes
+
+def build_tiers(entries: List[Dict], frequencies: Dict[str, int],
+                output_dir: str, hot: int = 2000, growth: int = 4) -> Tuple[Dict, List[Dict]]:
+    """
+    Escribe tier0.json, tier1.json... y manifest.json en output_dir
+
+    Returns:
+        (manifest, índices de cliente de cada tier: nombre -> clave -> posiciones)
+    """
+    os.makedirs(output_dir, exist_ok=True)
+
+    scored = sorted(
+        ((entry_frequency(entry, frequencies), i, entry) for i, entry in enumerate(entries)),
+        key=lambda item: (-item[0], item[1])
+    )
+
+    manifest = {'source_entries': len(entries), 'tiers': []}
+    tier_indexes = []
+    start = 0
+    for tier, size in enumerate(tier_sizes(len(scored), hot, growth)):
+        chunk = scored[start:start + size]
+        start += size
+
+        tier_entries = [{field: entry[field] for field in CLIENT_FIELDS if field in entry}
+                        for _, _, entry in chunk]
+        builder = build_client_index(tier_entries)
+        tier_indexes.append(builder.index)
+
+        filename = f'tier{tier}.json'
+        path = os.path.join(output_dir, filename)
+        write_client_index(builder, path, {'tier': tier}, {
+            'entries': tier_entries,
+            # Posiciones en el diccionario original, para mapear resultados
+            'source_indices': [i for _, i, _ in chunk]
+        })
+
+        manifest['tiers'].append({
+            'tier': tier,
+            'file': filename,
+            'entries': len(tier_entries),
+            'bytes': os.path.getsize(path),
+            'max_frequency': chunk[0][0],
+            'min_frequency': chunk[-1][0]
+        })
+
+    with open(os.path.join(output_dir, 'manifest.json'), 'w', encoding='utf-8') as f:
+        json.dump(manifest, f, ensure_ascii=False, separators=(',', ':'))
+
+    return manifest, tier_indexes
+
+def query_key(query: str) -> Tuple[str, str]:
+    """(tabla, clave) que busca el cliente para una consulta"""
+    if _PINYIN_QUERY.search(query):
+        return 'byPinyin', client_pinyin_key(query)
+    return 'bySpanish', query
+
+def query_coverage(tier_indexes: List[Dict], queries: Dict[str, int]) -> List[float]:
+    """
+    Fracción acumulada de consultas que se responden con los tiers 0..k
+
+    Una consulta cuenta para el primer tier cuyo índice la encuentra (chino
+    en bySimplified/byTraditional, pinyin con tonos en byPinyin, el resto
+    en bySpanish), igual que la buscaría el cliente.
+
+    Args:
+        tier_indexes: Índices de cada tier (ver build_tiers)
+        queries: Consulta -> peso (nº de veces consultada o frecuencia de uso)
+    """
+    total = sum(queries.values()) or 1
+    covered = [0] * len(tier_indexes)
+    for query, weight in queries.items():
+        table, key = query_key(query)
+        for tier, index in enumerate(tier_indexes):
+            if (key in index[table] or query in index['bySimplified'] or
+                    query in index['byTraditional']):
+                covered[tier] += weight
+                break
+
+    cumulative, running = [], 0
+    for weight in covered:
+        running += weight
+        cumulative.append(running / total)
+    return cumulative
+
+def load_queries(filepath: str) -> Dict[str, int]:
+    """Log de consultas: una por línea"""
+    queries = {}
+    with open(filepath, 'r', encoding='utf-8') as f:
+        for line in f:
+            query = line.strip().lower()
+            if query:
+                queries[query] = queries.get(query, 0) + 1
+    return queries
+
+def main():
+    parser = argparse.ArgumentParser(
+        description='Divide el diccionario en tiers por frecuencia'
+    )
+    parser.add_argument('input_file', help='Diccionario traducido (cedict_es.json o spanish_freq.json)')
+    parser.add_argument('-o', '--output-dir', default='tiers', help='Directorio de salida (default: tiers)')
+    parser.add_argument('-f', '--frequencies', default=str(DEFAULT_FREQUENCIES),
+                        help='Lista de frecuencias (default: data/es_50k.txt)')
+    parser.add_argument('--hot', type=int, default=2000, help='Entradas del tier caliente (default: 2000)')
+    parser.add_argument('--growth', type=int, default=4, help='Factor de crecimiento entre tiers (default: 4)')
+    parser.add_argument('-q', '--queries', help='Log de consultas reales para medir cobertura '
+                                                '(default: usar las frecuencias como consultas)')
+
+    args = parser.parse_args()
+
+    print(f"📖 Cargando {args.input_file}...")
+    with open(args.input_file, 'r', encoding='utf-8') as f:
+        entries = json.load(f).get('entries', [])
+    frequencies = dict(load_frequencies(args.frequencies))
+    print(f"   Entradas: {len(entries)}, palabras con frecuencia: {len(frequencies)}")
+
+    manifest, tier_indexes = build_tiers(entries, frequencies, args.output_dir, args.hot, args.growth)
+
+    queries = load_queries(args.queries) if args.queries else frequencies
+    coverage = query_coverage(tier_indexes, queries)
+
+    print(f"\n📦 Tiers en {args.output_dir}:")
+    for tier, covered in zip(manifest['tiers'], coverage):
+        print(f"   {tier['file']:<12} {tier['entries']:>7} entradas {tier['bytes'] / 1024:>9.1f} KB "
+              f"   cobertura acumulada: {covered:.1%}")
+
+if __name__ == '__main__':
+    main()
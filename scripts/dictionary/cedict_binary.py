@@ -0,0 +1,268 @@
+#!/usr/bin/env python3
+"""
+Formato binario compacto para el CC-CEDICT parseado (.cedb)
+
+Permite búsquedas por simplificado/tradicional/pinyin abriendo el archivo
+con mmap, sin deserializar el diccionario completo.
+
+Estructura (little-endian):
+    cabecera    magic 'CEDB', versión, nº de entradas, nº de claves pinyin
+                y offsets de cada sección
+    entradas    registro fijo por entrada: 6 pares (offset, longitud) en el
+                pool para traditional, simplified, pinyin, pinyin_tones,
+                definitions y classifiers (listas unidas con \\x1f)
+    tablas      por simplified, traditional y pinyin: (offset, longitud,
+                índice de entrada) ordenados por bytes de la clave
+    pool        cadenas UTF-8 deduplicadas
+
+Uso:
+    python cedict_binary.py build cedict_ts_parsed.json cedict_ts.cedb
+    python cedict_binary.py lookup cedict_ts.cedb 你好
+"""
+
+import sys
+import json
+import mmap
+import struct
+import argparse
+from bisect import bisect_left, bisect_right
+from pathlib import Path
+from typing import Dict, Iterable, Iterator, List
+
+MAGIC = b'CEDB'
+VERSION = 1
+LIST_SEPARATOR = '\x1f'
+
+FIELDS = ('traditional', 'simplified', 'pinyin', 'pinyin_tones', 'definitions', 'classifiers')
+LIST_FIELDS = ('definitions', 'classifiers')
+
+# magic, versión, reservado, entradas, claves pinyin, offsets de secciones
+HEADER = struct.Struct('<4sHHII6Q')
+ENTRY = struct.Struct('<12I')
+KEY = struct.Struct('<3I')
+
+TABLES = ('by_simplified', 'by_traditional', 'by_pinyin')
+
+def pinyin_key(pinyin: str) -> str:
+    """Misma normalización que el índice by_pinyin de cedict_parser"""
+    return pinyin.lower().replace(' ', '')
+
+class _StringPool:
+    """Pool de cadenas UTF-8 deduplicadas"""
+
+    def __init__(self):
+        self.data = bytearray()
+        self.offsets = {}
+
+    def add(self, text: str):
+        ref = self.offsets.get(text)
+        if ref is None:
+            encoded = text.encode('utf-8')
+            ref = (len(self.data), len(encoded))
+            self.data += encoded
+            self.offsets[text] = ref
+        return ref
+
+def write_binary(entries: Iterable[Dict], output_path: str) -> Dict:
+    """
+    Escribe las entradas en formato .cedb
+
+    Returns:
+        Dict con 'entries_count', 'size' y la primera entrada ('first')
+    """
+    pool = _StringPool()
+    records = bytearray()
+    keys = {name: [] for name in TABLES}
+    count = 0
+    first = None
+
+    for entry in entries:
+        refs = []
+        for field in FIELDS:
+            value = entry.get(field, [] if field in LIST_FIELDS else '')
+            if field in LIST_FIELDS:
+                value = LIST_SEPARATOR.join(value)
+            refs.append(pool.add(value))
+
+        records += ENTRY.pack(*(n for ref in refs for n in ref))
+        keys['by_traditional'].append((entry['traditional'], count))
+        keys['by_simplified'].append((entry['simplified'], count))
+        keys['by_pinyin'].append((pinyin_key(entry['pinyin']), count))
+
+        if first is None:
+            first = entry
+        count += 1
+
+    tables = {}
+    for name in TABLES:
+        table = bytearray()
+        refs = [(pool.add(key), i) for key, i in keys[name]]
+        refs.sort(key=lambda item: (pool.data[item[0][0]:item[0][0] + item[0][1]], item[1]))
+        for (offset, length), i in refs:
+            table += KEY.pack(offset, length, i)
+        tables[name] = table
+
+    entries_offset = HEADER.size
+    simplified_offset = entries_offset + len(records)
+    traditional_offset = simplified_offset + len(tables['by_simplified'])
+    pinyin_offset = traditional_offset + len(tables['by_traditional'])
+    pool_offset = pinyin_offset + len(tables['by_pinyin'])
+
+    with open(output_path, 'wb') as f:
+        f.write(HEADER.pack(
+            MAGIC, VERSION, 0, count, len(keys['by_pinyin']),
+            entries_offset, simplified_offset, traditional_offset,
+            pinyin_offset, pool_offset, len(pool.data)
+        ))
+        f.write(records)
+        for name in TABLES:
+            f.write(tables[name])
+        f.write(pool.data)
+
+    return {
+        'entries_count': count,
+        'size': pool_offset + len(pool.data),
+        'first': first
+    }
+
+class _KeyColumn:
+    """Vista ordenada de las claves de una tabla, apta para bisect"""
+
+    def __init__(self, reader: 'CedictBinary', offset: int, count: int):
+        self.reader = reader
+        self.offset = offset
+        self.count = count
+
+    def __len__(self):
+        return self.count
+
+    def __getitem__(self, i: int) -> bytes:
+        offset, length, _ = KEY.unpack_from(self.reader.buffer, self.offset + i * KEY.size)
+        return self.reader.pool_bytes(offset, length)
+
+    def entry_index(self, i: int) -> int:
+        return KEY.unpack_from(self.reader.buffer, self.offset + i * KEY.size)[2]
+
+class CedictBinary:
+    """
+    Lector de archivos .cedb mediante mmap
+
+    Solo se decodifican las entradas consultadas:
+
+        with CedictBinary('cedict_ts.cedb') as cedict:
+            cedict.by_simplified('你好')
+    """
+
+    def __init__(self, filepath: str):
+        self._file = open(filepath, 'rb')
+        self.buffer = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ)
+
+        (magic, version, _, self.entries_count, _,
+         self._entries_offset, simplified_offset, traditional_offset,
+         pinyin_offset, self._pool_offset, _) = HEADER.unpack_from(self.buffer, 0)
+
+        if magic != MAGIC:
+            raise ValueError(f"{filepath} no es un archivo .cedb")
+        if version != VERSION:
+            raise ValueError(f"Versión .cedb no soportada: {version}")
+
+        self._tables = {
+            'by_simplified': _KeyColumn(self, simplified_offset, self.entries_count),
+            'by_traditional': _KeyColumn(self, traditional_offset, self.entries_count),
+            'by_pinyin': _KeyColumn(self, pinyin_offset, self.entries_count),
+        }
+
+    def pool_bytes(self, offset: int, length: int) -> bytes:
+        start = self._pool_offset + offset
+        return self.buffer[start:start + length]
+
+    def _pool_str(self, offset: int, length: int) -> str:
+        return self.pool_bytes(offset, length).decode('utf-8')
+
+    def entry(self, i: int) -> Dict:
+        """Devuelve la entrada i con el mismo formato que cedict_parser"""
+        if not 0 <= i < self.entries_count:
+            raise IndexError(i)
+
+        values = ENTRY.unpack_from(self.buffer, self._entries_offset + i * ENTRY.size)
+        entry = {}
+        for n, field in enumerate(FIELDS):
+            text = self._pool_str(values[2 * n], values[2 * n + 1])
+            if field in LIST_FIELDS:
+                entry[field] = text.split(LIST_SEPARATOR) if text else []
+            else:
+                entry[field] = text
+        return entry
+
+    def lookup_indices(self, table: str, key: str) -> List[int]:
+        """Índices de las entradas cuya clave coincide exactamente"""
+        column = self._tables[table]
+        target = key.encode('utf-8')
+        lo = bisect_left(column, target)
+        hi = bisect_right(column, target, lo)
+        return [column.entry_index(i) for i in range(lo, hi)]
+
+    def by_simplified(self, simplified: str) -> List[Dict]:
+        return [self.entry(i) for i in self.lookup_indices('by_simplified', simplified)]
+
+    def by_traditional(self, traditional: str) -> List[Dict]:
+        return [self.entry(i) for i in self.lookup_indices('by_traditional', traditional)]
+
+    def by_pinyin(self, pinyin: str) -> List[Dict]:
+        """Acepta pinyin con marcas, con o sin espacios (ej: 'nǐ hǎo')"""
+        return [self.entry(i) for i in self.lookup_indices('by_pinyin', pinyin_key(pinyin))]
+
+    def __len__(self):
+        return self.entries_count
+
+    def __iter__(self) -> Iterator[Dict]:
+        for i in range(self.entries_count):
+            yield self.entry(i)
+
+    def close(self):
+        self.buffer.close()
+        self._file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+def main():
+    parser = argparse.ArgumentParser(
+        description='Formato binario .cedb para CC-CEDICT parseado'
+    )
+    subparsers = parser.add_subparsers(dest='command', required=True)
+
+    build_parser = subparsers.add_parser('build', help='Convierte *_parsed.json a .cedb')
+    build_parser.add_argument('input_file', help='JSON generado por cedict_parser.py')
+    build_parser.add_argument('output_file', nargs='?', help='Archivo .cedb (default: <input>.cedb)')
+
+    lookup_parser = subparsers.add_parser('lookup', help='Busca por chino o pinyin')
+    lookup_parser.add_argument('cedb_file')
+    lookup_parser.add_argument('query')
+
+    args = parser.parse_args()
+
+    if args.command == 'build':
+        with open(args.input_file, 'r', encoding='utf-8') as f:
+            entries = json.load(f)['entries']
+        output_path = args.output_file or str(Path(args.input_file).with_suffix('.cedb'))
+        result = write_binary(entries, output_path)
+        print(f"Entradas: {result['entries_count']}")
+        print(f"Guardado en: {output_path} ({result['size'] / 1024:.1f} KB)")
+
+    elif args.command == 'lookup':
+        with CedictBinary(args.cedb_file) as cedict:
+            results = (cedict.by_simplified(args.query) or
+                       cedict.by_traditional(args.query) or
+                       cedict.by_pinyin(args.query))
+        if not results:
+            print("Sin resultados")
+            sys.exit(1)
+        for entry in results:
+            print(json.dumps(entry, ensure_ascii=False))
+
+if __name__ == '__main__':
+    main()
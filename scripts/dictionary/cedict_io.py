@@ -0,0 +1,127 @@
+#!/usr/bin/env python3
+"""
+Lectura por bloques de CC-CEDICT (.txt o .txt.gz)
+
+En lugar de gzip.open(..., 'rt') línea a línea, descomprime bloques
+grandes con zlib (o con python-isal si está instalado, 2-3x más rápido)
+y entrega las líneas como bytes; el parser decodifica solo los campos
+que usa.
+
+Caché de descompresión: con decompressed_cache=True el .gz se
+descomprime una vez a <archivo>.txt (junto al original) y las lecturas
+siguientes leen ese archivo mientras sea más reciente que el .gz.
+"""
+
+import os
+import zlib
+from pathlib import Path
+from typing import Iterator, List, Optional
+
+# Backend zlib opcional más rápido (pip install isal)
+try:
+    from isal import isal_zlib
+    ISAL_AVAILABLE = True
+except ImportError:
+    ISAL_AVAILABLE = False
+
+BLOCK_SIZE = 1 << 20
+
+# wbits para zlib: cabecera gzip
+_GZIP_WBITS = 31
+
+def decompressed_cache_path(filepath: str) -> Path:
+    """cedict.txt.gz -> cedict.txt"""
+    path = Path(filepath)
+    return path.with_suffix('') if path.suffix == '.gz' else path
+
+def _cache_is_fresh(path: Path, cache_path: Path) -> bool:
+    return (cache_path.exists() and
+            cache_path.stat().st_mtime >= path.stat().st_mtime)
+
+def _iter_file_blocks(path: Path, block_size: int) -> Iterator[bytes]:
+    with open(path, 'rb') as f:
+        for block in iter(lambda: f.read(block_size), b''):
+            yield block
+
+def _iter_gzip_blocks(path: Path, block_size: int, backend: str) -> Iterator[bytes]:
+    """Descomprime bloques; soporta archivos con varios miembros gzip"""
+    module = isal_zlib if backend == 'isal' else zlib
+    decompressor = module.decompressobj(_GZIP_WBITS)
+    with open(path, 'rb') as f:
+        for raw in iter(lambda: f.read(block_size), b''):
+            while raw:
+                block = decompressor.decompress(raw)
+                if block:
+                    yield block
+                if not decompressor.eof:
+                    break
+                # Fin de un miembro: el resto pertenece al siguiente
+                raw = decompressor.unused_data
+                decompressor = module.decompressobj(_GZIP_WBITS)
+        tail = decompressor.flush()
+        if tail:
+            yield tail
+
+def iter_blocks(filepath: str, block_size: int = BLOCK_SIZE,
+                backend: Optional[str] = None,
+                decompressed_cache: bool = False) -> Iterator[bytes]:
+    """
+    Bloques de bytes descomprimidos del archivo
+
+    Args:
+        backend: 'zlib', 'isal' o None (isal si está instalado)
+        decompressed_cache: Usar/crear <archivo>.txt descomprimido junto al .gz
+    """
+    path = Path(filepath)
+    if path.suffix != '.gz':
+        yield from _iter_file_blocks(path, block_size)
+        return
+
+    if backend is None:
+        backend = 'isal' if ISAL_AVAILABLE else 'zlib'
+    elif backend == 'isal' and not ISAL_AVAILABLE:
+        raise ValueError("Backend isal no disponible: pip install isal")
+
+    if not decompressed_cache:
+        yield from _iter_gzip_blocks(path, block_size, backend)
+        return
+
+    cache_path = decompressed_cache_path(filepath)
+    if _cache_is_fresh(path, cache_path):
+        yield from _iter_file_blocks(cache_path, block_size)
+        return
+
+    # Escribir la caché mientras se lee; se publica solo si se leyó completa
+    temp_path = cache_path.with_name(cache_path.name + '.tmp')
+    complete = False
+    try:
+        with open(temp_path, 'wb') as cache:
+            for block in _iter_gzip_blocks(path, block_size, backend):
+                cache.write(block)
+                yield block
+        complete = True
+    finally:
+        if complete:
+            os.replace(temp_path, cache_path)
+        elif temp_path.exists():
+            os.unlink(temp_path)
+
+def split_lines(data: bytes) -> List[bytes]:
+    """
+    Parte en líneas con saltos universales (\\n, \\r\\n y \\r), como el modo texto
+
+    Un \\r\\n partido entre dos bloques produce a lo sumo una línea vacía extra.
+    """
+    if b'\r' in data:
+        data = data.replace(b'\r\n', b'\n').replace(b'\r', b'\n')
+    return data.split(b'\n')
+
+def iter_lines(blocks: Iterator[bytes]) -> Iterator[bytes]:
+    """Líneas (sin el salto final) a partir de bloques de bytes"""
+    rest = b''
+    for block in blocks:
+        lines = split_lines(rest + block if rest else block)
+        rest = lines.pop()
+        yield from lines
+    if rest:
+        yield rest
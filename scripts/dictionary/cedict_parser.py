@@ -5,13 +5,25 @@ Formato de entrada: tradicional simplificado [pinyin] /definiciones/
 Ejemplo: 漢字 汉字 [han4 zi4] /Chinese character/CL:個|个/
 """
 
+import os
 import re
+import sys
 import json
 import gzip
+import argparse
+import tempfile
+from multiprocessing import Pool
 from pathlib import Path
-from typing import Dict, List, Optional
+from typing import Dict, Iterable, Iterator, List, Optional, Tuple
 from dataclasses import dataclass, asdict
 
+from pinyin_tones import numbered_to_marked
+from cedict_io import decompressed_cache_path, iter_blocks, iter_lines, split_lines
+from cedict_binary import write_binary
+from compact_index import CompactIndex
+from substring_index import SubstringIndexBuilder
+from pipeline_metrics import METRICS, add_arguments as add_metrics_arguments, enable_from_args
+
 @dataclass
 class DictionaryEntry:
     """Representa una entrada del diccionario"""
@@ -27,66 +39,29 @@ def parse_pinyin_numbers(pinyin_with_numbers: str) -> str:
     Convierte pinyin con números a pinyin con marcas de tono
     Ejemplo: han4 zi4 -> hàn zì
     """
-    tone_marks = {
-        'a': ['ā', 'á', 'ǎ', 'à', 'a'],
-        'e': ['ē', 'é', 'ě', 'è', 'e'],
-        'i': ['ī', 'í', 'ǐ', 'ì', 'i'],
-        'o': ['ō', 'ó', 'ǒ', 'ò', 'o'],
-        'u': ['ū', 'ú', 'ǔ', 'ù', 'u'],
-        'ü': ['ǖ', 'ǘ', 'ǚ', 'ǜ', 'ü'],
-        'v': ['ǖ', 'ǘ', 'ǚ', 'ǜ', 'ü'],  # v se usa como ü en algunos sistemas
-    }
-
-    def convert_syllable(syllable: str) -> str:
-        """Convierte una sílaba individual"""
-        if not syllable:
-            return syllable
-
-        # Extraer el número de tono (1-5, donde 5 es tono neutro)
-        match = re.match(r'([a-züv]+)([1-5])?', syllable.lower())
-        if not match:
-            return syllable
-
-        letters = match.group(1)
-        tone = int(match.group(2)) if match.group(2) else 5
+    return numbered_to_marked(pinyin_with_numbers)
 
-        # Reglas para colocar la marca de tono:
-        # 1. Si hay 'a' o 'e', va ahí
-        # 2. Si hay 'ou', va en la 'o'
-        # 3. En otros casos, va en la última vocal
-
-        result = list(letters)
-        vowel_positions = [(i, c) for i, c in enumerate(letters) if c in 'aeiouüv']
-
-        if not vowel_positions:
-            return syllable
-
-        # Determinar posición de la marca
-        tone_pos = None
-        for i, v in vowel_positions:
-            if v in 'ae':
-                tone_pos = i
-                break
+# Regex para extraer componentes
+# Ejemplo: 漢字 汉字 [han4 zi4] /Chinese character/CL:個|个/
+_LINE_PATTERN = re.compile(r'^(\S+)\s+(\S+)\s+\[([^\]]+)\]\s+/(.+)/$')
+_LINE_PATTERN_BYTES = re.compile(rb'^(\S+)\s+(\S+)\s+\[([^\]]+)\]\s+/(.+)/$')
 
-        if tone_pos is None:
-            # Buscar 'ou'
-            if 'ou' in letters:
-                tone_pos = letters.index('o')
-            else:
-                # Última vocal
-                tone_pos = vowel_positions[-1][0]
-
-        # Aplicar marca de tono
-        vowel = result[tone_pos]
-        if vowel in tone_marks:
-            result[tone_pos] = tone_marks[vowel][tone - 1]
+def _split_definitions(definitions_raw: str) -> Tuple[List[str], List[str]]:
+    """Separa definiciones y clasificadores (CL:...)"""
+    definitions = []
+    classifiers = []
 
-        return ''.join(result)
+    for defn in definitions_raw.split('/'):
+        defn = defn.strip()
+        if not defn:
+            continue
+        # Detectar clasificadores (CL:...)
+        if defn.startswith('CL:'):
+            classifiers.append(defn[3:])
+        else:
+            definitions.append(defn)
 
-    # Separar en sílabas y convertir cada una
-    syllables = pinyin_with_numbers.split()
-    converted = [convert_syllable(s) for s in syllables]
-    return ' '.join(converted)
+    return definitions, classifiers
 
 def parse_cedict_line(line: str) -> Optional[DictionaryEntry]:
     """
@@ -98,10 +73,7 @@ def parse_cedict_line(line: str) -> Optional[DictionaryEntry]:
     if not line or line.startswith('#'):
         return None
 
-    # Regex para extraer componentes
-    # Ejemplo: 漢字 汉字 [han4 zi4] /Chinese character/CL:個|个/
-    pattern = r'^(\S+)\s+(\S+)\s+\[([^\]]+)\]\s+/(.+)/$'
-    match = re.match(pattern, line)
+    match = _LINE_PATTERN.match(line)
 
     if not match:
         return None
@@ -109,21 +81,7 @@ def parse_cedict_line(line: str) -> Optional[DictionaryEntry]:
     traditional = match.group(1)
     simplified = match.group(2)
     pinyin_numbers = match.group(3)
-    definitions_raw = match.group(4)
-
-    # Separar definiciones
-    definitions = []
-    classifiers = []
-
-    for defn in definitions_raw.split('/'):
-        defn = defn.strip()
-        if not defn:
-            continue
-        # Detectar clasificadores (CL:...)
-        if defn.startswith('CL:'):
-            classifiers.append(defn[3:])
-        else:
-            definitions.append(defn)
+    definitions, classifiers = _split_definitions(match.group(4))
 
     # Convertir pinyin a formato con marcas
     pinyin_marked = parse_pinyin_numbers(pinyin_numbers)
@@ -137,6 +95,94 @@ def parse_cedict_line(line: str) -> Optional[DictionaryEntry]:
         classifiers=classifiers
     )
 
+def parse_cedict_bytes(line: bytes) -> Optional[Dict]:
+    """
+    Como asdict(parse_cedict_line(...)), pero sobre la línea en bytes
+
+    La regex trabaja con bytes y solo se decodifican los cuatro campos.
+    Si los caracteres chinos incluyen espacios Unicode (que la regex en
+    bytes no reconoce), se usa el parser de texto para dar el mismo resultado.
+    """
+    line = line.strip()
+    if not line or line[:1] == b'#':
+        return None
+
+    match = _LINE_PATTERN_BYTES.match(line)
+    if not match:
+        entry = parse_cedict_line(line.decode('utf-8'))
+        return asdict(entry) if entry else None
+
+    traditional = match.group(1).decode('utf-8')
+    simplified = match.group(2).decode('utf-8')
+    if any(c.isspace() for c in traditional + simplified):
+        entry = parse_cedict_line(line.decode('utf-8'))
+        return asdict(entry) if entry else None
+
+    pinyin_numbers = match.group(3).decode('utf-8')
+    definitions, classifiers = _split_definitions(match.group(4).decode('utf-8'))
+
+    # Mismas claves y orden que asdict(DictionaryEntry)
+    return {
+        'traditional': traditional,
+        'simplified': simplified,
+        'pinyin': parse_pinyin_numbers(pinyin_numbers),
+        'pinyin_tones': pinyin_numbers,
+        'definitions': definitions,
+        'classifiers': classifiers
+    }
+
+def _open_cedict(path: Path):
+    """Abre el archivo CC-CEDICT en modo texto (plano o .gz)"""
+    if path.suffix == '.gz':
+        return gzip.open(path, 'rt', encoding='utf-8')
+    return open(path, 'r', encoding='utf-8')
+
+def iter_cedict_entries(filepath: str, limit: Optional[int] = None) -> Iterator[Dict]:
+    """
+    Itera las entradas del archivo CC-CEDICT sin acumularlas en memoria
+
+    Args:
+        filepath: Ruta al archivo .txt o .txt.gz
+        limit: Límite de entradas (None = todas)
+
+    Yields:
+        Diccionarios con las entradas, en el orden del archivo
+    """
+    count = 0
+    path = Path(filepath)
+    with _open_cedict(path) as f:
+        # Con métricas: tiempo de lectura (y descompresión) línea a línea
+        for line in METRICS.timed_iter(f, 'decompress' if path.suffix == '.gz' else 'read'):
+            if limit and count >= limit:
+                break
+
+            entry = parse_cedict_line(line)
+            if entry:
+                count += 1
+                yield asdict(entry)
+
+def iter_cedict_entries_bulk(filepath: str, limit: Optional[int] = None,
+                             backend: Optional[str] = None,
+                             decompressed_cache: bool = False) -> Iterator[Dict]:
+    """
+    Como iter_cedict_entries, leyendo por bloques de bytes (ver cedict_io.py)
+
+    Args:
+        backend: Descompresor del .gz: 'zlib', 'isal' o None (el más rápido disponible)
+        decompressed_cache: Leer/crear la copia descomprimida junto al .gz
+    """
+    count = 0
+    blocks = iter_blocks(filepath, backend=backend, decompressed_cache=decompressed_cache)
+    # Con métricas: tiempo de lectura y descompresión por bloque
+    for line in iter_lines(METRICS.timed_iter(blocks, 'decompress')):
+        if limit and count >= limit:
+            break
+
+        entry = parse_cedict_bytes(line)
+        if entry:
+            count += 1
+            yield entry
+
 def parse_cedict_file(filepath: str, limit: Optional[int] = None) -> List[Dict]:
     """
     Parsea el archivo CC-CEDICT completo
@@ -148,103 +194,401 @@ def parse_cedict_file(filepath: str, limit: Optional[int] = None) -> List[Dict]:
     Returns:
         Lista de diccionarios con las entradas
     """
-    entries = []
-    path = Path(filepath)
+    return list(iter_cedict_entries_bulk(filepath, limit))
 
-    # Determinar si es gzip
-    if path.suffix == '.gz':
-        open_func = lambda p: gzip.open(p, 'rt', encoding='utf-8')
-    else:
-        open_func = lambda p: open(p, 'r', encoding='utf-8')
+def split_line_ranges(filepath: str, n_ranges: int) -> List[Tuple[int, int]]:
+    """
+    Divide un archivo plano en rangos de bytes alineados a inicio de línea
 
-    with open_func(path) as f:
-        for line in f:
-            if limit and len(entries) >= limit:
+    Returns:
+        Lista de tuplas (inicio, fin) contiguas que cubren todo el archivo
+    """
+    size = os.path.getsize(filepath)
+    boundaries = [0]
+
+    with open(filepath, 'rb') as f:
+        for k in range(1, n_ranges):
+            f.seek(size * k // n_ranges)
+            f.readline()  # Avanzar hasta el inicio de la siguiente línea
+            pos = f.tell()
+            if pos >= size:
                 break
+            if pos > boundaries[-1]:
+                boundaries.append(pos)
 
-            entry = parse_cedict_line(line)
-            if entry:
-                entries.append(asdict(entry))
+    boundaries.append(size)
+    return list(zip(boundaries, boundaries[1:]))
 
+def _parse_line_range(task: Tuple[str, int, int]) -> List[Dict]:
+    """Worker: parsea las líneas de un rango de bytes (ver split_line_ranges)"""
+    filepath, start, end = task
+    with open(filepath, 'rb') as f:
+        f.seek(start)
+        data = f.read(end - start)
+
+    entries = []
+    for line in split_lines(data):
+        entry = parse_cedict_bytes(line)
+        if entry:
+            entries.append(entry)
     return entries
 
-def create_search_index(entries: List[Dict]) -> Dict:
+def iter_cedict_entries_parallel(filepath: str,
+                                 workers: int,
+                                 limit: Optional[int] = None,
+                                 ranges_per_worker: int = 4,
+                                 backend: Optional[str] = None,
+                                 decompressed_cache: bool = False) -> Iterator[Dict]:
     """
-    Crea índices de búsqueda para acceso rápido
+    Como iter_cedict_entries, pero parsea rangos del archivo en un pool de procesos
 
-    Returns:
-        Dict con índices por: simplified, traditional, pinyin
+    Los .gz se descomprimen primero (a un archivo temporal, o a la caché
+    de descompresión si se pide) para poder repartir rangos de bytes. Los
+    resultados se emiten en el orden original, así que la salida es
+    idéntica a la del modo serial.
+
+    Con limit se usa el modo serial: se detiene en cuanto llega al límite,
+    mientras que el pool descomprimiría y parsearía el archivo entero.
     """
-    index = {
-        'by_simplified': {},
-        'by_traditional': {},
-        'by_pinyin': {},
-        'by_definition': {}  # Para búsqueda inversa (español -> chino)
-    }
+    if limit:
+        yield from iter_cedict_entries_bulk(filepath, limit, backend, decompressed_cache)
+        return
+
+    path = Path(filepath)
+    temp_path = None
+
+    if path.suffix == '.gz' and decompressed_cache:
+        with METRICS.stage('decompress'):
+            for _ in iter_blocks(filepath, backend=backend, decompressed_cache=True):
+                pass
+        plain_path = str(decompressed_cache_path(filepath))
+    elif path.suffix == '.gz':
+        with METRICS.stage('decompress'), \
+                tempfile.NamedTemporaryFile(suffix='.txt', delete=False) as dst:
+            for block in iter_blocks(filepath, backend=backend):
+                dst.write(block)
+            temp_path = dst.name
+        plain_path = temp_path
+    else:
+        plain_path = str(path)
+
+    try:
+        ranges = split_line_ranges(plain_path, workers * ranges_per_worker)
+        tasks = [(plain_path, start, end) for start, end in ranges]
+        count = 0
+
+        with Pool(workers) as pool:
+            # imap conserva el orden de los rangos; las métricas por línea
+            # quedan en los workers, aquí solo se mide la espera de resultados
+            for chunk in METRICS.timed_iter(pool.imap(_parse_line_range, tasks), 'parse_workers'):
+                for entry in chunk:
+                    if limit and count >= limit:
+                        return
+                    count += 1
+                    yield entry
+    finally:
+        if temp_path:
+            os.unlink(temp_path)
+
+def iter_entries(filepath: str, limit: Optional[int] = None, workers: int = 1,
+                 backend: Optional[str] = None, decompressed_cache: bool = False) -> Iterator[Dict]:
+    """Elige el modo serial o paralelo según el número de workers"""
+    if workers > 1:
+        return iter_cedict_entries_parallel(filepath, workers, limit, backend=backend,
+                                            decompressed_cache=decompressed_cache)
+    return iter_cedict_entries_bulk(filepath, limit, backend, decompressed_cache)
+
+class SearchIndexBuilder:
+    """
+    Construye los índices de búsqueda entrada por entrada, de modo que
+    puedan alimentarse desde la misma pasada que parsea o escribe el archivo
+    """
+
+    def __init__(self):
+        self.count = 0
+        self.index = {
+            'by_simplified': {},
+            'by_traditional': {},
+            'by_pinyin': {},
+            'by_definition': {}  # Para búsqueda inversa (español -> chino)
+        }
+
+    def add(self, entry: Dict) -> int:
+        """Indexa una entrada y devuelve su posición"""
+        i = self.count
 
-    for i, entry in enumerate(entries):
         # Índice por caracteres simplificados
-        simp = entry['simplified']
-        if simp not in index['by_simplified']:
-            index['by_simplified'][simp] = []
-        index['by_simplified'][simp].append(i)
+        self.index['by_simplified'].setdefault(entry['simplified'], []).append(i)
 
         # Índice por caracteres tradicionales
-        trad = entry['traditional']
-        if trad not in index['by_traditional']:
-            index['by_traditional'][trad] = []
-        index['by_traditional'][trad].append(i)
+        self.index['by_traditional'].setdefault(entry['traditional'], []).append(i)
 
         # Índice por pinyin (normalizado)
         pinyin_key = entry['pinyin'].lower().replace(' ', '')
-        if pinyin_key not in index['by_pinyin']:
-            index['by_pinyin'][pinyin_key] = []
-        index['by_pinyin'][pinyin_key].append(i)
+        self.index['by_pinyin'].setdefault(pinyin_key, []).append(i)
 
-    return index
+        self.count += 1
+        return i
 
-def main():
-    """Ejemplo de uso"""
-    import sys
+def create_search_index(entries: Iterable[Dict]) -> Dict:
+    """
+    Crea índices de búsqueda para acceso rápido
 
-    if len(sys.argv) < 2:
-        print("Uso: python cedict_parser.py <archivo_cedict> [limite]")
-        print("Ejemplo: python cedict_parser.py cedict_ts.u8 1000")
-        sys.exit(1)
+    Returns:
+        Dict con índices por: simplified, traditional, pinyin
+    """
+    builder = SearchIndexBuilder()
+    for entry in entries:
+        builder.add(entry)
+    return builder.index
+
+def build_metadata(entries_count: int) -> Dict:
+    """Metadatos del archivo parseado"""
+    return {
+        'source': 'CC-CEDICT',
+        'entries_count': entries_count,
+        'language_from': 'en',
+        'language_to': 'zh'
+    }
 
-    filepath = sys.argv[1]
-    limit = int(sys.argv[2]) if len(sys.argv) > 2 else None
+def write_json_stream(entries: Iterable[Dict], output_path: str,
+                      include_index: bool = True) -> Dict:
+    """
+    Escribe el JSON parseado entrada por entrada (memoria constante)
 
-    print(f"Parseando {filepath}...")
-    entries = parse_cedict_file(filepath, limit)
-    print(f"Entradas parseadas: {len(entries)}")
-
-    # Crear índice
-    print("Creando índices de búsqueda...")
-    index = create_search_index(entries)
-
-    # Guardar resultado
-    output = {
-        'metadata': {
-            'source': 'CC-CEDICT',
-            'entries_count': len(entries),
-            'language_from': 'en',
-            'language_to': 'zh'
-        },
-        'entries': entries,
-        'index': index
-    }
+    Las entradas se serializan a medida que llegan, una por línea, y el
+    índice se construye en la misma pasada. Como el total no se conoce
+    hasta el final, 'metadata' se escribe después de 'entries' e 'index'.
+
+    Returns:
+        Dict con 'metadata', 'index' y la primera entrada escrita ('first')
+    """
+    builder = SearchIndexBuilder()
+    first = None
+    dumps = METRICS.timed(json.dumps, 'serialize')
+
+    with open(output_path, 'w', encoding='utf-8') as f:
+        f.write('{\n  "entries": [')
+        for entry in entries:
+            f.write(',\n    ' if builder.count else '\n    ')
+            f.write(dumps(entry, ensure_ascii=False))
+            builder.add(entry)
+            if first is None:
+                first = entry
+
+        metadata = build_metadata(builder.count)
+        f.write('\n  ],')
+        if include_index:
+            f.write('\n  "index": ')
+            with METRICS.stage('serialize'):
+                json.dump(builder.index, f, ensure_ascii=False)
+            f.write(',')
+        f.write('\n  "metadata": ')
+        json.dump(metadata, f, ensure_ascii=False)
+        f.write('\n}\n')
+
+    return {'metadata': metadata, 'index': builder.index, 'first': first}
+
+def write_ndjson(entries: Iterable[Dict], output_path: str, index_path: str) -> Dict:
+    """
+    Escribe una entrada JSON por línea (NDJSON) en memoria constante
+
+    El índice y los metadatos, construidos en la misma pasada, se guardan
+    aparte en index_path.
+
+    Returns:
+        Dict con 'metadata' y la primera entrada escrita ('first')
+    """
+    builder = SearchIndexBuilder()
+    first = None
+    dumps = METRICS.timed(json.dumps, 'serialize')
 
-    output_path = Path(filepath).stem + '_parsed.json'
     with open(output_path, 'w', encoding='utf-8') as f:
-        json.dump(output, f, ensure_ascii=False, indent=2)
+        for entry in entries:
+            f.write(dumps(entry, ensure_ascii=False))
+            f.write('\n')
+            builder.add(entry)
+            if first is None:
+                first = entry
+
+    metadata = build_metadata(builder.count)
+    with open(index_path, 'w', encoding='utf-8') as f, METRICS.stage('serialize'):
+        json.dump({'metadata': metadata, 'index': builder.index}, f, ensure_ascii=False)
+
+    return {'metadata': metadata, 'first': first}
+
+def _feed(entries: Iterable[Dict], builder) -> Iterator[Dict]:
+    """Pasa las entradas a un builder adicional sin interrumpir el stream"""
+    for entry in entries:
+        builder.add(entry)
+        yield entry
+
+def iter_ndjson(filepath: str) -> Iterator[Dict]:
+    """Lee un archivo NDJSON entrada por entrada"""
+    with open(filepath, 'r', encoding='utf-8') as f:
+        for line in f:
+            if line.strip():
+                yield json.loads(line)
+
+def main():
+    """Ejemplo de uso"""
+    parser = argparse.ArgumentParser(
+        description='Convierte CC-CEDICT a JSON estructurado'
+    )
+    parser.add_argument(
+        'input_file',
+        help='Archivo CC-CEDICT (.txt, .u8 o .txt.gz)'
+    )
+    parser.add_argument(
+        'limit',
+        nargs='?',
+        type=int,
+        help='Límite de entradas (default: todas)'
+    )
+    parser.add_argument(
+        '-f', '--format',
+        choices=['json', 'stream', 'ndjson', 'binary'],
+        default='json',
+        help='json: archivo único con indent=2 (default); '
+             'stream: mismo contenido escrito entrada por entrada; '
+             'ndjson: una entrada por línea + índice aparte; '
+             'binary: formato .cedb consultable con mmap (ver cedict_binary.py)'
+    )
+    parser.add_argument(
+        '-o', '--output',
+        help='Archivo de salida (default: <archivo>_parsed.json / .ndjson / .cedb)'
+    )
+    parser.add_argument(
+        '-w', '--workers',
+        type=int,
+        default=1,
+        help='Procesos para parsear en paralelo (default: 1 = serial)'
+    )
+    parser.add_argument(
+        '--previous',
+        help='JSON parseado de la versión anterior: genera además <salida>_delta.json'
+    )
+    parser.add_argument(
+        '--compact-index',
+        action='store_true',
+        help='Guardar el índice en formato compacto .cidx en lugar de dentro del JSON'
+    )
+    parser.add_argument(
+        '--substring-index',
+        action='store_true',
+        help='Generar además <salida>.sidx: n-gramas chinos y prefijos de pinyin '
+             'para búsqueda parcial (ver substring_index.py)'
+    )
+    parser.add_argument(
+        '--gzip-backend',
+        choices=['zlib', 'isal'],
+        help='Descompresor del .gz (default: isal si está instalado, si no zlib)'
+    )
+    parser.add_argument(
+        '--decompressed-cache',
+        action='store_true',
+        help='Guardar el .gz descomprimido junto al original y reutilizarlo en las siguientes ejecuciones'
+    )
+    add_metrics_arguments(parser)
+
+    args = parser.parse_args()
+    enable_from_args(args, 'cedict_parser')
+    # Tiempos por etapa (sin efecto si las métricas están desactivadas)
+    module = sys.modules[__name__]
+    METRICS.instrument(module, 'parse_cedict_line', 'parse_line')
+    METRICS.instrument(module, 'parse_cedict_bytes', 'parse_line')
+    METRICS.instrument(module, 'parse_pinyin_numbers', 'pinyin')
+    METRICS.instrument(SearchIndexBuilder, 'add', 'index')
+    filepath = args.input_file
+    stem = Path(filepath).stem
+
+    print(f"Parseando {filepath}...")
+
+    source = iter_entries(filepath, args.limit, args.workers,
+                          args.gzip_backend, args.decompressed_cache)
+    if args.substring_index:
+        substring_builder = SubstringIndexBuilder()
+        source = _feed(source, substring_builder)
+
+    if args.format == 'json':
+        entries = []
+        builder = SearchIndexBuilder()
+        for entry in source:
+            entries.append(entry)
+            builder.add(entry)
+        print(f"Entradas parseadas: {len(entries)}")
+
+        # Guardar resultado
+        output = {
+            'metadata': build_metadata(len(entries)),
+            'entries': entries,
+            'index': builder.index
+        }
+        if args.compact_index:
+            del output['index']
+
+        output_path = args.output or stem + '_parsed.json'
+        with open(output_path, 'w', encoding='utf-8') as f, METRICS.stage('serialize'):
+            json.dump(output, f, ensure_ascii=False, indent=2)
+
+        first = entries[0] if entries else None
+        index = builder.index
+
+    elif args.format == 'stream':
+        output_path = args.output or stem + '_parsed.json'
+        result = write_json_stream(source, output_path,
+                                   include_index=not args.compact_index)
+        print(f"Entradas parseadas: {result['metadata']['entries_count']}")
+        first = result['first']
+        index = result['index']
+
+    elif args.format == 'binary':
+        output_path = args.output or stem + '_parsed.cedb'
+        result = write_binary(source, output_path)
+        print(f"Entradas parseadas: {result['entries_count']}")
+        first = result['first']
+
+    else:
+        output_path = args.output or stem + '_parsed.ndjson'
+        index_path = str(Path(output_path).with_suffix('')) + '_index.json'
+        result = write_ndjson(source, output_path, index_path)
+        print(f"Entradas parseadas: {result['metadata']['entries_count']}")
+        print(f"Índice guardado en: {index_path}")
+        first = result['first']
 
     print(f"Guardado en: {output_path}")
 
+    if args.compact_index:
+        if args.format not in ('json', 'stream'):
+            print("⚠️  --compact-index solo aplica a los formatos json y stream")
+        else:
+            index_path = str(Path(output_path).with_suffix('.cidx'))
+            size = CompactIndex.from_dict(index).save(index_path)
+            print(f"Índice compacto guardado en: {index_path} ({size / 1024:.1f} KB)")
+
+    if args.substring_index:
+        sidx_path = str(Path(output_path).with_suffix('.sidx'))
+        size = CompactIndex.from_dict(substring_builder.index).save(sidx_path)
+        print(f"Índice de búsqueda parcial guardado en: {sidx_path} ({size / 1024:.1f} KB)")
+
+    if args.previous:
+        if args.format != 'json':
+            print("⚠️  --previous solo aplica al formato json")
+        else:
+            from incremental import diff_entries
+            with open(args.previous, 'r', encoding='utf-8') as f:
+                previous = json.load(f)['entries']
+            delta = diff_entries(previous, entries)
+            delta_path = str(Path(output_path).with_suffix('')) + '_delta.json'
+            with open(delta_path, 'w', encoding='utf-8') as f:
+                json.dump(delta, f, ensure_ascii=False)
+            print(f"Delta: {len(delta['added'])} añadidas, {len(delta['changed'])} modificadas, "
+                  f"{len(delta['removed'])} eliminadas -> {delta_path}")
+
     # Mostrar ejemplo
-    if entries:
+    if first:
         print("\nEjemplo de entrada:")
-        print(json.dumps(entries[0], ensure_ascii=False, indent=2))
+        print(json.dumps(first, ensure_ascii=False, indent=2))
 
 if __name__ == '__main__':
     main()
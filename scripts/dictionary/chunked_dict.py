@@ -0,0 +1,317 @@
+#!/usr/bin/env python3
+"""
+Diccionario en chunks direccionados por contenido, para actualizaciones delta
+
+El diccionario servido se parte en chunks de entradas consecutivas; cada
+chunk se guarda como chunks/<sha256>.json (nombre = hash del contenido,
+así que es inmutable y cacheable para siempre) y manifest.json los lista
+en orden. Entre dos builds solo cambian los chunks que contienen entradas
+añadidas, borradas o modificadas: el cliente vuelve a descargar esos y
+reutiliza el resto de su caché.
+
+Los cortes dependen del contenido, no de la posición: se corta tras una
+entrada cuando el hash de su clave (simplificado|tradicional|pinyin)
+cumple hash % avg_entries == 0, con un mínimo y un máximo de entradas por
+chunk. Insertar o borrar una entrada no desplaza los cortes del resto del
+diccionario (con cortes cada N entradas fijas cambiarían todos los chunks
+posteriores).
+
+dictionaryService.js pide el manifest y luego los chunks (CacheFirst en
+el service worker); source_sha256 es el mismo hash que valida el índice
+precalculado de client_index.py, así que <diccionario>.index.json sirve
+también para el diccionario cargado desde los chunks.
+
+    manifest.json  {"format": "chunked", "metadata": {...}, "entries_count": N,
+                    "build": <hash de la lista de chunks>,
+                    "source_sha256": <sha256 del archivo monolítico>,
+                    "chunks": [{"hash", "file", "entries", "bytes"}, ...]}
+    chunks/<hash>.json  lista JSON de entradas, una por línea
+
+Uso:
+    python chunked_dict.py build ../../public/dictionaries/spanish_freq.json -o ../../public/dictionaries/spanish_freq
+    python chunked_dict.py diff viejo/manifest.json nuevo/manifest.json
+    python chunked_dict.py verify ../../public/dictionaries/spanish_freq/manifest.json ../../public/dictionaries/spanish_freq.json
+"""
+
+import os
+import sys
+import json
+import hashlib
+import argparse
+from typing import Dict, Iterable, Iterator, List, Optional, Sequence
+
+from client_index import file_sha256
+from compact_dict import precompress
+
+MANIFEST_NAME = 'manifest.json'
+CHUNK_DIR = 'chunks'
+
+# Entradas por chunk: media, mínimo y máximo
+AVG_ENTRIES = 256
+MIN_ENTRIES = 64
+MAX_ENTRIES = 1024
+
+# Longitud (hex) del hash en el nombre de cada chunk
+HASH_LENGTH = 16
+
+_SEPARATORS = (',', ':')
+
+def entry_key(entry: Dict) -> str:
+    """Identidad estable de una entrada (formato largo o compacto s/t/p)"""
+    return '|'.join(str(entry.get(short) or entry.get(field) or '')
+                    for short, field in (('s', 'simplified'), ('t', 'traditional'), ('p', 'pinyin')))
+
+def _key_hash(entry: Dict) -> int:
+    digest = hashlib.blake2b(entry_key(entry).encode('utf-8'), digest_size=8).digest()
+    return int.from_bytes(digest, 'little')
+
+def split_chunks(entries: Iterable[Dict], avg_entries: int = AVG_ENTRIES,
+                 min_entries: int = MIN_ENTRIES, max_entries: int = MAX_ENTRIES) -> Iterator[List[Dict]]:
+    """Parte las entradas en chunks con cortes definidos por su contenido"""
+    chunk = []
+    for entry in entries:
+        chunk.append(entry)
+        size = len(chunk)
+        if size >= max_entries or (size >= min_entries and _key_hash(entry) % avg_entries == 0):
+            yield chunk
+            chunk = []
+    if chunk:
+        yield chunk
+
+def serialize_chunk(entries: Sequence[Dict]) -> bytes:
+    lines = (json.dumps(entry, ensure_ascii=False, separators=_SEPARATORS) for entry in entries)
+    return ('[' + ',\n'.join(lines) + ']\n').encode('utf-8')
+
+def chunk_hash(data: bytes) -> str:
+    return hashlib.sha256(data).hexdigest()[:HASH_LENGTH]
+
+def load_manifest(filepath: str) -> Dict:
+    with open(filepath, 'r', encoding='utf-8') as f:
+        manifest = json.load(f)
+    if manifest.get('format') != 'chunked':
+        raise ValueError(f"{filepath} no es un manifest de chunks")
+    return manifest
+
+def build_chunks(entries: Iterable[Dict], output_dir: str, metadata: Optional[Dict] = None,
+                 avg_entries: int = AVG_ENTRIES, min_entries: int = MIN_ENTRIES,
+                 max_entries: int = MAX_ENTRIES,
+                 precompress_formats: Optional[Sequence[str]] = None,
+                 source_sha256: Optional[str] = None) -> Dict:
+    """
+    Escribe los chunks que falten en output_dir/chunks y el manifest.json
+
+    Los chunks ya presentes (mismo hash) no se reescriben, así que varios
+    builds pueden compartir el directorio.
+
+    Args:
+        source_sha256: sha256 del archivo de origen (file_sha256), con el
+            que el cliente valida el índice precalculado
+
+    Returns:
+        El manifest escrito, con 'written' = nº de chunks nuevos en disco
+    """
+    chunk_dir = os.path.join(output_dir, CHUNK_DIR)
+    os.makedirs(chunk_dir, exist_ok=True)
+
+    chunks = []
+    written = 0
+    count = 0
+    for chunk in split_chunks(entries, avg_entries, min_entries, max_entries):
+        data = serialize_chunk(chunk)
+        digest = chunk_hash(data)
+        filename = f'{CHUNK_DIR}/{digest}.json'
+        path = os.path.join(output_dir, filename)
+        if not os.path.exists(path):
+            # Publicar solo chunks completos: .tmp y luego rename
+            with open(path + '.tmp', 'wb') as f:
+                f.write(data)
+            os.replace(path + '.tmp', path)
+            if precompress_formats:
+                precompress(path, precompress_formats)
+            written += 1
+        chunks.append({'hash': digest, 'file': filename, 'entries': len(chunk), 'bytes': len(data)})
+        count += len(chunk)
+
+    manifest = {
+        'format': 'chunked',
+        'metadata': metadata or {},
+        'entries_count': count,
+        'build': hashlib.sha256(''.join(c['hash'] for c in chunks).encode('ascii')).hexdigest()[:HASH_LENGTH],
+        'source_sha256': source_sha256,
+        'chunking': {'avg_entries': avg_entries, 'min_entries': min_entries, 'max_entries': max_entries},
+        'chunks': chunks
+    }
+    manifest_path = os.path.join(output_dir, MANIFEST_NAME)
+    with open(manifest_path + '.tmp', 'w', encoding='utf-8') as f:
+        json.dump(manifest, f, ensure_ascii=False, indent=1)
+    os.replace(manifest_path + '.tmp', manifest_path)
+    return {**manifest, 'written': written}
+
+def diff_manifests(old: Dict, new: Dict) -> Dict:
+    """
+    Chunks que un cliente con `old` en caché debe descargar para pasar a `new`
+
+    Returns:
+        Dict con 'added' / 'removed' (listas de hashes), 'reused' (nº de
+        chunks), 'download_bytes' y 'total_bytes' (del build nuevo)
+    """
+    old_hashes = {c['hash'] for c in old['chunks']}
+    new_hashes = {c['hash'] for c in new['chunks']}
+    added = [c for c in new['chunks'] if c['hash'] not in old_hashes]
+    return {
+        'added': [c['hash'] for c in added],
+        'removed': [c['hash'] for c in old['chunks'] if c['hash'] not in new_hashes],
+        'reused': sum(1 for c in new['chunks'] if c['hash'] in old_hashes),
+        'download_bytes': sum(c['bytes'] for c in added),
+        'total_bytes': sum(c['bytes'] for c in new['chunks'])
+    }
+
+def iter_chunk_entries(manifest_path: str) -> Iterator[Dict]:
+    """
+    Entradas del diccionario reconstruido desde los chunks, en orden
+
+    Raises:
+        ValueError: si un chunk falta o su contenido no coincide con su hash
+    """
+    manifest = load_manifest(manifest_path)
+    base_dir = os.path.dirname(os.path.abspath(manifest_path))
+    for chunk in manifest['chunks']:
+        path = os.path.join(base_dir, chunk['file'])
+        if not os.path.exists(path):
+            raise ValueError(f"Falta el chunk {chunk['file']}")
+        with open(path, 'rb') as f:
+            data = f.read()
+        if chunk_hash(data) != chunk['hash']:
+            raise ValueError(f"El contenido de {chunk['file']} no coincide con su hash")
+        entries = json.loads(data)
+        if len(entries) != chunk['entries']:
+            raise ValueError(f"{chunk['file']}: {len(entries)} entradas, el manifest dice {chunk['entries']}")
+        yield from entries
+
+def verify_chunks(manifest_path: str, entries: Sequence[Dict], max_reported: int = 10,
+                  source_sha256: Optional[str] = None) -> List[str]:
+    """
+    Compara el diccionario reconstruido desde los chunks con el monolítico
+
+    Args:
+        source_sha256: sha256 del monolítico (file_sha256); si se pasa, el
+            manifest debe llevar el mismo (si no, el índice precalculado no
+            se aceptaría con los chunks)
+
+    Returns:
+        Lista de diferencias (vacía si son idénticos)
+    """
+    problems = []
+    if source_sha256 is not None:
+        manifest_sha256 = load_manifest(manifest_path).get('source_sha256')
+        if manifest_sha256 != source_sha256:
+            problems.append(f"source_sha256 del manifest ({manifest_sha256}) != sha256 del monolítico "
+                            f"({source_sha256}): vuelve a ejecutar chunked_dict.py build")
+    count = 0
+    try:
+        for i, entry in enumerate(iter_chunk_entries(manifest_path)):
+            count += 1
+            if i >= len(entries):
+                continue
+            if entry != entries[i] and len(problems) < max_reported:
+                problems.append(f"Entrada {i}: chunks {entry_key(entry)!r} != monolítico {entry_key(entries[i])!r}")
+    except ValueError as e:
+        return problems + [str(e)]
+    if count != len(entries):
+        problems.append(f"{count} entradas en los chunks, {len(entries)} en el monolítico")
+    return problems
+
+def prune_chunks(output_dir: str, keep: Iterable[Dict]) -> int:
+    """Borra de output_dir/chunks los chunks que no usa ningún manifest de `keep`"""
+    used = {c['hash'] for manifest in keep for c in manifest['chunks']}
+    removed = 0
+    chunk_dir = os.path.join(output_dir, CHUNK_DIR)
+    for name in os.listdir(chunk_dir):
+        if name.split('.')[0] not in used:
+            os.unlink(os.path.join(chunk_dir, name))
+            removed += 1
+    return removed
+
+def _load_entries(filepath: str) -> Dict:
+    with open(filepath, 'r', encoding='utf-8') as f:
+        return json.load(f)
+
+def _print_diff(diff: Dict):
+    ratio = diff['download_bytes'] / diff['total_bytes'] if diff['total_bytes'] else 0
+    print(f"   Chunks reutilizados: {diff['reused']}, nuevos: {len(diff['added'])}, "
+          f"obsoletos: {len(diff['removed'])}")
+    print(f"   A descargar: {diff['download_bytes'] / 1024:.1f} KB de "
+          f"{diff['total_bytes'] / 1024:.1f} KB ({ratio:.1%})")
+
+def main():
+    parser = argparse.ArgumentParser(
+        description='Diccionario en chunks direccionados por contenido (actualizaciones delta)'
+    )
+    subparsers = parser.add_subparsers(dest='command', required=True)
+
+    build_parser = subparsers.add_parser('build', help='Parte un diccionario en chunks + manifest')
+    build_parser.add_argument('input_file', help='Diccionario servido (spanish_freq.json, .min.json...)')
+    build_parser.add_argument('-o', '--output-dir', required=True, help='Directorio del manifest y chunks/')
+    build_parser.add_argument('--avg-entries', type=int, default=AVG_ENTRIES,
+                              help=f'Entradas por chunk de media (default: {AVG_ENTRIES})')
+    build_parser.add_argument('--min-entries', type=int, default=MIN_ENTRIES)
+    build_parser.add_argument('--max-entries', type=int, default=MAX_ENTRIES)
+    build_parser.add_argument('--precompress', nargs='*', choices=['gz', 'br'],
+                              help='Escribir además .gz y/o .br de cada chunk nuevo (sin valores: ambos)')
+    build_parser.add_argument('--prune', action='store_true',
+                              help='Borrar los chunks que no usa el manifest nuevo')
+
+    diff_parser = subparsers.add_parser('diff', help='Chunks a descargar entre dos builds')
+    diff_parser.add_argument('old_manifest')
+    diff_parser.add_argument('new_manifest')
+    diff_parser.add_argument('--json', action='store_true', help='Imprimir el diff completo en JSON')
+
+    verify_parser = subparsers.add_parser('verify', help='Reconstruye desde los chunks y compara')
+    verify_parser.add_argument('manifest')
+    verify_parser.add_argument('input_file', help='Diccionario monolítico de referencia')
+
+    args = parser.parse_args()
+
+    if args.command == 'diff':
+        diff = diff_manifests(load_manifest(args.old_manifest), load_manifest(args.new_manifest))
+        if args.json:
+            print(json.dumps(diff, indent=2))
+        else:
+            print(f"🔀 {args.old_manifest} -> {args.new_manifest}")
+            _print_diff(diff)
+        return
+
+    data = _load_entries(args.input_file)
+    entries = data.get('entries', [])
+
+    if args.command == 'verify':
+        problems = verify_chunks(args.manifest, entries, source_sha256=file_sha256(args.input_file))
+        if problems:
+            print(f"❌ Los chunks no reproducen {args.input_file}:")
+            for problem in problems:
+                print(f"   {problem}")
+            sys.exit(1)
+        print(f"✅ {len(entries)} entradas idénticas a {args.input_file}")
+        return
+
+    manifest_path = os.path.join(args.output_dir, MANIFEST_NAME)
+    previous = load_manifest(manifest_path) if os.path.exists(manifest_path) else None
+
+    formats = None
+    if args.precompress is not None:
+        formats = args.precompress or ['gz', 'br']
+    manifest = build_chunks(entries, args.output_dir, data.get('metadata', {}),
+                            args.avg_entries, args.min_entries, args.max_entries, formats,
+                            file_sha256(args.input_file))
+
+    print(f"✅ {manifest['entries_count']} entradas en {len(manifest['chunks'])} chunks "
+          f"({manifest['written']} nuevos) -> {manifest_path}")
+    if previous:
+        print(f"\n🔀 Frente al build anterior ({previous['build']}):")
+        _print_diff(diff_manifests(previous, manifest))
+    if args.prune:
+        removed = prune_chunks(args.output_dir, [manifest])
+        print(f"   Chunks obsoletos borrados: {removed}")
+
+if __name__ == '__main__':
+    main()
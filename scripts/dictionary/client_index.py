@@ -0,0 +1,252 @@
+#!/usr/bin/env python3
+"""
+Índice de búsqueda precalculado para el cliente
+
+Genera las mismas estructuras que buildSearchIndex en dictionaryService.js
+(bySimplified, byTraditional, byPinyin, bySpanish), con las mismas reglas
+de normalización y el mismo orden de claves, serializadas como pares
+[clave, [índices]] para cargarlas directamente con new Map(pares):
+
+    {"metadata": {"format": "client-index", "entries_count": N, ...},
+     "bySimplified": [["你好", [0]], ...], "byTraditional": [...],
+     "byPinyin": [["nihao", [0]], ...], "bySpanish": [["hola", [0, 7]], ...]}
+
+Los índices son posiciones en data.entries del diccionario servido. El
+metadata lleva el sha256 del archivo del diccionario (source_sha256); el
+cliente hace el mismo hash de los bytes que descarga y solo usa el índice
+si coincide (y entries_count también). Si no, construye los índices como
+antes: un índice de otra versión del diccionario nunca se usa.
+
+El subcomando `cases` escribe las salidas de los normalizadores para los
+casos de PARITY_CASES; el test de dictionaryService las compara con las
+funciones JS para que ambos lados no se separen.
+
+Uso:
+    python client_index.py build ../../public/dictionaries/spanish_freq.json
+    python client_index.py cases -o ../../src/services/__tests__/fixtures/normalizer_parity.json
+"""
+
+import os
+import re
+import json
+import hashlib
+import argparse
+from typing import Dict, Iterable, List, Optional
+
+from spanish_text import normalize_spanish
+from substring_index import JS_WHITESPACE, normalize_pinyin
+
+INDEX_NAMES = ('bySimplified', 'byTraditional', 'byPinyin', 'bySpanish')
+
+# Mismas expresiones que buildSearchIndex (\s y \w con la semántica de JS)
+_LEADING_NOTE = re.compile(f'^[{JS_WHITESPACE}]*\\([^)]*\\)[{JS_WHITESPACE}]*')
+_CLAUSE_SPLIT = re.compile(r'[,;/]|\(')
+_WORD_SPLIT = re.compile(f'[{JS_WHITESPACE}]+')
+_TRIM = re.compile(f'^[{JS_WHITESPACE}]+|[{JS_WHITESPACE}]+$')
+_NON_WORD = re.compile(r'[^A-Za-z0-9_\u00C0-\u017F]')
+_TERM_SPLIT = re.compile(f'[{JS_WHITESPACE},;/()]+')
+
+_SEPARATORS = (',', ':')
+
+def _js_truthy(value) -> bool:
+    # En JS las listas y objetos vacíos son verdaderos
+    return isinstance(value, (list, dict)) or bool(value)
+
+def _js_trim(text: str) -> str:
+    return _TRIM.sub('', text)
+
+def client_pinyin_key(pinyin) -> str:
+    """normalizePinyin del cliente: cadena vacía si no hay pinyin"""
+    if not pinyin or not isinstance(pinyin, str):
+        return ''
+    return normalize_pinyin(pinyin)
+
+def _clean_words(words) -> List[str]:
+    # word.replace(/[^\w\u00C0-\u017F]/g, ''), al menos 2 caracteres
+    cleaned = (_NON_WORD.sub('', word) for word in words)
+    return [word for word in cleaned if len(word) >= 2]
+
+def spanish_terms(text) -> List[str]:
+    """
+    spanishTerms del cliente: todas las palabras de una definición (o de
+    una consulta), sin acentos (normalize_spanish / foldSpanish)
+
+    Son las claves de index_spanish (translate_to_spanish.py): el cliente
+    normaliza la consulta con spanishTerms y busca cada palabra tal cual.
+    """
+    if not isinstance(text, str) or not text:
+        return []
+    cleaned = _js_trim(_LEADING_NOTE.sub('', normalize_spanish(text), count=1))
+    return _clean_words(_TERM_SPLIT.split(cleaned))
+
+def spanish_index_words(definitions) -> List[str]:
+    """
+    Palabras que buildSearchIndex indexa para una entrada
+
+    Solo la primera definición: sin la nota inicial entre paréntesis,
+    hasta la primera coma/punto y coma/barra/paréntesis, las 3 primeras
+    palabras sin signos y de al menos 2 caracteres.
+    """
+    if not isinstance(definitions, list) or not definitions:
+        return []
+    first = definitions[0]
+    if not isinstance(first, str) or not first:
+        return []
+    cleaned = _js_trim(_LEADING_NOTE.sub('', first, count=1))
+    words = _WORD_SPLIT.split(_js_trim(_CLAUSE_SPLIT.split(cleaned.lower())[0]))
+    return _clean_words(words[:3])
+
+def _field(entry: Dict, short: str, long: str):
+    # entry.s || entry.simplified
+    value = entry.get(short)
+    return value if _js_truthy(value) else entry.get(long)
+
+class ClientIndexBuilder:
+    """Reproduce buildSearchIndex entrada por entrada"""
+
+    def __init__(self):
+        self.count = 0
+        self.index = {name: {} for name in INDEX_NAMES}
+
+    def add(self, entry: Dict) -> int:
+        i = self.count
+        self.count += 1
+
+        simplified = _field(entry, 's', 'simplified')
+        traditional = _field(entry, 't', 'traditional')
+        definitions = _field(entry, 'd', 'definitions_es')
+        # Entradas mal formadas: se saltan pero conservan su posición
+        if not (_js_truthy(simplified) and _js_truthy(traditional) and _js_truthy(definitions)):
+            return i
+
+        self.index['bySimplified'].setdefault(simplified, []).append(i)
+        self.index['byTraditional'].setdefault(traditional, []).append(i)
+
+        pinyin_key = client_pinyin_key(_field(entry, 'p', 'pinyin'))
+        if pinyin_key:
+            self.index['byPinyin'].setdefault(pinyin_key, []).append(i)
+
+        spanish = self.index['bySpanish']
+        for word in spanish_index_words(definitions):
+            postings = spanish.setdefault(word, [])
+            if not postings or postings[-1] != i:
+                postings.append(i)
+        return i
+
+def file_sha256(filepath: str) -> str:
+    """sha256 (hex) de los bytes del archivo, como sha256Hex en dictionaryService.js"""
+    digest = hashlib.sha256()
+    with open(filepath, 'rb') as f:
+        for block in iter(lambda: f.read(1 << 20), b''):
+            digest.update(block)
+    return digest.hexdigest()
+
+def build_client_index(entries: Iterable[Dict]) -> ClientIndexBuilder:
+    builder = ClientIndexBuilder()
+    for entry in entries:
+        builder.add(entry)
+    return builder
+
+def write_client_index(builder: ClientIndexBuilder, filepath: str,
+                       metadata: Optional[Dict] = None, fields: Optional[Dict] = None) -> int:
+    """
+    Escribe el índice como pares [clave, índices] (una tabla por línea)
+
+    Args:
+        fields: Campos extra escritos antes de las tablas (p. ej. las
+            entradas de un tier de build_tiers.py, que así se carga con
+            una sola petición)
+
+    Returns:
+        Tamaño del archivo en bytes
+    """
+    header = {**(metadata or {}), 'format': 'client-index', 'entries_count': builder.count}
+    with open(filepath, 'w', encoding='utf-8') as f:
+        f.write('{"metadata":')
+        json.dump(header, f, ensure_ascii=False, separators=_SEPARATORS)
+        for name, value in (fields or {}).items():
+            f.write(f',\n"{name}":')
+            json.dump(value, f, ensure_ascii=False, separators=_SEPARATORS)
+        for name in INDEX_NAMES:
+            f.write(f',\n"{name}":')
+            json.dump(list(builder.index[name].items()), f,
+                      ensure_ascii=False, separators=_SEPARATORS)
+        f.write('}\n')
+    return os.path.getsize(filepath)
+
+# Casos para el test de paridad con dictionaryService.js
+PARITY_CASES = {
+    'pinyin': [
+        'nǐ hǎo', 'Nǐ Hǎo', 'lǜ', 'lüè', 'Zhōng guó', 'xi3 huan1', 'ér zi', 'nü3',
+        'a\u00a0b', 'a\u3000b', 'a\ufeffb', 'a\u0085b', 'a\u001cb', '  tab\tand\nnewline ',
+        'Ā Á Ǎ À', 'ǖ ǘ ǚ ǜ Ü', 'ẑ ĉ ŝ', 'ḿ ń ň ǹ', 'İstanbul', '', '   ', 'Dr.', "xi'an"
+    ],
+    'definitions': [
+        ['hola'], ['(coloq.) hola, buenos días'], ['  (fig.)  ser  humano  grande'],
+        ['ser humano; persona'], ['casa/hogar'], ['agua (líquido)'],
+        ['Niño pequeño travieso'], ['a b c d e'], ['está bien, ¿verdad?'],
+        ['corazón del año'], ['piña y ñandú'], ['peso 10 kg'], ['x'], [''],
+        ['(sin cerrar'], ['(una) (dos) tres'], ['ÀÉÎÕÜ çğşž œß'], ['naïve café'],
+        ['emoji 😀 risa'], ['guion-bajo_y-medio'], ['Ǆemal ǅ'], ['\u00a0espacio\u00a0duro'],
+        ['\ufeffbom inicial'], ['uno\u0085dos'], ['first, second'], [], None, 'texto suelto',
+        [None, 'segunda'], [42]
+    ],
+    'terms': [
+        'hola', '(coloq.) hola, buenos días', 'ser humano; persona', 'casa/hogar',
+        'agua (líquido) potable', 'Niño pequeño travieso', 'está bien, ¿verdad?',
+        'piña y ñandú', 'peso 10 kg', 'x', '', '  (fig.)  uno  ', '(una) (dos) tres',
+        'ÀÉÎÕÜ çğşž œß', 'guion-bajo_y-medio', '\u00a0espacio\u00a0duro', 'uno\u0085dos',
+        'A,B;C/D(E)F', 'İstanbul', None, 42
+    ]
+}
+
+def parity_cases() -> Dict:
+    """Entradas de PARITY_CASES con la salida esperada en Python"""
+    return {
+        'pinyin': [{'input': text, 'expected': client_pinyin_key(text)}
+                   for text in PARITY_CASES['pinyin']],
+        'definitions': [{'input': definitions, 'expected': spanish_index_words(definitions)}
+                        for definitions in PARITY_CASES['definitions']],
+        'terms': [{'input': text, 'expected': spanish_terms(text)}
+                  for text in PARITY_CASES['terms']]
+    }
+
+def main():
+    parser = argparse.ArgumentParser(
+        description='Índice de búsqueda precalculado para dictionaryService (new Map(pares))'
+    )
+    subparsers = parser.add_subparsers(dest='command', required=True)
+
+    build_parser = subparsers.add_parser('build', help='Genera el índice de un diccionario servido')
+    build_parser.add_argument('input_file', help='Diccionario del cliente (spanish_freq.json, .min.json...)')
+    build_parser.add_argument('-o', '--output', help='Archivo de salida (default: <entrada>.index.json)')
+
+    cases_parser = subparsers.add_parser('cases', help='Escribe los casos de paridad de normalizadores')
+    cases_parser.add_argument('-o', '--output', required=True, help='Fixture JSON para el test JS')
+
+    args = parser.parse_args()
+
+    if args.command == 'cases':
+        with open(args.output, 'w', encoding='utf-8') as f:
+            json.dump(parity_cases(), f, ensure_ascii=False, indent=2)
+            f.write('\n')
+        print(f"✅ Casos de paridad guardados en: {args.output}")
+        return
+
+    with open(args.input_file, 'r', encoding='utf-8') as f:
+        data = json.load(f)
+    entries = data.get('entries', [])
+    output = args.output or args.input_file.replace('.json', '') + '.index.json'
+
+    builder = build_client_index(entries)
+    size = write_client_index(builder, output, {
+        'source': os.path.basename(args.input_file),
+        'source_sha256': file_sha256(args.input_file)
+    })
+
+    print(f"✅ Índice de {builder.count} entradas -> {output} ({size / 1024:.1f} KB)")
+    for name in INDEX_NAMES:
+        print(f"   {name:<14} {len(builder.index[name]):>8} claves")
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,173 @@
+#!/usr/bin/env python3
+"""
+Formato compacto del diccionario traducido para el cliente
+
+Cada entrada usa las claves cortas que ya acepta dictionaryService
+(s, t, p, d) y solo los campos que el cliente muestra; las copias de
+las definiciones en inglés (definitions / definitions_en) se guardan
+una sola vez y solo con --english, y solo si difieren de las españolas.
+Sin espacios ni sangría, y sin los índices: el cliente los construye
+al cargar (buildSearchIndex) o, con --client-index, los lee ya hechos
+de <salida>.index.json (ver client_index.py).
+
+Opcionalmente escribe hermanos precomprimidos (.gz, y .br si está
+instalado el módulo brotli) para servirlos con Content-Encoding.
+
+Uso:
+    python compact_dict.py cedict_es.json -o ../../public/dictionaries/cedict_es.min.json
+    python compact_dict.py cedict_es.json -o cedict_es.min.json --precompress gz br --english
+    python compact_dict.py cedict_es.json -o cedict_es.min.json --client-index
+"""
+
+import os
+import gzip
+import json
+import shutil
+import argparse
+from typing import Dict, Iterable, List, Optional, Sequence
+
+from client_index import ClientIndexBuilder, file_sha256, write_client_index
+
+# Compresor brotli opcional (pip install brotli)
+try:
+    import brotli
+    BROTLI_AVAILABLE = True
+except ImportError:
+    BROTLI_AVAILABLE = False
+
+# Campo largo -> clave corta (mismas que dictionaryService.formatEntry)
+COMPACT_KEYS = {
+    'simplified': 's',
+    'traditional': 't',
+    'pinyin': 'p',
+    'definitions_es': 'd'
+}
+ENGLISH_KEY = 'e'
+
+_SEPARATORS = (',', ':')
+
+def compact_entry(entry: Dict, include_english: bool = False) -> Dict:
+    """Entrada con claves cortas; las definiciones en inglés solo si se piden y difieren"""
+    compact = {short: entry.get(field) for field, short in COMPACT_KEYS.items()}
+    if compact['d'] is None:
+        compact['d'] = entry.get('definitions', [])
+    if include_english:
+        english = entry.get('definitions_en') or entry.get('definitions') or []
+        if english != compact['d']:
+            compact[ENGLISH_KEY] = english
+    return compact
+
+def precompress(filepath: str, formats: Sequence[str] = ('gz', 'br')) -> Dict[str, int]:
+    """
+    Escribe filepath.gz / filepath.br junto al archivo
+
+    Returns:
+        Formato -> tamaño en bytes (los no disponibles se omiten)
+    """
+    sizes = {}
+    if 'gz' in formats:
+        with open(filepath, 'rb') as src, gzip.open(filepath + '.gz', 'wb', compresslevel=9) as dst:
+            shutil.copyfileobj(src, dst, 1 << 20)
+        sizes['gz'] = os.path.getsize(filepath + '.gz')
+    if 'br' in formats:
+        if not BROTLI_AVAILABLE:
+            print("⚠️  brotli no instalado (pip install brotli): se omite .br")
+        else:
+            compressor = brotli.Compressor(quality=11, mode=brotli.MODE_TEXT)
+            with open(filepath, 'rb') as src, open(filepath + '.br', 'wb') as dst:
+                for block in iter(lambda: src.read(1 << 20), b''):
+                    dst.write(compressor.process(block))
+                dst.write(compressor.finish())
+            sizes['br'] = os.path.getsize(filepath + '.br')
+    return sizes
+
+def write_compact_dict(entries: Iterable[Dict], filepath: str, metadata: Dict,
+                       include_english: bool = False,
+                       precompress_formats: Optional[Sequence[str]] = None,
+                       client_index_path: Optional[str] = None) -> Dict:
+    """
+    Escribe el diccionario compacto entrada por entrada
+
+    Args:
+        client_index_path: Escribir también el índice precalculado del
+            cliente, construido en la misma pasada
+
+    Returns:
+        Dict con 'entries_count', 'bytes', tamaños precomprimidos ('gz', 'br'),
+        del índice ('client_index') y la primera entrada ('first')
+    """
+    count = 0
+    first = None
+    index_builder = ClientIndexBuilder() if client_index_path else None
+    with open(filepath, 'w', encoding='utf-8') as f:
+        f.write('{"metadata":')
+        json.dump({**metadata, 'format': 'compact'}, f, ensure_ascii=False, separators=_SEPARATORS)
+        f.write(',"entries":[')
+        for entry in entries:
+            if count:
+                f.write(',')
+            # Una entrada por línea: diffs legibles y sin coste apreciable
+            f.write('\n')
+            compact = compact_entry(entry, include_english)
+            f.write(json.dumps(compact, ensure_ascii=False, separators=_SEPARATORS))
+            if index_builder:
+                index_builder.add(compact)
+            count += 1
+            if first is None:
+                first = entry
+        f.write('\n]}\n')
+
+    result = {'entries_count': count, 'bytes': os.path.getsize(filepath), 'first': first}
+    if precompress_formats:
+        result.update(precompress(filepath, precompress_formats))
+    if index_builder:
+        result['client_index'] = write_client_index(
+            index_builder, client_index_path,
+            {'source': os.path.basename(filepath), 'source_sha256': file_sha256(filepath)})
+    return result
+
+def size_report(sizes: Dict[str, int], original: Optional[int] = None) -> List[str]:
+    """Líneas de resumen de tamaños, relativos al original si se conoce"""
+    lines = []
+    for name, size in sizes.items():
+        ratio = f"  ({size / original:.1%} del original)" if original else ''
+        lines.append(f"   {name:<10} {size / 1024 / 1024:>8.2f} MB{ratio}")
+    return lines
+
+def main():
+    parser = argparse.ArgumentParser(
+        description='Convierte un diccionario traducido al formato compacto del cliente'
+    )
+    parser.add_argument('input_file', help='Diccionario traducido (JSON de translate_to_spanish.py)')
+    parser.add_argument('-o', '--output', help='Archivo de salida (default: <entrada>.min.json)')
+    parser.add_argument('--english', action='store_true',
+                        help='Incluir las definiciones en inglés (clave "e") cuando difieren')
+    parser.add_argument('--precompress', nargs='*', choices=['gz', 'br'],
+                        help='Escribir además .gz y/o .br (sin valores: ambos)')
+    parser.add_argument('--client-index', action='store_true',
+                        help='Escribir además <salida>.index.json con los índices del cliente')
+
+    args = parser.parse_args()
+
+    with open(args.input_file, 'r', encoding='utf-8') as f:
+        data = json.load(f)
+    output = args.output or args.input_file.replace('.json', '') + '.min.json'
+    formats = None
+    if args.precompress is not None:
+        formats = args.precompress or ['gz', 'br']
+
+    index_path = output.replace('.json', '') + '.index.json' if args.client_index else None
+
+    result = write_compact_dict(data.get('entries', []), output, data.get('metadata', {}),
+                                args.english, formats, index_path)
+
+    original = os.path.getsize(args.input_file)
+    sizes = {'original': original, 'compacto': result['bytes']}
+    sizes.update({f'.{name}': result[name] for name in ('gz', 'br') if name in result})
+    print(f"✅ {result['entries_count']} entradas -> {output}")
+    print('\n'.join(size_report(sizes, original)))
+    if index_path:
+        print(f"   Índice del cliente: {index_path} ({result['client_index'] / 1024:.1f} KB)")
+
+if __name__ == '__main__':
+    main()
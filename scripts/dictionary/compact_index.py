@@ -0,0 +1,264 @@
+#!/usr/bin/env python3
+"""
+Índice de búsqueda compacto: claves ordenadas + listas de postings CSR
+
+Alternativa a los dict-of-lists de create_search_index. Cada tabla guarda:
+    keys_blob        claves UTF-8 concatenadas, ordenadas por bytes
+    key_offsets      array('I') de n+1 offsets en keys_blob
+    posting_offsets  array('I') de n+1 offsets en postings
+    postings         array('I') con los índices de entrada de todas las claves
+
+El archivo serializado (.cidx) se carga con mmap y memoryview.cast, sin
+crear un objeto Python por clave. Los arrays se escriben siempre en
+little-endian (como las cabeceras); en una máquina big-endian se copian
+al cargar en lugar de usarse como vista.
+
+Las secuencias que devuelve lookup() sobre un índice cargado son vistas
+del mmap: copiarlas (list()) si se necesitan después de close().
+
+Uso:
+    python compact_index.py build cedict_ts_parsed.json cedict_ts_parsed.cidx
+    python compact_index.py lookup cedict_ts_parsed.cidx by_simplified 你好
+"""
+
+import sys
+import json
+import mmap
+import struct
+import argparse
+from array import array
+from bisect import bisect_left
+from typing import Dict, Iterator, List, Sequence, Tuple
+
+MAGIC = b'CIDX'
+VERSION = 1
+
+# magic, versión, nº de tablas
+HEADER = struct.Struct('<4sHH')
+# longitud del nombre, nº de claves, bytes de claves, nº de postings
+TABLE_HEADER = struct.Struct('<HIII')
+
+# Offsets y postings: uint32 little-endian
+_NATIVE_LITTLE = sys.byteorder == 'little'
+
+def _uint32_bytes(values) -> bytes:
+    data = array('I', values)
+    if not _NATIVE_LITTLE:
+        data.byteswap()
+    return data.tobytes()
+
+def _uint32_view(view):
+    if _NATIVE_LITTLE:
+        return view.cast('I')
+    data = array('I', bytes(view))
+    data.byteswap()
+    return data
+
+def _aligned(n: int) -> int:
+    return (n + 3) & ~3
+
+class _KeyView:
+    """Secuencia de claves en bytes sobre el blob, apta para bisect"""
+
+    def __init__(self, blob, offsets):
+        self.blob = blob
+        self.offsets = offsets
+
+    def __len__(self):
+        return len(self.offsets) - 1
+
+    def __getitem__(self, i: int) -> bytes:
+        return bytes(self.blob[self.offsets[i]:self.offsets[i + 1]])
+
+class PostingTable:
+    """Una tabla clave -> índices de entrada en formato CSR"""
+
+    def __init__(self, keys_blob, key_offsets: Sequence[int],
+                 posting_offsets: Sequence[int], postings: Sequence[int]):
+        self.keys_blob = keys_blob
+        self.key_offsets = key_offsets
+        self.posting_offsets = posting_offsets
+        self.postings = postings
+        self._keys = _KeyView(keys_blob, key_offsets)
+
+    @classmethod
+    def from_dict(cls, table: Dict[str, List[int]]) -> 'PostingTable':
+        """Construye la tabla desde el formato dict-of-lists"""
+        items = sorted((key.encode('utf-8'), indices) for key, indices in table.items())
+
+        keys_blob = bytearray()
+        key_offsets = array('I', [0])
+        posting_offsets = array('I', [0])
+        postings = array('I')
+
+        for key, indices in items:
+            keys_blob += key
+            key_offsets.append(len(keys_blob))
+            postings.extend(indices)
+            posting_offsets.append(len(postings))
+
+        return cls(bytes(keys_blob), key_offsets, posting_offsets, postings)
+
+    def __len__(self):
+        return len(self.key_offsets) - 1
+
+    def find(self, key: str) -> int:
+        """Posición de la clave en la tabla, o -1"""
+        target = key.encode('utf-8')
+        i = bisect_left(self._keys, target)
+        if i < len(self) and self._keys[i] == target:
+            return i
+        return -1
+
+    def lookup(self, key: str) -> Sequence[int]:
+        """Índices de entrada para la clave (secuencia vacía si no existe)"""
+        i = self.find(key)
+        if i < 0:
+            return ()
+        return self.postings[self.posting_offsets[i]:self.posting_offsets[i + 1]]
+
+    def prefix_range(self, prefix: str) -> Tuple[int, int]:
+        """Rango [inicio, fin) de posiciones cuyas claves empiezan por prefix"""
+        target = prefix.encode('utf-8')
+        lo = bisect_left(self._keys, target)
+        hi = lo
+        while hi < len(self) and self._keys[hi].startswith(target):
+            hi += 1
+        return lo, hi
+
+    def key(self, i: int) -> str:
+        return self._keys[i].decode('utf-8')
+
+    def items(self) -> Iterator[Tuple[str, List[int]]]:
+        for i in range(len(self)):
+            start, end = self.posting_offsets[i], self.posting_offsets[i + 1]
+            yield self.key(i), list(self.postings[start:end])
+
+    def to_dict(self) -> Dict[str, List[int]]:
+        return dict(self.items())
+
+class CompactIndex:
+    """Conjunto de PostingTable con el mismo nombre de tablas que create_search_index"""
+
+    def __init__(self, tables: Dict[str, PostingTable]):
+        self.tables = tables
+        self._mmap = None
+        self._file = None
+
+    @classmethod
+    def from_dict(cls, index: Dict[str, Dict[str, List[int]]]) -> 'CompactIndex':
+        return cls({name: PostingTable.from_dict(table) for name, table in index.items()})
+
+    def to_dict(self) -> Dict[str, Dict[str, List[int]]]:
+        return {name: table.to_dict() for name, table in self.tables.items()}
+
+    def lookup(self, table: str, key: str) -> Sequence[int]:
+        return self.tables[table].lookup(key)
+
+    def __getitem__(self, table: str) -> PostingTable:
+        return self.tables[table]
+
+    def save(self, filepath: str) -> int:
+        """Serializa el índice; devuelve el tamaño en bytes"""
+        with open(filepath, 'wb') as f:
+            f.write(HEADER.pack(MAGIC, VERSION, len(self.tables)))
+            size = HEADER.size
+            for name, table in self.tables.items():
+                encoded_name = name.encode('utf-8')
+                keys_blob = bytes(table.keys_blob)
+                header = TABLE_HEADER.pack(len(encoded_name), len(table),
+                                           len(keys_blob), len(table.postings))
+                chunk = header + encoded_name
+                chunk += b'\0' * (_aligned(size + len(chunk)) - size - len(chunk))
+                chunk += keys_blob
+                chunk += b'\0' * (_aligned(size + len(chunk)) - size - len(chunk))
+                for values in (table.key_offsets, table.posting_offsets, table.postings):
+                    chunk += _uint32_bytes(values)
+                f.write(chunk)
+                size += len(chunk)
+        return size
+
+    @classmethod
+    def load(cls, filepath: str) -> 'CompactIndex':
+        """Abre un .cidx con mmap; las tablas son vistas sobre el archivo"""
+        f = open(filepath, 'rb')
+        buffer = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        view = memoryview(buffer)
+
+        magic, version, n_tables = HEADER.unpack_from(buffer, 0)
+        if magic != MAGIC:
+            raise ValueError(f"{filepath} no es un archivo .cidx")
+        if version != VERSION:
+            raise ValueError(f"Versión .cidx no soportada: {version}")
+
+        pos = HEADER.size
+        tables = {}
+        for _ in range(n_tables):
+            name_len, n_keys, blob_len, n_postings = TABLE_HEADER.unpack_from(buffer, pos)
+            pos += TABLE_HEADER.size
+            name = bytes(view[pos:pos + name_len]).decode('utf-8')
+            pos = _aligned(pos + name_len)
+            keys_blob = view[pos:pos + blob_len]
+            pos = _aligned(pos + blob_len)
+
+            arrays = []
+            for length in (n_keys + 1, n_keys + 1, n_postings):
+                arrays.append(_uint32_view(view[pos:pos + 4 * length]))
+                pos += 4 * length
+            tables[name] = PostingTable(keys_blob, *arrays)
+
+        index = cls(tables)
+        index._file, index._mmap = f, buffer
+        return index
+
+    def close(self):
+        """
+        Cierra el archivo cargado con load()
+
+        Si el llamador aún guarda vistas (resultados de lookup), el mmap no
+        puede cerrarse ya: queda abierto hasta que se liberen.
+        """
+        # Liberar las vistas propias antes de cerrar el mmap
+        self.tables = {}
+        if self._mmap is not None:
+            try:
+                self._mmap.close()
+            except BufferError:
+                pass
+            self._file.close()
+            self._mmap = self._file = None
+
+def main():
+    parser = argparse.ArgumentParser(
+        description='Índice compacto (CSR) para CC-CEDICT parseado'
+    )
+    subparsers = parser.add_subparsers(dest='command', required=True)
+
+    build_parser = subparsers.add_parser('build', help='Convierte el bloque index de un JSON a .cidx')
+    build_parser.add_argument('input_file', help='JSON generado por cedict_parser.py')
+    build_parser.add_argument('output_file', help='Archivo .cidx')
+
+    lookup_parser = subparsers.add_parser('lookup', help='Consulta una tabla')
+    lookup_parser.add_argument('cidx_file')
+    lookup_parser.add_argument('table', help='by_simplified, by_traditional, by_pinyin...')
+    lookup_parser.add_argument('key')
+
+    args = parser.parse_args()
+
+    if args.command == 'build':
+        with open(args.input_file, 'r', encoding='utf-8') as f:
+            index = json.load(f)['index']
+        size = CompactIndex.from_dict(index).save(args.output_file)
+        print(f"Guardado en: {args.output_file} ({size / 1024:.1f} KB)")
+
+    elif args.command == 'lookup':
+        index = CompactIndex.load(args.cidx_file)
+        indices = list(index.lookup(args.table, args.key))
+        index.close()
+        if not indices:
+            print("Sin resultados")
+            sys.exit(1)
+        print(indices)
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,221 @@
+#!/usr/bin/env python3
+"""
+Reconstrucción incremental del CC-CEDICT traducido
+
+Compara una nueva versión de CC-CEDICT (MDBG) con la build anterior
+usando como clave (traditional, simplified, pinyin_tones), traduce solo
+las definiciones que no estaban traducidas, y escribe la nueva build
+junto con un delta compacto (añadidas / eliminadas / modificadas).
+
+Uso:
+    python incremental.py cedict_es.json cedict_1_0_ts_utf-8_mdbg.txt.gz \\
+        -o cedict_es_new.json --delta cedict_delta.json -s deepl -k API_KEY
+"""
+
+import sys
+import gzip
+import json
+import argparse
+from collections import defaultdict
+from typing import Dict, Iterable, List, Tuple
+
+from cedict_parser import create_search_index, parse_cedict_file
+from translate_to_spanish import (
+    DictionaryTranslator, TRANSLATOR_AVAILABLE, progress_bar, write_translated_dict_stream
+)
+from translation_cache import DEFAULT_CACHE_PATH
+
+# (traditional, simplified, pinyin_tones, nº de aparición de esa clave)
+EntryKey = Tuple[str, str, str, int]
+
+def _keyed(entries: Iterable[Dict]) -> Dict[EntryKey, Dict]:
+    """Asocia cada entrada a su clave; las claves repetidas se numeran por orden"""
+    seen = defaultdict(int)
+    keyed = {}
+    for entry in entries:
+        base = (entry['traditional'], entry['simplified'], entry['pinyin_tones'])
+        keyed[base + (seen[base],)] = entry
+        seen[base] += 1
+    return keyed
+
+def _english(entry: Dict) -> List[str]:
+    """Definiciones en inglés (las builds traducidas las guardan también en definitions_en)"""
+    return entry.get('definitions_en') or entry.get('definitions', [])
+
+def diff_entries(previous: Iterable[Dict], current: Iterable[Dict]) -> Dict:
+    """
+    Calcula entradas añadidas, eliminadas y modificadas
+
+    Una entrada está modificada si cambian sus definiciones en inglés o
+    sus clasificadores.
+
+    Returns:
+        Dict con 'added', 'changed' (entradas nuevas), 'removed' (claves
+        [traditional, simplified, pinyin_tones, nº de aparición]) y
+        'unchanged' (número de entradas sin cambios)
+    """
+    old = _keyed(previous)
+    new = _keyed(current)
+
+    added, changed = [], []
+    unchanged = 0
+    for key, entry in new.items():
+        before = old.get(key)
+        if before is None:
+            added.append(entry)
+        elif (_english(before) != entry.get('definitions', []) or
+              before.get('classifiers', []) != entry.get('classifiers', [])):
+            changed.append(entry)
+        else:
+            unchanged += 1
+
+    removed = [list(key) for key in old if key not in new]
+    return {'added': added, 'changed': changed, 'removed': removed, 'unchanged': unchanged}
+
+def known_translations(entries: Iterable[Dict]) -> Dict[str, str]:
+    """
+    Traducciones EN -> ES ya presentes en una build anterior
+
+    Se omiten las que son iguales al inglés: es lo que queda cuando la
+    traducción falló. Si de verdad no cambian, la caché del traductor las
+    devuelve sin petición.
+    """
+    translations = {}
+    for entry in entries:
+        english = _english(entry)
+        spanish = entry.get('definitions_es', [])
+        if len(english) == len(spanish):
+            translations.update((en, es) for en, es in zip(english, spanish) if es != en)
+    return translations
+
+def patch_entries(previous: List[Dict], current: List[Dict],
+                  translator: DictionaryTranslator,
+                  workers: int = 1, pack: bool = True,
+                  progress_callback=None) -> Tuple[List[Dict], Dict]:
+    """
+    Genera las entradas traducidas de la nueva versión
+
+    Las definiciones ya traducidas en la build anterior se reutilizan
+    (aunque aparezcan en otra entrada); solo las nuevas van al servicio,
+    junto con las que fallaron en la build anterior (es == en) aunque su
+    entrada no haya cambiado. Las entradas sin cambios cuya traducción se
+    recupera así van al delta como modificadas.
+
+    Returns:
+        (entradas traducidas en el orden de la nueva versión, delta)
+    """
+    diff = diff_entries(previous, current)
+    translations = known_translations(previous)
+
+    # Todas las entradas: las sin cambios también, por si su traducción falló
+    pending = list(dict.fromkeys(
+        d for entry in current
+        for d in entry.get('definitions', [])
+        if d and d.strip() and d not in translations
+    ))
+    translations.update(translator.translate_texts(
+        pending, workers=workers, pack=pack, progress_callback=progress_callback
+    ))
+
+    patched = translator.apply_translations(current, translations)
+    by_key = _keyed(patched)
+    old = _keyed(previous)
+    # Claves en la versión completa (el nº de aparición cuenta todas las entradas)
+    keys = {id(entry): key for key, entry in _keyed(current).items()}
+    added = [keys[id(entry)] for entry in diff['added']]
+    changed = [keys[id(entry)] for entry in diff['changed']]
+    modified = set(added) | set(changed)
+    retried = [key for key, entry in by_key.items()
+               if key not in modified and
+               entry['definitions_es'] != old[key].get('definitions_es', [])]
+    delta = {
+        'added': [by_key[key] for key in added],
+        'changed': [by_key[key] for key in changed + retried],
+        'removed': diff['removed'],
+        'stats': {
+            'added': len(diff['added']),
+            'changed': len(diff['changed']),
+            'removed': len(diff['removed']),
+            'unchanged': diff['unchanged'] - len(retried),
+            'retried': len(retried),
+            'translated_definitions': len(pending)
+        }
+    }
+    return patched, delta
+
+def load_build(filepath: str) -> Dict:
+    """Carga una build traducida (.json o .json.gz)"""
+    opener = gzip.open if filepath.endswith('.gz') else open
+    with opener(filepath, 'rt', encoding='utf-8') as f:
+        return json.load(f)
+
+def main():
+    parser = argparse.ArgumentParser(
+        description='Actualiza una build CEDICT-ES con una nueva versión de CC-CEDICT'
+    )
+    parser.add_argument('previous_build', help='Build traducida anterior (JSON de translate_to_spanish.py)')
+    parser.add_argument('new_release', help='Nueva versión de CC-CEDICT (.txt o .txt.gz)')
+    parser.add_argument('-o', '--output', required=True, help='Nueva build traducida')
+    parser.add_argument('--delta', help='Archivo de delta (default: <salida>_delta.json)')
+    parser.add_argument('-s', '--service', choices=['google', 'deepl', 'stub'], default='google')
+    parser.add_argument('-k', '--api-key', help='API key para DeepL')
+    parser.add_argument('-w', '--workers', type=int, default=1)
+    parser.add_argument('-r', '--rate', type=float, help='Máximo de peticiones por segundo')
+    parser.add_argument('--no-pack', action='store_true', help='Una petición por definición')
+    parser.add_argument('--cache', default=DEFAULT_CACHE_PATH)
+    parser.add_argument('--no-cache', action='store_true')
+    parser.add_argument('-c', '--compress', action='store_true', help='Comprimir salida con gzip')
+
+    args = parser.parse_args()
+
+    if not TRANSLATOR_AVAILABLE and args.service != 'stub':
+        print("❌ Instala deep-translator: pip install deep-translator")
+        sys.exit(1)
+
+    print(f"📖 Cargando build anterior {args.previous_build}...")
+    previous = load_build(args.previous_build).get('entries', [])
+    print(f"📖 Parseando {args.new_release}...")
+    current = parse_cedict_file(args.new_release)
+    print(f"   Anterior: {len(previous)} entradas, nueva: {len(current)} entradas\n")
+
+    translator = DictionaryTranslator(
+        service=args.service,
+        api_key=args.api_key,
+        rate=args.rate,
+        cache_path=None if args.no_cache else args.cache
+    )
+    patched, delta = patch_entries(
+        previous, current, translator,
+        workers=args.workers, pack=not args.no_pack,
+        progress_callback=progress_bar
+    )
+    translator.close()
+
+    stats = delta['stats']
+    print(f"\n🔀 Añadidas: {stats['added']}, modificadas: {stats['changed']}, "
+          f"eliminadas: {stats['removed']}, sin cambios: {stats['unchanged']}")
+    if stats['retried']:
+        print(f"   Traducciones fallidas recuperadas: {stats['retried']} entradas")
+    print(f"   Definiciones traducidas: {stats['translated_definitions']} "
+          f"({translator.stats['requests']} peticiones)")
+
+    metadata = {
+        'source': 'CC-CEDICT',
+        'translated_by': args.service,
+        'entries_count': len(patched),
+        'language_definitions': 'es',
+        'language_chinese': 'zh'
+    }
+    print(f"\n💾 Guardando en {args.output}...")
+    write_translated_dict_stream(patched, args.output, metadata,
+                                 create_search_index(patched), compress=args.compress)
+
+    delta_path = args.delta or args.output.replace('.json', '') + '_delta.json'
+    with open(delta_path, 'w', encoding='utf-8') as f:
+        json.dump(delta, f, ensure_ascii=False)
+    print(f"   Delta guardado en {delta_path}")
+
+    print("\n✨ ¡Listo!")
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,188 @@
+#!/usr/bin/env python3
+"""
+Conversión de pinyin entre números de tono, marcas de tono y sin tono
+Ejemplo: han4 zi4 <-> hàn zì -> han zi
+
+Las sílabas numeradas se convierten con una tabla precalculada a partir
+del inventario de sílabas del mandarín; las que no están en la tabla
+(letras sueltas, 'u:', etc.) se convierten una vez y quedan memorizadas.
+"""
+
+import re
+import unicodedata
+from typing import Dict
+
+TONE_MARKS = {
+    'a': ['ā', 'á', 'ǎ', 'à', 'a'],
+    'e': ['ē', 'é', 'ě', 'è', 'e'],
+    'i': ['ī', 'í', 'ǐ', 'ì', 'i'],
+    'o': ['ō', 'ó', 'ǒ', 'ò', 'o'],
+    'u': ['ū', 'ú', 'ǔ', 'ù', 'u'],
+    'ü': ['ǖ', 'ǘ', 'ǚ', 'ǜ', 'ü'],
+    'v': ['ǖ', 'ǘ', 'ǚ', 'ǜ', 'ü'],  # v se usa como ü en algunos sistemas
+}
+
+# Sílabas sin tono presentes en CC-CEDICT (más las variantes con ü/v)
+PINYIN_SYLLABLES = '''
+    a ai an ang ao ba bai ban bang bao bei ben beng bi bia bian biang biao
+    bie bin bing biu bo bu ca cai can cang cao ce cen ceng cha chai chan
+    chang chao che chen cheng chi chong chou chu chua chuai chuan chuang
+    chui chun chuo ci cong cou cu cuan cui cun cuo da dai dan dang dao de
+    dei den deng di dia dian diao die ding diu dong dou du duan dui dun duo
+    e ei en eng er fa fan fang fei fen feng fiao fo fou fu ga gai gan gang
+    gao ge gei gen geng ging gong gou gu gua guai guan guang gui gun guo ha
+    hai han hang hao he hei hen heng hm hng hong hou hu hua huai huan huang
+    hui hun huo ji jia jian jiang jiao jie jin jing jiong jiu ju juan jue
+    jun ka kai kan kang kao ke kei ken keng kong kou ku kua kuai kuan kuang
+    kui kun kuo la lai lan lang lao le lei leng li lia lian liang liao lie
+    lin ling liu lo long lou lu luan lun luo m ma mai man mang mao me mei
+    men meng mi mian miao mie min ming miu mo mou mu na nai nan nang nao ne
+    nei nen neng ni nian niang niao nie nin ning niu nong nou nu nuan nun
+    nuo o ou pa pai pan pang pao pei pen peng pi pian piao pie pin ping po
+    pou pu qi qia qian qiang qiao qie qin qing qiong qiu qu quan que qun r
+    ran rang rao re ren reng ri rong rou ru rua ruan rui run ruo sa sai san
+    sang sao se sei sen seng sha shai shan shang shao she shei shen sheng
+    shi shou shu shua shuai shuan shuang shui shun shuo si song sou su suan
+    sui sun suo ta tai tan tang tao te tei teng ti tian tiao tie ting tong
+    tou tu tuan tui tun tuo wa wai wan wang wei wen weng wo wu xi xia xian
+    xiang xiao xie xin xing xiong xiu xu xuan xue xun ya yan yang yao ye yi
+    yin ying yo yong you yu yuan yue yun za zai zan zang zao ze zei zen
+    zeng zha zhai zhan zhang zhao zhe zhei zhen zheng zhi zhong zhou zhu
+    zhua zhuai zhuan zhuang zhui zhun zhuo zi zong zou zu zuan zui zun zuo
+    lü lüe nü nüe lv lve nv nve
+'''.split()
+
+# Marcas combinantes (NFD) de cada tono
+_COMBINING_TONES = {
+    '\u0304': 1,  # macrón
+    '\u0301': 2,  # agudo
+    '\u030c': 3,  # caron
+    '\u0300': 4,  # grave
+}
+
+_SYLLABLE_PATTERN = re.compile(r'([a-züv]+)([1-5])?')
+_TONE_DIGITS = re.compile(r'[1-5]')
+
+def _convert_syllable(syllable: str) -> str:
+    """Convierte una sílaba numerada aplicando las reglas de colocación de tono"""
+    if not syllable:
+        return syllable
+
+    # Extraer el número de tono (1-5, donde 5 es tono neutro)
+    match = _SYLLABLE_PATTERN.match(syllable.lower())
+    if not match:
+        return syllable
+
+    letters = match.group(1)
+    tone = int(match.group(2)) if match.group(2) else 5
+
+    # Reglas para colocar la marca de tono:
+    # 1. Si hay 'a' o 'e', va ahí
+    # 2. Si hay 'ou', va en la 'o'
+    # 3. En otros casos, va en la última vocal
+
+    result = list(letters)
+    vowel_positions = [(i, c) for i, c in enumerate(letters) if c in 'aeiouüv']
+
+    if not vowel_positions:
+        return syllable
+
+    # Determinar posición de la marca
+    tone_pos = None
+    for i, v in vowel_positions:
+        if v in 'ae':
+            tone_pos = i
+            break
+
+    if tone_pos is None:
+        # Buscar 'ou'
+        if 'ou' in letters:
+            tone_pos = letters.index('o')
+        else:
+            # Última vocal
+            tone_pos = vowel_positions[-1][0]
+
+    # Aplicar marca de tono
+    vowel = result[tone_pos]
+    if vowel in TONE_MARKS:
+        result[tone_pos] = TONE_MARKS[vowel][tone - 1]
+
+    return ''.join(result)
+
+def _build_marked_table() -> Dict[str, str]:
+    """Precalcula numerada -> con marca para todo el inventario (y mayúscula inicial)"""
+    table = {}
+    for base in PINYIN_SYLLABLES:
+        for variant in (base, base.capitalize()):
+            for tone in '12345':
+                table[variant + tone] = _convert_syllable(variant + tone)
+    return table
+
+# Tabla numerada -> con marca; también actúa como memo para sílabas fuera del inventario
+_MARKED = _build_marked_table()
+_NUMBERED: Dict[str, str] = {}
+
+def numbered_syllable_to_marked(syllable: str) -> str:
+    """Convierte una sílaba: han4 -> hàn"""
+    try:
+        return _MARKED[syllable]
+    except KeyError:
+        marked = _MARKED[syllable] = _convert_syllable(syllable)
+        return marked
+
+def numbered_to_marked(pinyin: str) -> str:
+    """
+    Convierte pinyin con números a pinyin con marcas de tono
+    Ejemplo: han4 zi4 -> hàn zì
+    """
+    syllables = pinyin.split()
+    try:
+        # Camino rápido: todas las sílabas ya están en la tabla
+        return ' '.join([_MARKED[s] for s in syllables])
+    except KeyError:
+        return ' '.join([numbered_syllable_to_marked(s) for s in syllables])
+
+def marked_syllable_to_numbered(syllable: str) -> str:
+    """Convierte una sílaba: hàn -> han4, xie -> xie5"""
+    try:
+        return _NUMBERED[syllable]
+    except KeyError:
+        pass
+
+    tone = 5
+    letters = []
+    for c in unicodedata.normalize('NFD', syllable):
+        if c in _COMBINING_TONES:
+            tone = _COMBINING_TONES[c]
+        else:
+            letters.append(c)
+    base = unicodedata.normalize('NFC', ''.join(letters))
+
+    # Sin vocales (letras sueltas, puntuación) no hay tono que anotar
+    has_vowel = any(c in 'aeiouüv' for c in base.lower())
+    numbered = base + str(tone) if has_vowel and not base[-1:].isdigit() else base
+    _NUMBERED[syllable] = numbered
+    return numbered
+
+def marked_to_numbered(pinyin: str) -> str:
+    """
+    Convierte pinyin con marcas de tono a pinyin con números
+    Ejemplo: hàn zì -> han4 zi4
+    """
+    return ' '.join([marked_syllable_to_numbered(s) for s in pinyin.split()])
+
+def marked_to_toneless(pinyin: str) -> str:
+    """
+    Quita las marcas de tono conservando la ü
+    Ejemplo: lǚ xíng -> lü xing
+    """
+    decomposed = unicodedata.normalize('NFD', pinyin)
+    stripped = ''.join(c for c in decomposed if c not in _COMBINING_TONES)
+    return unicodedata.normalize('NFC', stripped)
+
+def numbered_to_toneless(pinyin: str) -> str:
+    """
+    Quita los números de tono
+    Ejemplo: han4 zi4 -> han zi
+    """
+    return _TONE_DIGITS.sub('', pinyin)
@@ -0,0 +1,306 @@
+#!/usr/bin/env python3
+"""
+Métricas del pipeline: tiempos por etapa, contadores e histogramas de latencia
+
+Desactivado por defecto: METRICS.stage/observe/count no hacen nada y
+las funciones instrumentadas con instrument() se dejan intactas, así
+que un build normal no paga nada. Con enable() se registran:
+
+    stages      {nombre: {count, seconds, items}}  (tiempos inclusivos:
+                una etapa anidada también cuenta en la que la contiene)
+    counters    {nombre: valor}
+    histograms  {nombre: buckets de latencia, p50/p90/p99, mín/máx}
+
+y al salir del proceso se escribe un resumen JSON. Opcionalmente
+también un perfil cProfile (.prof) y el pico/top de memoria de
+tracemalloc.
+
+Uso desde los scripts:
+    python cedict_parser.py cedict_ts.u8 --metrics parse_metrics.json --profile parse.prof
+    python translate_to_spanish.py in.json -o out.json --metrics translate_metrics.json
+"""
+
+import io
+import json
+import time
+import atexit
+import pstats
+import cProfile
+import threading
+import functools
+import tracemalloc
+from bisect import bisect_left
+from contextlib import contextmanager
+from typing import Dict, Iterable, Iterator, List, Optional
+
+# Límites superiores de los buckets de latencia, en milisegundos
+LATENCY_BUCKETS_MS = (1, 2, 5, 10, 20, 50, 100, 200, 500, 1000, 2000, 5000, 10000, 30000)
+
+class LatencyHistogram:
+    """Histograma de latencias con buckets fijos (memoria constante)"""
+
+    def __init__(self, bounds_ms: Iterable[float] = LATENCY_BUCKETS_MS):
+        self.bounds_ms = list(bounds_ms)
+        self.counts = [0] * (len(self.bounds_ms) + 1)
+        self.total = 0
+        self.seconds = 0.0
+        self.min = None
+        self.max = None
+
+    def observe(self, seconds: float):
+        self.counts[bisect_left(self.bounds_ms, seconds * 1000)] += 1
+        self.total += 1
+        self.seconds += seconds
+        self.min = seconds if self.min is None else min(self.min, seconds)
+        self.max = seconds if self.max is None else max(self.max, seconds)
+
+    def quantile(self, q: float) -> Optional[float]:
+        """Cota superior (segundos) del bucket que contiene el cuantil q"""
+        if not self.total:
+            return None
+        target = q * self.total
+        running = 0
+        for bound, count in zip(self.bounds_ms + [None], self.counts):
+            running += count
+            if running >= target:
+                return self.max if bound is None else min(bound / 1000, self.max)
+        return self.max
+
+    def summary(self) -> Dict:
+        labels = [f'<={bound}ms' for bound in self.bounds_ms] + [f'>{self.bounds_ms[-1]}ms']
+        return {
+            'count': self.total,
+            'mean_seconds': round(self.seconds / self.total, 6) if self.total else None,
+            'min_seconds': self.min,
+            'max_seconds': self.max,
+            'p50_seconds': self.quantile(0.5),
+            'p90_seconds': self.quantile(0.9),
+            'p99_seconds': self.quantile(0.99),
+            'buckets': {label: count for label, count in zip(labels, self.counts) if count}
+        }
+
+class PipelineMetrics:
+    """Registro de métricas del proceso (ver METRICS)"""
+
+    def __init__(self):
+        self.enabled = False
+        self.started = time.perf_counter()
+        self.stages: Dict[str, Dict] = {}
+        self.counters: Dict[str, int] = {}
+        self.histograms: Dict[str, LatencyHistogram] = {}
+        self.info: Dict = {}
+        self._lock = threading.Lock()
+        self._profiler = None
+        self._profile_path = None
+        self._summary_path = None
+
+    def enable(self, summary_path: Optional[str] = None, profile_path: Optional[str] = None,
+               trace_memory: bool = False, **info):
+        """
+        Activa el registro y escribe el resumen al salir
+
+        Args:
+            summary_path: JSON de resumen (None = no escribir)
+            profile_path: Volcado cProfile (.prof, ver `python -m pstats`)
+            trace_memory: Medir el pico de memoria Python con tracemalloc
+            info: Datos libres para el resumen (script, argumentos...)
+        """
+        self.enabled = True
+        self.started = time.perf_counter()
+        self.info.update(info)
+        self._summary_path = summary_path
+        if profile_path:
+            self._profile_path = profile_path
+            self._profiler = cProfile.Profile()
+            self._profiler.enable()
+        if trace_memory:
+            tracemalloc.start()
+        atexit.register(self.finish)
+
+    def _stage_record(self, name: str) -> Dict:
+        record = self.stages.get(name)
+        if record is None:
+            record = self.stages[name] = {'count': 0, 'seconds': 0.0, 'items': 0}
+        return record
+
+    def add_time(self, name: str, seconds: float, items: int = 0):
+        if not self.enabled:
+            return
+        with self._lock:
+            record = self._stage_record(name)
+            record['count'] += 1
+            record['seconds'] += seconds
+            record['items'] += items
+
+    @contextmanager
+    def stage(self, name: str, items: int = 0):
+        """Mide un bloque: with METRICS.stage('serialize'): ..."""
+        if not self.enabled:
+            yield
+            return
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.add_time(name, time.perf_counter() - start, items)
+
+    def count(self, name: str, n: int = 1):
+        if not self.enabled:
+            return
+        with self._lock:
+            self.counters[name] = self.counters.get(name, 0) + n
+
+    def observe(self, name: str, seconds: float):
+        """Añade una latencia al histograma `name`"""
+        if not self.enabled:
+            return
+        with self._lock:
+            histogram = self.histograms.get(name)
+            if histogram is None:
+                histogram = self.histograms[name] = LatencyHistogram()
+            histogram.observe(seconds)
+
+    def timed(self, func, name: str):
+        """
+        Envuelve func para medir cada llamada en la etapa `name`
+
+        Con las métricas desactivadas devuelve func sin cambios.
+        """
+        if not self.enabled:
+            return func
+
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            start = time.perf_counter()
+            try:
+                return func(*args, **kwargs)
+            finally:
+                self.add_time(name, time.perf_counter() - start, 1)
+        return wrapper
+
+    def instrument(self, owner, attribute: str, name: str):
+        """
+        Sustituye owner.attribute (función de módulo o método de clase)
+        por su versión medida; no hace nada si las métricas están desactivadas
+        """
+        if self.enabled:
+            setattr(owner, attribute, self.timed(getattr(owner, attribute), name))
+
+    def print_summary(self, result: Dict, limit: int = 8):
+        print(f"\n📊 Métricas ({result['wall_seconds']:.1f}s en total):")
+        for name, stage in list(result['stages'].items())[:limit]:
+            rate = f"{stage['items_per_second']:>12.1f}/s" if stage['items_per_second'] else ' ' * 14
+            print(f"   {name:<20} {stage['seconds']:>9.2f}s {stage['share_of_wall']:>7.1%} {rate}")
+        for name, histogram in result['histograms'].items():
+            print(f"   {name:<20} {histogram['count']} llamadas, p50 {histogram['p50_seconds']:.3f}s, "
+                  f"p99 {histogram['p99_seconds']:.3f}s")
+
+    def timed_iter(self, iterable: Iterable, name: str) -> Iterator:
+        """Mide el tiempo de producir cada elemento (p. ej. leer y descomprimir líneas)"""
+        if not self.enabled:
+            return iter(iterable)
+        return self._timed_iter(iter(iterable), name)
+
+    def _timed_iter(self, iterator: Iterator, name: str) -> Iterator:
+        seconds = 0.0
+        items = 0
+        try:
+            while True:
+                start = time.perf_counter()
+                try:
+                    item = next(iterator)
+                except StopIteration:
+                    seconds += time.perf_counter() - start
+                    break
+                seconds += time.perf_counter() - start
+                items += 1
+                yield item
+        finally:
+            # Un solo registro por iteración completa (o interrumpida)
+            self.add_time(name, seconds, items)
+
+    def summary(self) -> Dict:
+        wall = time.perf_counter() - self.started
+        with self._lock:
+            stages = {
+                name: {
+                    'count': record['count'],
+                    'seconds': round(record['seconds'], 4),
+                    'share_of_wall': round(record['seconds'] / wall, 4) if wall else None,
+                    'items': record['items'],
+                    'items_per_second': (round(record['items'] / record['seconds'], 1)
+                                         if record['items'] and record['seconds'] else None)
+                }
+                for name, record in sorted(self.stages.items(),
+                                           key=lambda item: -item[1]['seconds'])
+            }
+            result = {
+                'info': self.info,
+                'wall_seconds': round(wall, 3),
+                'stages': stages,
+                'counters': dict(self.counters),
+                'histograms': {name: h.summary() for name, h in self.histograms.items()}
+            }
+
+        if tracemalloc.is_tracing():
+            current, peak = tracemalloc.get_traced_memory()
+            top = tracemalloc.take_snapshot().statistics('lineno')[:10]
+            result['memory'] = {
+                'current_bytes': current,
+                'peak_bytes': peak,
+                'top': [{'where': str(stat.traceback[0]), 'bytes': stat.size, 'blocks': stat.count}
+                        for stat in top]
+            }
+        return result
+
+    def _profile_top(self, limit: int = 25) -> List[Dict]:
+        stats = pstats.Stats(self._profiler, stream=io.StringIO())
+        rows = []
+        for (filename, line, function), (_, calls, total, cumulative, _) in stats.stats.items():
+            rows.append({
+                'function': f'{filename}:{line}({function})',
+                'calls': calls,
+                'tottime': round(total, 4),
+                'cumtime': round(cumulative, 4)
+            })
+        rows.sort(key=lambda row: -row['tottime'])
+        return rows[:limit]
+
+    def finish(self) -> Optional[Dict]:
+        """Detiene el perfil y escribe el resumen (se llama sola al salir)"""
+        if not self.enabled:
+            return None
+        if self._profiler is not None:
+            self._profiler.disable()
+
+        result = self.summary()
+        if self._profiler is not None:
+            self._profiler.dump_stats(self._profile_path)
+            result['profile'] = {'path': self._profile_path, 'top_tottime': self._profile_top()}
+            self._profiler = None
+
+        self.print_summary(result)
+        if self._summary_path:
+            with open(self._summary_path, 'w', encoding='utf-8') as f:
+                json.dump(result, f, ensure_ascii=False, indent=2)
+            print(f"   Resumen guardado en: {self._summary_path}")
+        if tracemalloc.is_tracing():
+            tracemalloc.stop()
+        self.enabled = False
+        return result
+
+def add_arguments(parser):
+    """Opciones comunes --metrics / --profile / --trace-memory de los scripts"""
+    parser.add_argument('--metrics', help='Escribir al salir un resumen JSON con tiempos por etapa, '
+                                          'contadores e histogramas de latencia')
+    parser.add_argument('--profile', help='Guardar un perfil cProfile en este archivo (.prof)')
+    parser.add_argument('--trace-memory', action='store_true',
+                        help='Incluir en --metrics el pico y las líneas que más memoria reservan (tracemalloc)')
+
+def enable_from_args(args, script: str):
+    """Activa METRICS si se pidió alguna de las opciones de add_arguments"""
+    if args.metrics or args.profile or args.trace_memory:
+        METRICS.enable(args.metrics, args.profile, args.trace_memory,
+                       script=script, arguments=vars(args))
+
+METRICS = PipelineMetrics()
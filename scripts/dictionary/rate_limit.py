@@ -0,0 +1,40 @@
+#!/usr/bin/env python3
+"""
+Limitador de tasa compartido por el traductor y los scripts de audio
+
+Sin dependencias: audio_batch.py (en la raíz del repo) lo carga por ruta
+sin importar los backends de traducción.
+"""
+
+import time
+import threading
+from typing import Optional
+
+class TokenBucket:
+    """
+    Limitador de tasa token-bucket, seguro entre hilos
+
+    Args:
+        rate: Tokens (peticiones) por segundo
+        capacity: Ráfaga máxima (default: rate, mínimo 1)
+    """
+
+    def __init__(self, rate: float, capacity: Optional[float] = None):
+        self.rate = rate
+        self.capacity = max(1.0, capacity if capacity is not None else rate)
+        self.tokens = self.capacity
+        self.updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def acquire(self, tokens: float = 1.0):
+        """Bloquea hasta disponer de los tokens pedidos"""
+        while True:
+            with self._lock:
+                now = time.monotonic()
+                self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+                self.updated = now
+                if self.tokens >= tokens:
+                    self.tokens -= tokens
+                    return
+                wait = (tokens - self.tokens) / self.rate
+            time.sleep(wait)
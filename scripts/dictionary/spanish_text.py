@@ -0,0 +1,58 @@
+#!/usr/bin/env python3
+"""
+Normalización y tokenización de texto en español sin acentos
+
+La usan la corrección ortográfica (symspell.py), que debe tolerar acentos
+olvidados, y las claves de index_spanish (client_index.spanish_terms);
+normalize_spanish tiene su gemela foldSpanish en dictionaryService.js.
+
+Reglas: minúsculas, sin acentos ni diéresis (la ñ se conserva),
+sin puntuación; se descartan tokens de menos de 2 caracteres.
+Ejemplo: "¡Árbol, pingüino y año!" -> ['arbol', 'pinguino', 'año']
+"""
+
+import re
+import unicodedata
+from typing import Dict, List, Tuple
+
+MIN_TOKEN_LENGTH = 2
+
+def _build_accent_table() -> Dict[int, str]:
+    """Tabla para str.translate: letra acentuada -> letra base (excepto ñ)"""
+    table = {}
+    for code in range(0xC0, 0x250):
+        char = chr(code)
+        if char in 'ñÑ':
+            continue
+        base = unicodedata.normalize('NFD', char)[0]
+        if base != char and base.isascii():
+            table[code] = base
+    return table
+
+_ACCENT_TABLE = _build_accent_table()
+_TOKEN_PATTERN = re.compile(r'[^\W_]+')
+
+def normalize_spanish(text: str) -> str:
+    """Pasa a minúsculas y quita acentos conservando la ñ"""
+    return text.lower().translate(_ACCENT_TABLE)
+
+def tokenize_spanish(text: str) -> List[str]:
+    """Tokens normalizados de una definición, en orden de aparición"""
+    return [token for token in _TOKEN_PATTERN.findall(normalize_spanish(text))
+            if len(token) >= MIN_TOKEN_LENGTH]
+
+def load_frequencies(filepath: str) -> List[Tuple[str, int]]:
+    """
+    Lee 'palabra frecuencia' por línea (formato FrequencyWords)
+
+    Palabras en minúsculas, en el orden del archivo; las que solo se
+    distinguían por mayúsculas (Casa / casa) suman su frecuencia.
+    """
+    frequencies = {}
+    with open(filepath, 'r', encoding='utf-8') as f:
+        for line in f:
+            parts = line.split()
+            if len(parts) == 2 and parts[1].isdigit():
+                word = parts[0].lower()
+                frequencies[word] = frequencies.get(word, 0) + int(parts[1])
+    return list(frequencies.items())
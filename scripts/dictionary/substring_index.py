@@ -0,0 +1,198 @@
+#!/usr/bin/env python3
+"""
+Índices para búsqueda parcial: n-gramas de caracteres y prefijos de pinyin
+
+Sustituyen los recorridos lineales de la búsqueda parcial:
+    by_ngram          cada carácter y cada bigrama de simplificado/tradicional
+                      -> entradas que lo contienen
+    by_pinyin_prefix  pinyin normalizado (sin tonos ni espacios, como
+                      normalizePinyin del cliente) desde cada sílaba
+                      -> entradas; las claves ordenadas permiten buscar
+                      por prefijo con bisect
+
+Una consulta china de n caracteres intersecta las listas de sus bigramas
+(la más corta primero) y verifica los candidatos con `in`. Se guarda en
+formato .cidx (ver compact_index.py) junto a las entradas.
+
+Uso:
+    python substring_index.py build cedict_ts_parsed.json cedict_ts_parsed.sidx
+    python substring_index.py chinese cedict_ts_parsed.json cedict_ts_parsed.sidx 中国
+    python substring_index.py pinyin cedict_ts_parsed.json cedict_ts_parsed.sidx zhongg
+"""
+
+import re
+import sys
+import json
+import argparse
+import unicodedata
+from typing import Dict, Iterable, List, Optional, Sequence
+
+from compact_index import CompactIndex
+
+_COMBINING = re.compile(r'[\u0300-\u036f]')
+# Espacios de \s en JavaScript (el \s de Python difiere: incluye \x1c-\x1f
+# y \x85, no incluye \ufeff)
+JS_WHITESPACE = '\t\n\v\f\r \u00a0\u1680\u2000-\u200a\u2028\u2029\u202f\u205f\u3000\ufeff'
+_SPACES = re.compile(f'[{JS_WHITESPACE}]+')
+
+def normalize_pinyin(pinyin: str) -> str:
+    """Igual que normalizePinyin en dictionaryService.js: nǐ hǎo -> nihao, lǜ -> lu"""
+    text = _SPACES.sub('', pinyin.lower())
+    return _COMBINING.sub('', unicodedata.normalize('NFD', text))
+
+def char_ngrams(text: str) -> List[str]:
+    """Caracteres y bigramas de un texto, sin repetir"""
+    grams = list(text) + [text[i:i + 2] for i in range(len(text) - 1)]
+    return list(dict.fromkeys(grams))
+
+def pinyin_suffix_keys(pinyin: str) -> List[str]:
+    """Clave normalizada desde cada sílaba: 'nǐ hǎo ma' -> nihaoma, haoma, ma"""
+    syllables = [normalize_pinyin(s) for s in pinyin.split()]
+    syllables = [s for s in syllables if s]
+    keys = [''.join(syllables[k:]) for k in range(len(syllables))]
+    return list(dict.fromkeys(keys))
+
+class SubstringIndexBuilder:
+    """Construye by_ngram y by_pinyin_prefix entrada por entrada"""
+
+    def __init__(self):
+        self.count = 0
+        self.index = {
+            'by_ngram': {},
+            'by_pinyin_prefix': {}
+        }
+
+    def add(self, entry: Dict) -> int:
+        i = self.count
+        ngrams = self.index['by_ngram']
+        for gram in dict.fromkeys(char_ngrams(entry['simplified']) +
+                                  char_ngrams(entry['traditional'])):
+            ngrams.setdefault(gram, []).append(i)
+
+        prefixes = self.index['by_pinyin_prefix']
+        for key in pinyin_suffix_keys(entry.get('pinyin') or ''):
+            prefixes.setdefault(key, []).append(i)
+
+        self.count += 1
+        return i
+
+def create_substring_index(entries: Iterable[Dict]) -> CompactIndex:
+    builder = SubstringIndexBuilder()
+    for entry in entries:
+        builder.add(entry)
+    return CompactIndex.from_dict(builder.index)
+
+def _intersect(lists: List[Sequence[int]]) -> List[int]:
+    lists = sorted(lists, key=len)
+    candidates = list(lists[0])
+    for postings in lists[1:]:
+        if not candidates:
+            break
+        present = set(postings)
+        candidates = [i for i in candidates if i in present]
+    return candidates
+
+def search_chinese_substring(index: CompactIndex, entries: Sequence[Dict],
+                             query: str, limit: Optional[int] = None) -> List[int]:
+    """
+    Índices de entradas cuyo simplificado o tradicional contiene query
+
+    Solo se tocan las listas de los bigramas de la consulta; los candidatos
+    de la intersección se verifican contra el texto.
+    """
+    if not query:
+        return []
+    grams = [query] if len(query) == 1 else [query[i:i + 2] for i in range(len(query) - 1)]
+    lists = [index.lookup('by_ngram', gram) for gram in dict.fromkeys(grams)]
+    if any(len(postings) == 0 for postings in lists):
+        return []
+
+    results = []
+    for i in _intersect(lists):
+        entry = entries[i]
+        if len(query) <= 2 or query in entry['simplified'] or query in entry['traditional']:
+            results.append(i)
+            if limit and len(results) >= limit:
+                break
+    return results
+
+def search_pinyin_prefix(index: CompactIndex, query: str, limit: Optional[int] = None,
+                         entries: Optional[Sequence[Dict]] = None) -> List[int]:
+    """
+    Índices de entradas cuyo pinyin, desde alguna sílaba, empieza por query
+
+    Los resultados van en orden de entrada o, si se pasan las entradas,
+    ordenados con rank_pinyin_results; limit se aplica después de ordenar.
+    """
+    table = index['by_pinyin_prefix']
+    start, end = table.prefix_range(normalize_pinyin(query))
+    results = set()
+    for k in range(start, end):
+        results.update(table.postings[table.posting_offsets[k]:table.posting_offsets[k + 1]])
+    ranked = sorted(results)
+    if entries is None:
+        return ranked[:limit] if limit else ranked
+    if not limit:
+        return rank_pinyin_results(ranked, entries, query)
+
+    # Mismo orden que rank_pinyin_results, parando al reunir limit de los primeros
+    normalized = normalize_pinyin(query)
+    first, rest = [], []
+    for i in ranked:
+        if normalize_pinyin(entries[i]['pinyin']).startswith(normalized):
+            first.append(i)
+            if len(first) >= limit:
+                return first
+        elif len(rest) < limit:
+            rest.append(i)
+    return (first + rest)[:limit]
+
+def rank_pinyin_results(indices: List[int], entries: Sequence[Dict], query: str) -> List[int]:
+    """Primero las entradas cuyo pinyin completo empieza por la consulta (orden estable)"""
+    normalized = normalize_pinyin(query)
+    return sorted(indices, key=lambda i: not normalize_pinyin(entries[i]['pinyin']).startswith(normalized))
+
+def main():
+    parser = argparse.ArgumentParser(
+        description='Índices de n-gramas y prefijos de pinyin para búsqueda parcial'
+    )
+    subparsers = parser.add_subparsers(dest='command', required=True)
+
+    build_parser = subparsers.add_parser('build', help='Genera el .sidx desde un JSON parseado')
+    build_parser.add_argument('input_file', help='JSON generado por cedict_parser.py')
+    build_parser.add_argument('output_file', help='Archivo .sidx')
+
+    for command, help_text in (('chinese', 'Búsqueda por subcadena china'),
+                               ('pinyin', 'Búsqueda por prefijo de pinyin')):
+        query_parser = subparsers.add_parser(command, help=help_text)
+        query_parser.add_argument('input_file', help='JSON generado por cedict_parser.py')
+        query_parser.add_argument('sidx_file')
+        query_parser.add_argument('query')
+        query_parser.add_argument('-n', '--limit', type=int, default=20)
+
+    args = parser.parse_args()
+
+    with open(args.input_file, 'r', encoding='utf-8') as f:
+        entries = json.load(f)['entries']
+
+    if args.command == 'build':
+        size = create_substring_index(entries).save(args.output_file)
+        print(f"Guardado en: {args.output_file} ({size / 1024:.1f} KB)")
+        return
+
+    index = CompactIndex.load(args.sidx_file)
+    if args.command == 'chinese':
+        indices = search_chinese_substring(index, entries, args.query, args.limit)
+    else:
+        indices = search_pinyin_prefix(index, args.query, args.limit, entries)
+    index.close()
+
+    if not indices:
+        print("Sin resultados")
+        sys.exit(1)
+    for i in indices:
+        entry = entries[i]
+        print(f"{entry['simplified']} [{entry['pinyin']}] {'; '.join(entry['definitions'][:2])}")
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,163 @@
+#!/usr/bin/env python3
+"""
+Tests de regresión de los índices: SymSpell, .cedb y .cidx
+
+SymSpell se compara con una búsqueda por fuerza bruta sobre todo el
+vocabulario; los formatos binarios, con las entradas y el índice de
+sample_cedict.txt de los que salen.
+
+Ejecutar: python -m pytest scripts/dictionary
+"""
+
+import random
+from pathlib import Path
+
+import pytest
+
+from cedict_binary import CedictBinary, FIELDS, pinyin_key, write_binary
+from cedict_parser import create_search_index, parse_cedict_file
+from compact_index import CompactIndex
+from spanish_text import load_frequencies, normalize_spanish
+from symspell import DEFAULT_FREQUENCIES, SymSpell
+
+SAMPLE_CEDICT = Path(__file__).with_name('sample_cedict.txt')
+
+# Palabras de es_50k en el índice (las más frecuentes)
+VOCABULARY_SIZE = 2000
+
+def osa_distance(a, b):
+    """Damerau-Levenshtein (OSA) por programación dinámica, sin cotas"""
+    previous2 = None
+    previous = list(range(len(b) + 1))
+    for i in range(1, len(a) + 1):
+        current = [i] + [0] * len(b)
+        for j in range(1, len(b) + 1):
+            cost = 0 if a[i - 1] == b[j - 1] else 1
+            current[j] = min(previous[j] + 1, current[j - 1] + 1, previous[j - 1] + cost)
+            if i > 1 and j > 1 and a[i - 1] == b[j - 2] and a[i - 2] == b[j - 1]:
+                current[j] = min(current[j], previous2[j - 2] + 1)
+        previous2, previous = previous, current
+    return previous[-1]
+
+def brute_force(index, term, max_distance):
+    term = normalize_spanish(term.strip())
+    found = []
+    for i, word in enumerate(index.words):
+        # La distancia nunca es menor que la diferencia de longitudes
+        if abs(len(word) - len(term)) > max_distance:
+            continue
+        distance = osa_distance(term, word)
+        if distance <= max_distance:
+            found.append((index.display[i], distance, index.frequencies[i]))
+    return found
+
+def ranking(suggestions):
+    return sorted(suggestions, key=lambda s: (s[1], -s[2], s[0]))
+
+def misspell(word, rng):
+    """Una o dos ediciones al azar (borrado, inserción, cambio o transposición)"""
+    for _ in range(rng.randint(1, 2)):
+        k = rng.randrange(len(word) + 1)
+        operation = rng.choice('dict')
+        if operation == 'd' and k < len(word):
+            word = word[:k] + word[k + 1:]
+        elif operation == 'i':
+            word = word[:k] + rng.choice('abcdeilnorsuñ') + word[k:]
+        elif operation == 'c' and k < len(word):
+            word = word[:k] + rng.choice('abcdeilnorsuñ') + word[k + 1:]
+        elif k + 1 < len(word):
+            word = word[:k] + word[k + 1] + word[k] + word[k + 2:]
+    return word
+
+@pytest.fixture(scope='module')
+def symspell():
+    if not DEFAULT_FREQUENCIES.exists():
+        pytest.skip(f'Falta {DEFAULT_FREQUENCIES}')
+    index = SymSpell(max_distance=2, prefix_length=7)
+    for word, frequency in load_frequencies(str(DEFAULT_FREQUENCIES))[:VOCABULARY_SIZE]:
+        index.add(word, frequency)
+    return index
+
+@pytest.fixture(scope='module')
+def expected(symspell):
+    """Consultas (palabras, palabras con erratas, casos límite) -> fuerza bruta"""
+    rng = random.Random(0)
+    words = rng.sample(symspell.display, 40)
+    terms = (words + [misspell(word, rng) for word in words] +
+             ['arbol', 'corazn', 'espanol', 'x', 'zzzzzzzz', 'internacionalizacion'])
+    return {term: ranking(brute_force(symspell, term, 2)) for term in terms}
+
+class TestSymSpell:
+    def test_matches_brute_force(self, symspell, expected):
+        for term, suggestions in expected.items():
+            assert ranking(symspell.lookup(term, limit=None)) == suggestions, term
+            within_one = [s for s in suggestions if s[1] <= 1]
+            assert ranking(symspell.lookup(term, 1, limit=None)) == within_one, term
+
+    def test_limit_keeps_the_best(self, symspell, expected):
+        for term, suggestions in expected.items():
+            expected_top = suggestions[:5]
+            result = symspell.lookup(term, limit=5)
+            assert [(d, f) for _, d, f in result] == [(d, f) for _, d, f in expected_top], term
+
+    def test_accents_are_ignored(self, symspell):
+        assert symspell.lookup('arbol', 0)[0][0] == 'árbol'
+
+    def test_save_load(self, symspell, tmp_path):
+        symspell.save(str(tmp_path / 'symspell.json.gz'))
+        loaded = SymSpell.load(str(tmp_path / 'symspell.json.gz'))
+        for term in ('corazn', 'espanol', 'qe'):
+            assert loaded.lookup(term) == symspell.lookup(term)
+
+@pytest.fixture(scope='module')
+def entries():
+    return parse_cedict_file(str(SAMPLE_CEDICT))
+
+class TestCedictBinary:
+    def test_round_trip(self, entries, tmp_path):
+        path = str(tmp_path / 'sample.cedb')
+        written = write_binary(entries, path)
+        assert written['entries_count'] == len(entries)
+
+        with CedictBinary(path) as cedict:
+            assert len(cedict) == len(entries)
+            assert list(cedict) == [{field: entry[field] for field in FIELDS} for entry in entries]
+
+    def test_lookups(self, entries, tmp_path):
+        path = str(tmp_path / 'sample.cedb')
+        write_binary(entries, path)
+
+        with CedictBinary(path) as cedict:
+            for entry in entries:
+                simplified = [j for j, e in enumerate(entries) if e['simplified'] == entry['simplified']]
+                traditional = [j for j, e in enumerate(entries) if e['traditional'] == entry['traditional']]
+                pinyin = [j for j, e in enumerate(entries)
+                          if pinyin_key(e['pinyin']) == pinyin_key(entry['pinyin'])]
+                assert cedict.lookup_indices('by_simplified', entry['simplified']) == simplified
+                assert cedict.lookup_indices('by_traditional', entry['traditional']) == traditional
+                assert cedict.lookup_indices('by_pinyin', pinyin_key(entry['pinyin'])) == pinyin
+            assert cedict.by_simplified('不存在的词') == []
+
+class TestCompactIndex:
+    def test_round_trip(self, entries, tmp_path):
+        index = create_search_index(entries)
+        path = str(tmp_path / 'sample.cidx')
+        CompactIndex.from_dict(index).save(path)
+
+        loaded = CompactIndex.load(path)
+        try:
+            assert loaded.to_dict() == index
+            for table, postings in index.items():
+                for key, indices in postings.items():
+                    assert list(loaded.lookup(table, key)) == indices
+                assert list(loaded.lookup(table, '不存在的词')) == []
+        finally:
+            loaded.close()
+
+    def test_prefix_range(self, entries):
+        index = CompactIndex.from_dict(create_search_index(entries))
+        table = index['by_pinyin']
+        lo, hi = table.prefix_range('ni')
+        keys = sorted(key for key in create_search_index(entries)['by_pinyin']
+                      if key.encode('utf-8').startswith(b'ni'))
+        assert keys and [table.key(i) for i in range(lo, hi)] == keys
@@ -0,0 +1,211 @@
+#!/usr/bin/env python3
+"""
+Tests de regresión de la traducción: journal, caché, plan e incremental
+
+Usan el traductor 'stub' (sin red): traduce "text" como "[es] text".
+
+Ejecutar: python -m pytest scripts/dictionary
+"""
+
+import pytest
+
+from incremental import diff_entries, patch_entries
+from translate_to_spanish import DictionaryTranslator, plan_translation
+from translation_cache import TranslationCache
+from translation_journal import TranslationJournal
+
+def make_entry(simplified, definitions, traditional=None, pinyin='ni3 hao3'):
+    return {
+        'traditional': traditional or simplified,
+        'simplified': simplified,
+        'pinyin': pinyin,
+        'pinyin_tones': pinyin,
+        'definitions': definitions,
+        'classifiers': []
+    }
+
+def translated(entry, definitions_es):
+    return {**entry, 'definitions_en': entry['definitions'], 'definitions_es': definitions_es}
+
+@pytest.fixture
+def stub_translator():
+    translator = DictionaryTranslator(service='stub')
+    yield translator
+    translator.close()
+
+class TestTranslationJournal:
+    def test_resume_skips_done_entries(self, tmp_path):
+        path = str(tmp_path / 'out.json.journal')
+        journal = TranslationJournal(path)
+        journal.append([(0, {'n': 0}), (2, {'n': 2})])
+
+        resumed = TranslationJournal(path, resume=True)
+        assert resumed.done_indices() == {0, 2}
+        resumed.append([(1, {'n': 1})])
+        assert [entry['n'] for entry in resumed.iter_entries()] == [0, 1, 2]
+
+    def test_resume_drops_partial_line(self, tmp_path):
+        path = tmp_path / 'out.json.journal'
+        TranslationJournal(str(path)).append([(0, {'n': 0}), (1, {'n': 1})])
+        # Proceso interrumpido a mitad de escribir la entrada 2
+        with open(path, 'a', encoding='utf-8') as f:
+            f.write('{"i": 2, "entry": {"n"')
+
+        resumed = TranslationJournal(str(path), resume=True)
+        assert resumed.done_indices() == {0, 1}
+        assert path.read_text(encoding='utf-8').endswith('\n')
+
+    def test_last_write_wins(self, tmp_path):
+        journal = TranslationJournal(str(tmp_path / 'j'))
+        journal.append([(0, {'n': 'viejo'})])
+        journal.append([(0, {'n': 'nuevo'})])
+        assert list(journal.iter_entries()) == [{'n': 'nuevo'}]
+
+    def test_without_resume_starts_over(self, tmp_path):
+        path = str(tmp_path / 'j')
+        TranslationJournal(path).append([(0, {'n': 0})])
+        assert TranslationJournal(path).done_indices() == set()
+
+class TestTranslationCache:
+    def test_round_trip(self, tmp_path):
+        cache = TranslationCache(str(tmp_path / 'cache.db'), service='stub')
+        cache.put('hello', 'hola')
+        cache.put_many([('good', 'bueno'), ('hello', 'hola!')])
+        assert cache.get('hello') == 'hola!'
+        assert cache.get('missing') is None
+        assert cache.get_many(['good', 'hello', 'missing', 'good']) == {'good': 'bueno', 'hello': 'hola!'}
+        cache.close()
+
+        reopened = TranslationCache(str(tmp_path / 'cache.db'), service='stub')
+        assert reopened.get('good') == 'bueno'
+        assert reopened.stats()['entries'] == 2
+        reopened.close()
+
+    def test_services_do_not_share_translations(self, tmp_path):
+        path = str(tmp_path / 'cache.db')
+        google = TranslationCache(path, service='google')
+        deepl = TranslationCache(path, service='deepl')
+        google.put('hello', 'hola')
+        assert deepl.get('hello') is None
+        google.close()
+        deepl.close()
+
+    def test_get_many_beyond_parameter_limit(self, tmp_path):
+        cache = TranslationCache(str(tmp_path / 'cache.db'))
+        pairs = [(f'text {i}', f'texto {i}') for i in range(2000)]
+        cache.put_many(pairs)
+        assert cache.get_many(text for text, _ in pairs) == dict(pairs)
+        cache.close()
+
+    def test_export_import(self, tmp_path):
+        source = TranslationCache(str(tmp_path / 'a.db'), service='stub')
+        source.put_many([('one', 'uno'), ('two', 'dos')])
+        assert source.export_jsonl(str(tmp_path / 'cache.jsonl')) == 2
+        source.close()
+
+        target = TranslationCache(str(tmp_path / 'b.db'), service='stub')
+        assert target.import_jsonl(str(tmp_path / 'cache.jsonl'), batch_size=1) == 2
+        assert target.get_many(['one', 'two']) == {'one': 'uno', 'two': 'dos'}
+        target.close()
+
+class TestPlanTranslation:
+    ENTRIES = [
+        make_entry('好', ['good', 'well']),
+        make_entry('好好', ['good', '  ', '']),
+        make_entry('很', ['very', 'good']),
+        make_entry('空', []),
+    ]
+
+    def test_counts(self):
+        plan = plan_translation(self.ENTRIES)
+        assert plan.texts[0] == 'good'
+        assert sorted(plan.texts) == ['good', 'very', 'well']
+        assert plan.counts == {'good': 3, 'well': 1, 'very': 1}
+        assert plan.occurrences == 5
+        assert plan.unique == 3
+        assert plan.cached == 0
+        assert plan.journaled == 0
+
+    def test_journaled_entries_are_not_counted(self):
+        plan = plan_translation(self.ENTRIES, done={0, 99})
+        assert plan.counts == {'good': 2, 'very': 1}
+        assert plan.journaled == 1
+
+    def test_cached_texts_are_not_pending(self, tmp_path):
+        cache_path = str(tmp_path / 'cache.db')
+        cache = TranslationCache(cache_path, service='stub')
+        cache.put('well', 'bien')
+        cache.close()
+
+        translator = DictionaryTranslator(service='stub', cache_path=cache_path)
+        translator.cache['very'] = 'muy'
+        plan = plan_translation(self.ENTRIES, translator)
+        assert plan.texts == ['good']
+        assert plan.cached == 2
+        # Las encontradas en disco pasan a la caché en memoria
+        assert translator.cache['well'] == 'bien'
+        translator.close()
+
+class TestIncremental:
+    def test_diff_entries(self):
+        previous = [
+            translated(make_entry('好', ['good']), ['bueno']),
+            translated(make_entry('很', ['very']), ['muy']),
+            translated(make_entry('旧', ['old']), ['viejo']),
+        ]
+        current = [
+            make_entry('好', ['good']),
+            make_entry('很', ['very', 'quite']),
+            make_entry('新', ['new']),
+        ]
+        diff = diff_entries(previous, current)
+        assert [e['simplified'] for e in diff['added']] == ['新']
+        assert [e['simplified'] for e in diff['changed']] == ['很']
+        assert diff['removed'] == [['旧', '旧', 'ni3 hao3', 0]]
+        assert diff['unchanged'] == 1
+
+    def test_diff_numbers_repeated_keys(self):
+        previous = [translated(make_entry('行', ['to walk']), ['caminar'])]
+        current = [make_entry('行', ['to walk']), make_entry('行', ['capable'])]
+        diff = diff_entries(previous, current)
+        assert diff['added'] == [current[1]]
+        assert diff['unchanged'] == 1
+
+    def test_classifier_change_is_a_change(self):
+        previous = [translated(make_entry('书', ['book']), ['libro'])]
+        current = [{**make_entry('书', ['book']), 'classifiers': ['本']}]
+        assert diff_entries(previous, current)['changed'] == current
+
+    def test_patch_entries(self, stub_translator):
+        previous = [
+            translated(make_entry('好', ['good']), ['bueno']),
+            translated(make_entry('很', ['very']), ['muy']),
+            # Traducción fallida en la build anterior: es == en
+            translated(make_entry('书', ['book']), ['book']),
+        ]
+        current = [
+            make_entry('好', ['good']),
+            make_entry('很', ['very', 'quite']),
+            make_entry('书', ['book']),
+            make_entry('新', ['new', 'good']),
+        ]
+        patched, delta = patch_entries(previous, current, stub_translator)
+
+        assert [e['definitions_es'] for e in patched] == [
+            ['bueno'], ['muy', '[es] quite'], ['[es] book'], ['[es] new', 'bueno']
+        ]
+        assert all(e['definitions_en'] == e['definitions'] for e in patched)
+        assert [e['simplified'] for e in delta['added']] == ['新']
+        assert [e['simplified'] for e in delta['changed']] == ['很', '书']
+        assert delta['stats'] == {
+            'added': 1, 'changed': 1, 'removed': 0, 'unchanged': 1,
+            'retried': 1, 'translated_definitions': 3
+        }
+
+    def test_patch_added_repeated_key_keeps_its_occurrence(self, stub_translator):
+        previous = [translated(make_entry('行', ['to walk']), ['caminar'])]
+        current = [make_entry('行', ['to walk']), make_entry('行', ['capable'])]
+        patched, delta = patch_entries(previous, current, stub_translator)
+        assert delta['added'] == [patched[1]]
+        assert delta['added'][0]['definitions_es'] == ['[es] capable']
+        assert delta['changed'] == []
@@ -4,14 +4,28 @@ Traductor de definiciones CC-CEDICT de Inglés a Español
 Usa deep-translator con Google Translate (gratis) o DeepL (API key)
 """
 
+import os
 import json
 import time
 import sys
+import random
+import threading
+import urllib.parse
+import urllib.request
+from collections import Counter
+from dataclasses import dataclass, field
 from pathlib import Path
-from typing import List, Dict, Optional
+from typing import Dict, Iterable, List, Optional, Set
 from concurrent.futures import ThreadPoolExecutor, as_completed
 import argparse
 
+from client_index import spanish_terms
+from rate_limit import TokenBucket
+from translation_cache import DEFAULT_CACHE_PATH, TranslationCache
+from translation_journal import TranslationJournal
+from compact_dict import size_report, write_compact_dict
+from pipeline_metrics import METRICS, add_arguments as add_metrics_arguments, enable_from_args
+
 # Intentar importar deep-translator
 try:
     from deep_translator import GoogleTranslator, DeeplTranslator
@@ -20,27 +34,117 @@ except ImportError:
     TRANSLATOR_AVAILABLE = False
     print("⚠️  deep-translator no instalado. Ejecuta: pip install deep-translator")
 
+# Tasa supuesta para estimar duración cuando no se indica --rate (peticiones/s)
+DEFAULT_ESTIMATE_RATE = 2.0
+
+# Precio por millón de caracteres usado en la estimación de costo
+PRICE_PER_MILLION_CHARS = {'google': 0.0, 'deepl': 20.0, 'stub': 0.0}
+
+# Separador entre segmentos cuando se empaquetan varias definiciones en una petición
+SEGMENT_DELIMITER = '\n'
+
+# Límites por petición empaquetada (Google acepta ~5000 caracteres; DeepL, 50 textos)
+MAX_PACKED_CHARS = 4500
+MAX_PACKED_SEGMENTS = 50
+
+class StubTranslator:
+    """
+    Traductor local determinista para pruebas y benchmarks sin red
+
+    Devuelve el texto con el prefijo '[es] '. Puede simular la latencia
+    de un servicio real y fallos periódicos (cada fail_every llamadas).
+    """
+
+    def __init__(self, latency: float = 0.0, fail_every: int = 0):
+        self.latency = latency
+        self.fail_every = fail_every
+        self.calls = 0
+        self._lock = threading.Lock()
+
+    def translate(self, text: str) -> str:
+        with self._lock:
+            self.calls += 1
+            call = self.calls
+        if self.latency:
+            time.sleep(self.latency)
+        if self.fail_every and call % self.fail_every == 0:
+            raise RuntimeError(f"Fallo simulado en la llamada {call}")
+        return '\n'.join(f'[es] {line}' for line in text.split('\n'))
+
+class AdaptiveBackoff:
+    """
+    Espera exponencial compartida entre hilos
+
+    Cada error duplica la espera (con jitter) hasta max_delay; cada
+    éxito la reduce a la mitad, de modo que la tasa se recupera sola.
+    """
+
+    def __init__(self, base_delay: float = 0.5, max_delay: float = 60.0):
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+        self.delay = 0.0
+        self._lock = threading.Lock()
+
+    def failure(self) -> float:
+        """Registra un error y devuelve cuánto esperar antes de reintentar"""
+        with self._lock:
+            self.delay = min(self.max_delay, max(self.base_delay, self.delay * 2))
+            return self.delay * random.uniform(0.5, 1.0)
+
+    def success(self):
+        with self._lock:
+            self.delay = self.delay / 2 if self.delay > self.base_delay else 0.0
+
+    def pause(self):
+        """Espera pendiente antes de una nueva petición (0 si no hubo errores)"""
+        delay = self.delay
+        if delay:
+            time.sleep(delay * random.uniform(0.5, 1.0))
+
 class DictionaryTranslator:
     """Traduce definiciones del diccionario de inglés a español"""
 
-    def __init__(self, service: str = 'google', api_key: Optional[str] = None):
+    def __init__(self, service: str = 'google', api_key: Optional[str] = None,
+                 rate: Optional[float] = None, max_retries: int = 3,
+                 stub_latency: float = 0.0, cache_path: Optional[str] = None):
         """
         Args:
-            service: 'google' o 'deepl'
+            service: 'google', 'deepl' o 'stub' (traductor local para pruebas)
             api_key: API key para DeepL (opcional para Google)
+            rate: Máximo de peticiones por segundo al servicio (None = sin límite)
+            max_retries: Reintentos por texto ante errores del servicio
+            stub_latency: Latencia simulada por petición del servicio 'stub'
+            cache_path: Archivo SQLite de caché persistente (None = solo en memoria)
         """
         self.service = service
         self.api_key = api_key
+        self.stub_latency = stub_latency
         self.translator = self._create_translator()
         self.cache = {}
+        self.persistent_cache = (
+            TranslationCache(cache_path, service=service) if cache_path else None
+        )
         self.stats = {
             'translated': 0,
             'cached': 0,
-            'errors': 0
+            'errors': 0,
+            'requests': 0,
+            'batch_fallbacks': 0
         }
+        self.rate_limiter = TokenBucket(rate) if rate else None
+        self.backoff = AdaptiveBackoff()
+        self.max_retries = max_retries
+        self._lock = threading.Lock()
+
+    def _count(self, stat: str, n: int = 1):
+        with self._lock:
+            self.stats[stat] += n
 
     def _create_translator(self):
         """Crea instancia del traductor"""
+        if self.service == 'stub':
+            return StubTranslator(latency=self.stub_latency)
+
         if not TRANSLATOR_AVAILABLE:
             return None
 
@@ -58,41 +162,239 @@ class DictionaryTranslator:
         if not text or not text.strip():
             return text
 
-        # Verificar caché
+        # Verificar caché (memoria y luego disco)
         if text in self.cache:
-            self.stats['cached'] += 1
+            self._count('cached')
             return self.cache[text]
 
+        if self.persistent_cache:
+            cached = self.persistent_cache.get(text)
+            if cached is not None:
+                self.cache[text] = cached
+                self._count('cached')
+                return cached
+
         try:
-            translated = self.translator.translate(text)
+            translated = self._call_service(text)
             # Si la traducción es None o vacía, usar original
             if not translated:
                 translated = text
             self.cache[text] = translated
-            self.stats['translated'] += 1
+            if self.persistent_cache:
+                self.persistent_cache.put(text, translated)
+            self._count('translated')
             return translated
         except Exception as e:
-            self.stats['errors'] += 1
+            self._count('errors')
             print(f"    Error traduciendo '{text[:50]}...': {e}")
             return text  # Retornar original si falla
 
+    def close(self):
+        """Cierra la caché persistente"""
+        if self.persistent_cache:
+            self.persistent_cache.close()
+
+    def _call_service(self, text: str) -> str:
+        """Llama al servicio respetando el rate limit, con reintentos y backoff"""
+        return self._with_retries(self.translator.translate, text)
+
+    def _with_retries(self, request, *args):
+        """Ejecuta una petición al servicio con rate limit, reintentos y backoff"""
+        for attempt in range(self.max_retries + 1):
+            with METRICS.stage('translate.wait'):
+                self.backoff.pause()
+                if self.rate_limiter:
+                    self.rate_limiter.acquire()
+            self._count('requests')
+            start = time.perf_counter()
+            try:
+                result = request(*args)
+                METRICS.observe('translate.call', time.perf_counter() - start)
+                self.backoff.success()
+                return result
+            except Exception:
+                METRICS.observe('translate.call_failed', time.perf_counter() - start)
+                METRICS.count('translate.retries' if attempt < self.max_retries else 'translate.failures')
+                if attempt == self.max_retries:
+                    raise
+                time.sleep(self.backoff.failure())
+
+    def _deepl_translate_list(self, texts: List[str]) -> List[str]:
+        """Traduce varios textos en una sola petición con la API nativa de DeepL"""
+        host = 'api-free.deepl.com' if self.api_key.endswith(':fx') else 'api.deepl.com'
+        data = urllib.parse.urlencode(
+            [('text', text) for text in texts] +
+            [('source_lang', 'EN'), ('target_lang', 'ES')]
+        ).encode('utf-8')
+        request = urllib.request.Request(
+            f'https://{host}/v2/translate',
+            data=data,
+            headers={'Authorization': f'DeepL-Auth-Key {self.api_key}'}
+        )
+        with urllib.request.urlopen(request, timeout=60) as response:
+            result = json.loads(response.read().decode('utf-8'))
+        return [item['text'] for item in result['translations']]
+
+    def _translate_segments(self, texts: List[str]) -> Dict[str, str]:
+        """
+        Traduce un paquete de textos con una sola petición
+
+        DeepL usa su API de listas; el resto une los textos con
+        SEGMENT_DELIMITER y separa la respuesta. Si la respuesta no tiene
+        tantos segmentos como textos, se traduce uno por uno.
+
+        Los errores de red o de límite de tasa ya se reintentan con backoff
+        en _with_retries; si aun así fallan, el paquete queda sin traducir
+        (textos originales, sin guardar en caché) en lugar de repetirse
+        texto a texto justo cuando el servicio está rechazando peticiones.
+        """
+        try:
+            if self.service == 'deepl' and self.api_key:
+                parts = self._with_retries(self._deepl_translate_list, texts)
+            else:
+                joined = self._with_retries(self.translator.translate,
+                                            SEGMENT_DELIMITER.join(texts))
+                parts = joined.split(SEGMENT_DELIMITER) if joined else []
+        except Exception as e:
+            self._count('errors', len(texts))
+            print(f"    Error traduciendo paquete de {len(texts)} textos: {e}")
+            return {text: text for text in texts}
+
+        if len(parts) != len(texts):
+            self._count('batch_fallbacks')
+            return {text: self.translate_text(text) for text in texts}
+
+        translations = {
+            text: part.strip() or text
+            for text, part in zip(texts, parts)
+        }
+        self.cache.update(translations)
+        if self.persistent_cache:
+            self.persistent_cache.put_many(translations.items())
+        self._count('translated', len(texts))
+        return translations
+
+    def translate_many(self, texts: List[str],
+                       max_chars: int = MAX_PACKED_CHARS,
+                       max_segments: int = MAX_PACKED_SEGMENTS) -> Dict[str, str]:
+        """
+        Traduce muchos textos empaquetando los pendientes en pocas peticiones
+
+        Returns:
+            Dict texto -> traducción para cada texto distinto no vacío
+        """
+        results = {}
+        pending = []
+        for text in dict.fromkeys(texts):
+            if not text or not text.strip():
+                continue
+            if text in self.cache:
+                results[text] = self.cache[text]
+            else:
+                pending.append(text)
+
+        if pending and self.persistent_cache:
+            found = self.persistent_cache.get_many(pending)
+            self.cache.update(found)
+            results.update(found)
+            pending = [text for text in pending if text not in found]
+
+        self._count('cached', len(results))
+
+        # Empaquetar respetando los límites de caracteres y de segmentos
+        packet, size = [], 0
+        for text in pending:
+            extra = len(text) + len(SEGMENT_DELIMITER)
+            if packet and (size + extra > max_chars or len(packet) >= max_segments):
+                results.update(self._translate_segments(packet))
+                packet, size = [], 0
+            packet.append(text)
+            size += extra
+        if packet:
+            results.update(self._translate_segments(packet))
+
+        return results
+
+    def translate_texts(self, texts: List[str],
+                        workers: int = 1,
+                        pack: bool = False,
+                        chunk_size: int = 50,
+                        progress_callback=None) -> Dict[str, str]:
+        """
+        Traduce una lista de textos distintos (ej: los de un TranslationPlan)
+
+        Se procesan en el orden dado, en bloques de `chunk_size`; cada
+        traducción queda en la caché persistente apenas se obtiene.
+
+        Returns:
+            Dict texto -> traducción
+        """
+        chunks = [texts[i:i + chunk_size] for i in range(0, len(texts), chunk_size)]
+        results = {}
+        done = 0
+
+        def translate_chunk(chunk: List[str]) -> Dict[str, str]:
+            if pack:
+                return self.translate_many(chunk)
+            return {text: self.translate_text(text) for text in chunk}
+
+        if workers > 1:
+            with ThreadPoolExecutor(max_workers=workers) as executor:
+                futures = [executor.submit(translate_chunk, chunk) for chunk in chunks]
+                for future in as_completed(futures):
+                    translations = future.result()
+                    results.update(translations)
+                    done += len(translations)
+                    if progress_callback:
+                        progress_callback(done, len(texts))
+        else:
+            for chunk in chunks:
+                results.update(translate_chunk(chunk))
+                done += len(chunk)
+                if progress_callback:
+                    progress_callback(done, len(texts))
+
+        return results
+
+    def apply_translations(self, entries: List[Dict], translations: Dict[str, str]) -> List[Dict]:
+        """Reparte traducciones ya obtenidas a las entradas (sin llamar al servicio)"""
+        return [
+            self._build_entry(entry, [translations.get(d, d) for d in entry.get('definitions', [])])
+            for entry in entries
+        ]
+
     def translate_definitions(self, definitions: List[str]) -> List[str]:
         """Traduce una lista de definiciones"""
         return [self.translate_text(d) for d in definitions]
 
-    def translate_entry(self, entry: Dict) -> Dict:
-        """Traduce una entrada completa del diccionario"""
+    @staticmethod
+    def _build_entry(entry: Dict, definitions_es: List[str]) -> Dict:
         translated_entry = entry.copy()
-        translated_entry['definitions_es'] = self.translate_definitions(
-            entry.get('definitions', [])
-        )
+        translated_entry['definitions_es'] = definitions_es
         translated_entry['definitions_en'] = entry.get('definitions', [])
         return translated_entry
 
+    def translate_entry(self, entry: Dict) -> Dict:
+        """Traduce una entrada completa del diccionario"""
+        return self._build_entry(
+            entry, self.translate_definitions(entry.get('definitions', []))
+        )
+
+    def translate_entries_packed(self, entries: List[Dict]) -> List[Dict]:
+        """Traduce varias entradas enviando sus definiciones en peticiones empaquetadas"""
+        translations = self.translate_many(
+            [d for entry in entries for d in entry.get('definitions', [])]
+        )
+        return [
+            self._build_entry(entry, [translations.get(d, d) for d in entry.get('definitions', [])])
+            for entry in entries
+        ]
+
     def translate_batch(self, entries: List[Dict],
                        batch_size: int = 50,
                        delay: float = 0.5,
-                       progress_callback=None) -> List[Dict]:
+                       progress_callback=None,
+                       pack: bool = False) -> List[Dict]:
         """
         Traduce un lote de entradas con rate limiting
 
@@ -101,6 +403,7 @@ class DictionaryTranslator:
             batch_size: Entradas por lote
             delay: Segundos entre lotes (evita rate limiting)
             progress_callback: Función callback(current, total)
+            pack: Enviar las definiciones de cada lote en peticiones empaquetadas
 
         Returns:
             Lista de entradas traducidas
@@ -111,9 +414,12 @@ class DictionaryTranslator:
         for i in range(0, total, batch_size):
             batch = entries[i:i + batch_size]
 
-            for entry in batch:
-                translated_entry = self.translate_entry(entry)
-                translated.append(translated_entry)
+            if pack:
+                translated.extend(self.translate_entries_packed(batch))
+            else:
+                for entry in batch:
+                    translated_entry = self.translate_entry(entry)
+                    translated.append(translated_entry)
 
             if progress_callback:
                 progress_callback(len(translated), total)
@@ -124,13 +430,170 @@ class DictionaryTranslator:
 
         return translated
 
+    def translate_concurrent(self, entries: List[Dict],
+                             workers: int = 8,
+                             progress_callback=None,
+                             pack: bool = False,
+                             batch_size: int = 50) -> List[Dict]:
+        """
+        Traduce entradas en paralelo con un pool de hilos
+
+        La concurrencia la limita `workers`; la tasa de peticiones, el
+        token bucket (`rate`); los errores aplican backoff adaptativo en
+        lugar de una espera fija entre lotes. Con `pack`, cada tarea
+        traduce `batch_size` entradas con peticiones empaquetadas.
+
+        Returns:
+            Lista de entradas traducidas, en el mismo orden que `entries`
+        """
+        total = len(entries)
+        translated = [None] * total
+        done = 0
+        step = batch_size if pack else 1
+
+        def translate_slice(start: int) -> List[Dict]:
+            chunk = entries[start:start + step]
+            if pack:
+                return self.translate_entries_packed(chunk)
+            return [self.translate_entry(entry) for entry in chunk]
+
+        with ThreadPoolExecutor(max_workers=workers) as executor:
+            futures = {
+                executor.submit(translate_slice, start): start
+                for start in range(0, total, step)
+            }
+            for future in as_completed(futures):
+                start = futures[future]
+                chunk = future.result()
+                translated[start:start + len(chunk)] = chunk
+                done += len(chunk)
+                if progress_callback:
+                    progress_callback(done, total)
+
+        return translated
+
+@dataclass
+class TranslationPlan:
+    """
+    Definiciones distintas a traducir, de la más a la menos frecuente
+
+    Attributes:
+        texts: Textos pendientes (no presentes en la caché), por frecuencia descendente
+        counts: Apariciones de cada definición distinta en las entradas
+        occurrences: Total de definiciones en las entradas
+        cached: Definiciones distintas que ya están en la caché
+        journaled: Entradas omitidas por estar ya traducidas en el journal
+    """
+    texts: List[str]
+    counts: Dict[str, int] = field(repr=False)
+    occurrences: int
+    cached: int
+    journaled: int = 0
+
+    @property
+    def unique(self) -> int:
+        return len(self.counts)
+
+    @property
+    def dedup_ratio(self) -> float:
+        """Apariciones por definición distinta (1.0 = sin repetidos)"""
+        return self.occurrences / self.unique if self.unique else 1.0
+
+    @property
+    def chars(self) -> int:
+        return sum(len(text) for text in self.texts)
+
+    def estimate(self, service: str, rate: Optional[float] = None, pack: bool = False,
+                 price_per_million: Optional[float] = None) -> Dict:
+        """Peticiones, duración y costo estimados antes de llamar al servicio"""
+        if pack:
+            requests, packet, size = 0, 0, 0
+            for text in self.texts:
+                extra = len(text) + len(SEGMENT_DELIMITER)
+                if packet and (size + extra > MAX_PACKED_CHARS or packet >= MAX_PACKED_SEGMENTS):
+                    requests += 1
+                    packet, size = 0, 0
+                packet += 1
+                size += extra
+            requests += 1 if packet else 0
+        else:
+            requests = len(self.texts)
+
+        if price_per_million is None:
+            price_per_million = PRICE_PER_MILLION_CHARS.get(service, 0.0)
+
+        return {
+            'requests': requests,
+            'seconds': requests / (rate or DEFAULT_ESTIMATE_RATE),
+            'cost': self.chars * price_per_million / 1_000_000
+        }
+
+def plan_translation(entries: List[Dict], translator: Optional[DictionaryTranslator] = None,
+                     done: Optional[Set[int]] = None) -> TranslationPlan:
+    """
+    Extrae las definiciones distintas con su número de apariciones
+
+    Si se pasa un traductor, las ya presentes en su caché (memoria o
+    disco) quedan fuera de los textos pendientes; las encontradas en
+    disco se cargan en su caché en memoria. Las entradas cuyo índice
+    está en done (ya en el journal al reanudar) no se cuentan.
+    """
+    done = done or set()
+    counts = Counter(
+        d for i, entry in enumerate(entries) if i not in done
+        for d in entry.get('definitions', [])
+        if d and d.strip()
+    )
+    texts = [text for text, _ in counts.most_common()]
+
+    cached = 0
+    if translator:
+        known = {text for text in texts if text in translator.cache}
+        if translator.persistent_cache:
+            found = translator.persistent_cache.get_many(
+                [text for text in texts if text not in known]
+            )
+            translator.cache.update(found)
+            known.update(found)
+        cached = len(known)
+        texts = [text for text in texts if text not in known]
+
+    return TranslationPlan(
+        texts=texts,
+        counts=dict(counts),
+        occurrences=sum(counts.values()),
+        cached=cached,
+        journaled=sum(1 for i in done if 0 <= i < len(entries))
+    )
+
 def load_parsed_cedict(filepath: str) -> Dict:
-    """Carga un archivo CC-CEDICT parseado"""
+    """Carga un archivo CC-CEDICT parseado (.json o binario .cedb)"""
+    if filepath.endswith('.cedb'):
+        from cedict_binary import CedictBinary
+        from cedict_parser import build_metadata, create_search_index
+        with CedictBinary(filepath) as cedict:
+            entries = list(cedict)
+        return {
+            'metadata': build_metadata(len(entries)),
+            'entries': entries,
+            'index': create_search_index(entries)
+        }
+
     with open(filepath, 'r', encoding='utf-8') as f:
         return json.load(f)
 
-def save_translated_dict(data: Dict, filepath: str, compress: bool = False):
-    """Guarda el diccionario traducido"""
+def save_translated_dict(data: Dict, filepath: str, compress: bool = False,
+                         compact: bool = False, precompress_formats: Optional[List[str]] = None):
+    """
+    Guarda el diccionario traducido
+
+    Con compact=True usa el formato del cliente (ver compact_dict.py):
+    claves cortas, sin índices ni espacios y, opcionalmente, hermanos
+    .gz/.br; devuelve entonces los tamaños escritos.
+    """
+    if compact:
+        return write_compact_dict(data.get('entries', []), filepath, data.get('metadata', {}),
+                                  precompress_formats=precompress_formats)
     if compress:
         import gzip
         with gzip.open(filepath + '.gz', 'wt', encoding='utf-8') as f:
@@ -139,27 +602,123 @@ def save_translated_dict(data: Dict, filepath: str, compress: bool = False):
         with open(filepath, 'w', encoding='utf-8') as f:
             json.dump(data, f, ensure_ascii=False, indent=2)
 
+class SpanishIndexBuilder:
+    """
+    Índice invertido español -> chino construido entrada por entrada
+
+    Las palabras salen de client_index.spanish_terms (minúsculas, sin
+    acentos salvo la ñ), el mismo normalizador que spanishTerms en
+    dictionaryService.js (ver el test de paridad); searchBySpanish busca
+    con él cada palabra de la consulta en index_spanish. Cada palabra
+    guarda sus entradas junto con la frecuencia del término (tf) en las
+    definiciones de la entrada. Las postings se ordenan por relevancia:
+    primero las entradas donde la palabra aparece en la primera
+    definición, luego mayor tf y, a igualdad, las palabras chinas más
+    cortas (mismo criterio que searchBySpanish sin index_spanish).
+    """
+
+    def __init__(self):
+        self.count = 0
+        self.postings = {}
+
+    def add(self, entry: Dict) -> int:
+        """Indexa una entrada y devuelve su posición"""
+        i = self.count
+        self.count += 1
+
+        # Saltar definiciones vacías o None
+        definitions = [d for d in entry.get('definitions_es') or [] if d]
+        if not definitions:
+            return i
+
+        first_tokens = set(spanish_terms(definitions[0]))
+        tf = {}
+        for defn in definitions:
+            for token in spanish_terms(defn):
+                tf[token] = tf.get(token, 0) + 1
+
+        length = len(entry.get('simplified', ''))
+        for token, freq in tf.items():
+            self.postings.setdefault(token, []).append(
+                (token not in first_tokens, -freq, length, i)
+            )
+        return i
+
+    def build(self) -> Dict[str, Dict[str, List[int]]]:
+        """
+        Returns:
+            Dict con 'index' (palabra -> índices ordenados por relevancia)
+            y 'tf' (palabra -> frecuencias, en el mismo orden)
+        """
+        index = {}
+        tf = {}
+        for token, postings in self.postings.items():
+            postings.sort()
+            index[token] = [p[3] for p in postings]
+            tf[token] = [-p[1] for p in postings]
+        return {'index': index, 'tf': tf}
+
 def create_spanish_search_index(entries: List[Dict]) -> Dict:
-    """Crea índice de búsqueda inversa (español -> chino)"""
-    index = {}
+    """Crea índice de búsqueda inversa (español -> chino), ordenado por relevancia"""
+    return create_ranked_spanish_index(entries)['index']
+
+def create_ranked_spanish_index(entries: List[Dict]) -> Dict[str, Dict[str, List[int]]]:
+    """Como create_spanish_search_index, pero incluye también las frecuencias ('tf')"""
+    builder = SpanishIndexBuilder()
+    for entry in entries:
+        builder.add(entry)
+    return builder.build()
+
+def write_translated_dict_stream(entries: Iterable[Dict], filepath: str,
+                                 metadata: Dict, index: Dict,
+                                 compress: bool = False) -> Dict:
+    """
+    Guarda el diccionario traducido entrada por entrada
+
+    El índice español se construye en la misma pasada, así que las
+    entradas traducidas nunca están todas en memoria a la vez.
+
+    Returns:
+        Dict con 'entries_count', 'spanish_words' y la primera entrada ('first')
+    """
+    import gzip
+
+    builder = SpanishIndexBuilder()
+    first = None
+    dumps = METRICS.timed(json.dumps, 'serialize')
 
-    for i, entry in enumerate(entries):
-        for defn in entry.get('definitions_es', []):
-            # Saltar definiciones vacías o None
-            if not defn:
-                continue
-            # Extraer palabras clave de la definición
-            words = defn.lower().split()
-            for word in words:
-                # Limpiar puntuación
-                word = ''.join(c for c in word if c.isalnum())
-                if len(word) >= 2:  # Ignorar palabras muy cortas
-                    if word not in index:
-                        index[word] = []
-                    if i not in index[word]:
-                        index[word].append(i)
-
-    return index
+    if compress:
+        f = gzip.open(filepath + '.gz', 'wt', encoding='utf-8')
+    else:
+        f = open(filepath, 'w', encoding='utf-8')
+
+    with f:
+        f.write('{\n  "metadata": ')
+        json.dump(metadata, f, ensure_ascii=False)
+        f.write(',\n  "entries": [')
+        for entry in entries:
+            f.write(',\n    ' if builder.count else '\n    ')
+            f.write(dumps(entry, ensure_ascii=False))
+            builder.add(entry)
+            if first is None:
+                first = entry
+
+        with METRICS.stage('index_spanish'):
+            spanish_index = builder.build()
+        with METRICS.stage('serialize'):
+            f.write('\n  ],\n  "index": ')
+            json.dump(index, f, ensure_ascii=False)
+            f.write(',\n  "index_spanish": ')
+            json.dump(spanish_index['index'], f, ensure_ascii=False)
+            f.write(',\n  "index_spanish_tf": ')
+            json.dump(spanish_index['tf'], f, ensure_ascii=False)
+            f.write('\n}\n')
+
+    return {
+        'entries_count': builder.count,
+        'spanish_words': len(spanish_index['index']),
+        'first': first
+    }
 
 def progress_bar(current: int, total: int, width: int = 50):
     """Muestra barra de progreso"""
@@ -188,9 +747,9 @@ def main():
     )
     parser.add_argument(
         '-s', '--service',
-        choices=['google', 'deepl'],
+        choices=['google', 'deepl', 'stub'],
         default='google',
-        help='Servicio de traducción (default: google)'
+        help='Servicio de traducción (default: google; stub = local, sin red)'
     )
     parser.add_argument(
         '-k', '--api-key',
@@ -208,21 +767,99 @@ def main():
         default=0.5,
         help='Delay entre lotes en segundos (default: 0.5)'
     )
+    parser.add_argument(
+        '-w', '--workers',
+        type=int,
+        default=1,
+        help='Traducciones concurrentes (default: 1 = por lotes con delay)'
+    )
+    parser.add_argument(
+        '-r', '--rate',
+        type=float,
+        help='Máximo de peticiones por segundo al servicio (token bucket)'
+    )
+    parser.add_argument(
+        '-p', '--pack',
+        action='store_true',
+        help='Empaquetar varias definiciones por petición al servicio'
+    )
+    parser.add_argument(
+        '--plan',
+        action='store_true',
+        help='Traducir primero las definiciones distintas (más frecuentes primero)'
+    )
+    parser.add_argument(
+        '--plan-only',
+        action='store_true',
+        help='Mostrar deduplicación, costo y tiempo estimados sin traducir'
+    )
+    parser.add_argument(
+        '--price-per-million',
+        type=float,
+        help='Precio por millón de caracteres para la estimación (default: según servicio)'
+    )
+    parser.add_argument(
+        '--cache',
+        default=DEFAULT_CACHE_PATH,
+        help=f'Caché persistente de traducciones (default: {DEFAULT_CACHE_PATH})'
+    )
+    parser.add_argument(
+        '--no-cache',
+        action='store_true',
+        help='No usar la caché persistente'
+    )
+    parser.add_argument(
+        '--checkpoint-every',
+        type=int,
+        default=500,
+        help='Entradas traducidas entre checkpoints del journal (default: 500)'
+    )
+    parser.add_argument(
+        '--journal',
+        help='Journal de checkpoints (default: <salida>.journal)'
+    )
+    parser.add_argument(
+        '--resume',
+        action='store_true',
+        help='Reanudar desde el journal, saltando las entradas ya traducidas'
+    )
     parser.add_argument(
         '-c', '--compress',
         action='store_true',
         help='Comprimir salida con gzip'
     )
+    parser.add_argument(
+        '--compact',
+        action='store_true',
+        help='Salida compacta para el cliente: claves s/t/p/d, sin índices ni espacios'
+    )
+    parser.add_argument(
+        '--precompress',
+        nargs='*',
+        choices=['gz', 'br'],
+        help='Con --compact: escribir además .gz y/o .br (sin valores: ambos)'
+    )
+    parser.add_argument(
+        '--client-index',
+        action='store_true',
+        help='Con --compact: escribir además <salida>.index.json con los índices del cliente'
+    )
+    add_metrics_arguments(parser)
 
     args = parser.parse_args()
+    enable_from_args(args, 'translate_to_spanish')
+    METRICS.instrument(SpanishIndexBuilder, 'add', 'index_spanish')
+    for method in ('get', 'get_many', 'put_many'):
+        METRICS.instrument(TranslationCache, method, f'cache.{method}')
 
-    if not TRANSLATOR_AVAILABLE:
+    if not TRANSLATOR_AVAILABLE and args.service != 'stub' and not args.plan_only:
         print("❌ Instala deep-translator: pip install deep-translator")
         sys.exit(1)
 
     # Cargar datos
     print(f"📖 Cargando {args.input_file}...")
-    data = load_parsed_cedict(args.input_file)
+    with METRICS.stage('load'):
+        data = load_parsed_cedict(args.input_file)
     entries = data.get('entries', [])
 
     if args.limit:
@@ -235,52 +872,145 @@ def main():
     print(f"\n🌐 Iniciando traducción con {args.service}...")
     translator = DictionaryTranslator(
         service=args.service,
-        api_key=args.api_key
+        api_key=args.api_key,
+        rate=args.rate,
+        cache_path=None if args.no_cache else args.cache
     )
 
-    # Traducir
-    print(f"   Batch size: {args.batch_size}, Delay: {args.delay}s\n")
+    output_path = args.output or args.input_file.replace('.json', '_es.json')
+    journal_path = args.journal or output_path + '.journal'
+
+    # Planificación: definiciones distintas, costo y tiempo
+    if args.plan or args.plan_only:
+        # Al reanudar, lo que ya está en el journal no cuenta como trabajo pendiente
+        journaled = set()
+        if args.resume and os.path.exists(journal_path):
+            journaled = TranslationJournal(journal_path, resume=True).done_indices()
+        with METRICS.stage('plan'):
+            plan = plan_translation(entries, translator, journaled)
+        estimate = plan.estimate(args.service, args.rate, args.pack, args.price_per_million)
+        print(f"\n🧮 Plan de traducción:")
+        if plan.journaled:
+            print(f"   Ya en el journal: {plan.journaled} entradas (se omiten)")
+        print(f"   Definiciones: {plan.occurrences}, distintas: {plan.unique} "
+              f"(x{plan.dedup_ratio:.2f} de deduplicación)")
+        print(f"   Ya en caché: {plan.cached}, pendientes: {len(plan.texts)} "
+              f"({plan.chars} caracteres)")
+        print(f"   Estimado: {estimate['requests']} peticiones, "
+              f"~{estimate['seconds'] / 3600:.2f} h a {args.rate or DEFAULT_ESTIMATE_RATE} pet/s, "
+              f"costo ~{estimate['cost']:.2f} €\n")
+
+        if args.plan_only:
+            translator.close()
+            return
+
+        with METRICS.stage('translate', items=len(plan.texts)):
+            translator.translate_texts(
+                plan.texts,
+                workers=args.workers,
+                pack=args.pack,
+                chunk_size=args.batch_size,
+                progress_callback=progress_bar
+            )
+        print()
+
+    journal = TranslationJournal(journal_path, resume=args.resume)
+    done = journal.done_indices()
+    pending = [i for i in range(len(entries)) if i not in done]
+    total = len(entries)
 
-    translated_entries = translator.translate_batch(
-        entries,
-        batch_size=args.batch_size,
-        delay=args.delay,
-        progress_callback=progress_bar
-    )
+    if done:
+        print(f"   Reanudando: {len(done)} entradas ya en {journal_path}")
+
+    # Traducir por checkpoints
+    if args.workers > 1:
+        rate = f"{args.rate}/s" if args.rate else "sin límite"
+        print(f"   Workers: {args.workers}, Rate: {rate}\n")
+    else:
+        print(f"   Batch size: {args.batch_size}, Delay: {args.delay}s\n")
+
+    for start in range(0, len(pending), args.checkpoint_every):
+        chunk_indices = pending[start:start + args.checkpoint_every]
+        chunk = [entries[i] for i in chunk_indices]
+        base = total - len(pending) + start
+
+        def chunk_progress(current, _total, base=base):
+            progress_bar(base + current, total)
+
+        with METRICS.stage('apply' if args.plan else 'translate', items=len(chunk)):
+            if args.plan:
+                # Las traducciones ya están en caché: repartirlas en una pasada
+                translated_chunk = translator.apply_translations(chunk, translator.cache)
+                chunk_progress(len(chunk), len(chunk))
+            elif args.workers > 1:
+                translated_chunk = translator.translate_concurrent(
+                    chunk,
+                    workers=args.workers,
+                    progress_callback=chunk_progress,
+                    pack=args.pack,
+                    batch_size=args.batch_size
+                )
+            else:
+                translated_chunk = translator.translate_batch(
+                    chunk,
+                    batch_size=args.batch_size,
+                    delay=args.delay,
+                    progress_callback=chunk_progress,
+                    pack=args.pack
+                )
+
+        with METRICS.stage('journal', items=len(chunk)):
+            journal.append(zip(chunk_indices, translated_chunk))
 
     print(f"\n\n✅ Traducción completada!")
     print(f"   Traducciones nuevas: {translator.stats['translated']}")
     print(f"   Desde caché: {translator.stats['cached']}")
     print(f"   Errores: {translator.stats['errors']}")
-
-    # Crear índice español
-    print("\n📇 Creando índice de búsqueda español...")
-    spanish_index = create_spanish_search_index(translated_entries)
-    print(f"   Palabras indexadas: {len(spanish_index)}")
-
-    # Preparar salida
-    output_data = {
-        'metadata': {
-            'source': 'CC-CEDICT',
-            'translated_by': args.service,
-            'entries_count': len(translated_entries),
-            'language_definitions': 'es',
-            'language_chinese': 'zh'
-        },
-        'entries': translated_entries,
-        'index': data.get('index', {}),
-        'index_spanish': spanish_index
+    requests_per_entry = translator.stats['requests'] / max(1, len(pending))
+    print(f"   Peticiones al servicio: {translator.stats['requests']} "
+          f"({requests_per_entry:.3f} por entrada)")
+    if translator.stats['batch_fallbacks']:
+        print(f"   Paquetes reintentados uno por uno: {translator.stats['batch_fallbacks']}")
+    translator.close()
+    for stat, value in translator.stats.items():
+        METRICS.count(f'translator.{stat}', value)
+
+    # Armar la salida desde el journal (el índice español se crea en la misma pasada)
+    metadata = {
+        'source': 'CC-CEDICT',
+        'translated_by': args.service,
+        'entries_count': total,
+        'language_definitions': 'es',
+        'language_chinese': 'zh'
     }
-
-    # Guardar
-    output_path = args.output or args.input_file.replace('.json', '_es.json')
-    print(f"\n💾 Guardando en {output_path}...")
-    save_translated_dict(output_data, output_path, compress=args.compress)
+    if args.compact:
+        formats = None
+        if args.precompress is not None:
+            formats = args.precompress or ['gz', 'br']
+        index_path = output_path.replace('.json', '') + '.index.json' if args.client_index else None
+        print(f"\n💾 Guardando en {output_path} (formato compacto)...")
+        result = write_compact_dict(
+            METRICS.timed_iter(journal.iter_entries(), 'journal.read'), output_path, metadata,
+            precompress_formats=formats, client_index_path=index_path
+        )
+        sizes = {'compacto': result['bytes']}
+        sizes.update({f'.{name}': result[name] for name in ('gz', 'br') if name in result})
+        if index_path:
+            sizes['índice'] = result['client_index']
+        print('\n'.join(size_report(sizes)))
+    else:
+        print(f"\n💾 Guardando en {output_path} (con índice de búsqueda español)...")
+        result = write_translated_dict_stream(
+            METRICS.timed_iter(journal.iter_entries(), 'journal.read'), output_path, metadata,
+            data.get('index', {}), compress=args.compress
+        )
+        print(f"   Palabras indexadas: {result['spanish_words']}")
+    journal.remove()
 
     # Mostrar ejemplo
-    if translated_entries:
+    example = result['first']
+    if example:
         print("\n📝 Ejemplo de entrada traducida:")
-        example = translated_entries[0]
         print(f"   Chino: {example['simplified']} ({example['traditional']})")
         print(f"   Pinyin: {example['pinyin']}")
         print(f"   EN: {example.get('definitions_en', [])[:2]}")
@@ -0,0 +1,215 @@
+#!/usr/bin/env python3
+"""
+Caché persistente de traducciones (SQLite en modo WAL)
+
+Clave: (servicio, idioma origen, idioma destino, texto). Se comparte
+entre ejecuciones y entre procesos que escriben a la vez, así que un
+reinicio o un fallo no obliga a pagar de nuevo traducciones ya hechas.
+
+Uso:
+    python translation_cache.py stats translation_cache.db
+    python translation_cache.py export translation_cache.db cache.jsonl
+    python translation_cache.py import translation_cache.db cache.jsonl
+"""
+
+import os
+import json
+import time
+import sqlite3
+import argparse
+import threading
+from typing import Dict, Iterable, List, Optional, Tuple
+
+DEFAULT_CACHE_PATH = 'translation_cache.db'
+
+SCHEMA = '''
+CREATE TABLE IF NOT EXISTS translations (
+    service TEXT NOT NULL,
+    source TEXT NOT NULL,
+    target TEXT NOT NULL,
+    text TEXT NOT NULL,
+    translation TEXT NOT NULL,
+    created_at REAL NOT NULL,
+    PRIMARY KEY (service, source, target, text)
+) WITHOUT ROWID
+'''
+
+# SQLite limita el número de parámetros por consulta
+_MAX_PARAMS = 900
+
+class TranslationCache:
+    """
+    Caché de traducciones para un servicio y par de idiomas
+
+    Args:
+        path: Archivo SQLite (se crea si no existe)
+        service: 'google', 'deepl', 'stub'...
+        source: Idioma origen
+        target: Idioma destino
+    """
+
+    def __init__(self, path: str = DEFAULT_CACHE_PATH, service: str = 'google',
+                 source: str = 'en', target: str = 'es'):
+        self.path = path
+        self.key = (service, source, target)
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, timeout=30, check_same_thread=False)
+        # WAL: lectores y escritores concurrentes (varios procesos) sin bloquearse
+        self._conn.execute('PRAGMA journal_mode=WAL')
+        self._conn.execute('PRAGMA synchronous=NORMAL')
+        self._conn.execute(SCHEMA)
+        self._conn.commit()
+
+    def get(self, text: str) -> Optional[str]:
+        with self._lock:
+            row = self._conn.execute(
+                'SELECT translation FROM translations '
+                'WHERE service = ? AND source = ? AND target = ? AND text = ?',
+                (*self.key, text)
+            ).fetchone()
+        return row[0] if row else None
+
+    def get_many(self, texts: Iterable[str]) -> Dict[str, str]:
+        """Traducciones conocidas para los textos dados (los ausentes se omiten)"""
+        texts = list(dict.fromkeys(texts))
+        found = {}
+        with self._lock:
+            for i in range(0, len(texts), _MAX_PARAMS):
+                chunk = texts[i:i + _MAX_PARAMS]
+                placeholders = ','.join('?' * len(chunk))
+                rows = self._conn.execute(
+                    'SELECT text, translation FROM translations '
+                    'WHERE service = ? AND source = ? AND target = ? '
+                    f'AND text IN ({placeholders})',
+                    (*self.key, *chunk)
+                )
+                found.update(rows)
+        return found
+
+    def put(self, text: str, translation: str):
+        self.put_many([(text, translation)])
+
+    def put_many(self, pairs: Iterable[Tuple[str, str]]):
+        now = time.time()
+        rows = [(*self.key, text, translation, now) for text, translation in pairs]
+        with self._lock:
+            self._conn.executemany(
+                'INSERT OR REPLACE INTO translations VALUES (?, ?, ?, ?, ?, ?)',
+                rows
+            )
+            self._conn.commit()
+
+    def stats(self) -> Dict:
+        """Número de traducciones por (servicio, origen, destino) y tamaño en disco"""
+        with self._lock:
+            rows = self._conn.execute(
+                'SELECT service, source, target, COUNT(*), '
+                'SUM(LENGTH(text)), SUM(LENGTH(translation)) '
+                'FROM translations GROUP BY service, source, target'
+            ).fetchall()
+
+        size = sum(os.path.getsize(self.path + suffix)
+                   for suffix in ('', '-wal')
+                   if os.path.exists(self.path + suffix))
+        return {
+            'entries': sum(row[3] for row in rows),
+            'file_bytes': size,
+            'groups': [
+                {
+                    'service': service, 'source': source, 'target': target,
+                    'entries': count, 'text_chars': text_chars,
+                    'translation_chars': translation_chars
+                }
+                for service, source, target, count, text_chars, translation_chars in rows
+            ]
+        }
+
+    def export_jsonl(self, filepath: str) -> int:
+        """Exporta toda la caché (todos los servicios) a JSON Lines"""
+        count = 0
+        with self._lock, open(filepath, 'w', encoding='utf-8') as f:
+            rows = self._conn.execute(
+                'SELECT service, source, target, text, translation, created_at '
+                'FROM translations ORDER BY service, source, target, text'
+            )
+            for service, source, target, text, translation, created_at in rows:
+                f.write(json.dumps({
+                    'service': service, 'source': source, 'target': target,
+                    'text': text, 'translation': translation, 'created_at': created_at
+                }, ensure_ascii=False))
+                f.write('\n')
+                count += 1
+        return count
+
+    def import_jsonl(self, filepath: str, batch_size: int = 5000) -> int:
+        """Importa un export JSON Lines; las claves existentes se sobrescriben"""
+        count = 0
+        batch: List[Tuple] = []
+
+        def flush():
+            with self._lock:
+                self._conn.executemany(
+                    'INSERT OR REPLACE INTO translations VALUES (?, ?, ?, ?, ?, ?)',
+                    batch
+                )
+                self._conn.commit()
+            batch.clear()
+
+        with open(filepath, 'r', encoding='utf-8') as f:
+            for line in f:
+                if not line.strip():
+                    continue
+                row = json.loads(line)
+                batch.append((row['service'], row['source'], row['target'], row['text'],
+                              row['translation'], row.get('created_at', time.time())))
+                count += 1
+                if len(batch) >= batch_size:
+                    flush()
+        if batch:
+            flush()
+        return count
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
+
+def main():
+    parser = argparse.ArgumentParser(
+        description='Caché persistente de traducciones'
+    )
+    subparsers = parser.add_subparsers(dest='command', required=True)
+
+    stats_parser = subparsers.add_parser('stats', help='Tamaño y número de traducciones')
+    stats_parser.add_argument('cache_file')
+
+    export_parser = subparsers.add_parser('export', help='Exportar a JSON Lines')
+    export_parser.add_argument('cache_file')
+    export_parser.add_argument('output_file')
+
+    import_parser = subparsers.add_parser('import', help='Importar desde JSON Lines')
+    import_parser.add_argument('cache_file')
+    import_parser.add_argument('input_file')
+
+    args = parser.parse_args()
+    cache = TranslationCache(args.cache_file)
+
+    if args.command == 'stats':
+        stats = cache.stats()
+        print(f"📦 {args.cache_file}: {stats['entries']} traducciones, "
+              f"{stats['file_bytes'] / 1024:.1f} KB")
+        for group in stats['groups']:
+            print(f"   {group['service']} {group['source']}→{group['target']}: "
+                  f"{group['entries']} ({group['text_chars']} caracteres origen)")
+
+    elif args.command == 'export':
+        count = cache.export_jsonl(args.output_file)
+        print(f"✅ Exportadas {count} traducciones a {args.output_file}")
+
+    elif args.command == 'import':
+        count = cache.import_jsonl(args.input_file)
+        print(f"✅ Importadas {count} traducciones desde {args.input_file}")
+
+    cache.close()
+
+if __name__ == '__main__':
+    main()
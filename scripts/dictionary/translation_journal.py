@@ -0,0 +1,91 @@
+#!/usr/bin/env python3
+"""
+Journal de entradas traducidas para ejecuciones reanudables
+
+Cada checkpoint añade líneas {"i": índice, "entry": {...}} al archivo y
+hace fsync. Al reanudar, las entradas con índice ya presente se saltan;
+la salida final se arma leyendo el journal en orden de índice, sin
+cargar todas las entradas en memoria.
+"""
+
+import os
+import json
+from typing import Dict, Iterable, Iterator, Set, Tuple
+
+class TranslationJournal:
+    """
+    Args:
+        path: Archivo del journal (NDJSON)
+        resume: Conservar el contenido existente (False = empezar de cero)
+    """
+
+    def __init__(self, path: str, resume: bool = False):
+        self.path = path
+        if not resume or not os.path.exists(path):
+            open(path, 'w').close()
+        else:
+            self._drop_partial_line()
+
+    def _drop_partial_line(self):
+        """Descarta una última línea incompleta (proceso interrumpido a mitad de escritura)"""
+        with open(self.path, 'rb+') as f:
+            f.seek(0, os.SEEK_END)
+            size = f.tell()
+            if size == 0:
+                return
+            f.seek(size - 1)
+            if f.read(1) == b'\n':
+                return
+            # Retroceder hasta el último salto de línea
+            pos = size - 1
+            while pos > 0:
+                step = min(pos, 1 << 16)
+                f.seek(pos - step)
+                chunk = f.read(step)
+                newline = chunk.rfind(b'\n')
+                if newline >= 0:
+                    f.truncate(pos - step + newline + 1)
+                    return
+                pos -= step
+            f.truncate(0)
+
+    def _scan(self) -> Iterator[Tuple[int, int]]:
+        """Recorre el journal devolviendo (índice de entrada, offset de la línea)"""
+        with open(self.path, 'rb') as f:
+            offset = 0
+            for line in f:
+                if line.strip():
+                    yield json.loads(line)['i'], offset
+                offset += len(line)
+
+    def done_indices(self) -> Set[int]:
+        """Índices de entrada ya traducidos"""
+        return {i for i, _ in self._scan()}
+
+    def append(self, records: Iterable[Tuple[int, Dict]]) -> int:
+        """Añade un checkpoint y lo fuerza a disco; devuelve cuántas entradas escribió"""
+        count = 0
+        with open(self.path, 'a', encoding='utf-8') as f:
+            for i, entry in records:
+                f.write(json.dumps({'i': i, 'entry': entry}, ensure_ascii=False))
+                f.write('\n')
+                count += 1
+            f.flush()
+            os.fsync(f.fileno())
+        return count
+
+    def iter_entries(self) -> Iterator[Dict]:
+        """
+        Entradas del journal en orden de índice
+
+        Solo mantiene en memoria el offset de cada línea; si un índice
+        aparece varias veces gana la última escritura.
+        """
+        offsets = dict(self._scan())
+        with open(self.path, 'rb') as f:
+            for i in sorted(offsets):
+                f.seek(offsets[i])
+                yield json.loads(f.readline())['entry']
+
+    def remove(self):
+        os.remove(self.path)
@@ -0,0 +1,119 @@
+/**
+ * @fileoverview Paridad entre el índice precalculado (Python) y buildSearchIndex (JS)
+ * @module services/__tests__/dictionaryIndexParity.test
+ *
+ * Los casos esperados los genera scripts/dictionary/client_index.py:
+ *   python client_index.py cases -o ../../src/services/__tests__/fixtures/normalizer_parity.json
+ *   python client_index.py build ../../public/dictionaries/spanish_freq.json
+ *   python chunked_dict.py build ../../public/dictionaries/spanish_freq.json -o ../../public/dictionaries/spanish_freq
+ * Si falla, uno de los dos normalizadores cambió sin el otro, o
+ * spanish_freq.json se editó sin regenerar el índice y los chunks.
+ */
+
+import { describe, it, expect, vi } from 'vitest';
+import { readFileSync } from 'fs';
+import { createHash } from 'crypto';
+import {
+  normalizePinyin,
+  spanishIndexWords,
+  spanishTerms,
+  rankedSpanishMatches,
+  createSearchIndex,
+  loadPrebuiltIndex
+} from '../dictionaryService';
+
+// Mock de logger
+vi.mock('../../utils/logger', () => ({
+  default: {
+    error: vi.fn(),
+    warn: vi.fn(),
+    info: vi.fn(),
+    debug: vi.fn()
+  }
+}));
+
+const readJson = (relativePath) =>
+  JSON.parse(readFileSync(new URL(relativePath, import.meta.url), 'utf8'));
+
+const cases = readJson('./fixtures/normalizer_parity.json');
+
+describe('Normalizadores Python/JS', () => {
+  it.each(cases.pinyin)('normalizePinyin($input)', ({ input, expected }) => {
+    expect(normalizePinyin(input)).toBe(expected);
+  });
+
+  it.each(cases.definitions)('spanishIndexWords($input)', ({ input, expected }) => {
+    expect(spanishIndexWords(input)).toEqual(expected);
+  });
+
+  it.each(cases.terms)('spanishTerms($input)', ({ input, expected }) => {
+    expect(spanishTerms(input)).toEqual(expected);
+  });
+});
+
+describe('index_spanish', () => {
+  const postings = { hola: [3, 1, 2], mundo: [2, 3], 'niño': [4] };
+
+  it('devuelve las entradas con todas las palabras, en el orden de la primera', () => {
+    expect(rankedSpanishMatches(postings, 'Hola, mundo')).toEqual([3, 2]);
+    expect(rankedSpanishMatches(postings, 'NIÑO')).toEqual([4]);
+  });
+
+  it('ignora los acentos de la consulta', () => {
+    expect(rankedSpanishMatches(postings, 'hóla múndo')).toEqual([3, 2]);
+  });
+
+  it('no devuelve nada si falta alguna palabra', () => {
+    expect(rankedSpanishMatches(postings, 'hola adiós')).toEqual([]);
+    expect(rankedSpanishMatches(postings, '')).toEqual([]);
+  });
+});
+
+describe('Índice precalculado', () => {
+  const source = readFileSync(new URL('../../../public/dictionaries/spanish_freq.json', import.meta.url));
+  const sourceHash = createHash('sha256').update(source).digest('hex');
+  const entries = JSON.parse(source.toString('utf8')).entries;
+  const prebuilt = readJson('../../../public/dictionaries/spanish_freq.index.json');
+
+  it('coincide con createSearchIndex (claves, orden e índices)', () => {
+    const built = createSearchIndex(entries);
+    const loaded = loadPrebuiltIndex(prebuilt, entries.length, sourceHash);
+
+    expect(loaded).not.toBeNull();
+    for (const name of ['bySimplified', 'byTraditional', 'byPinyin', 'bySpanish']) {
+      expect([...loaded[name]]).toEqual([...built[name]]);
+    }
+  });
+
+  it('se descarta si no corresponde a las entradas cargadas', () => {
+    expect(loadPrebuiltIndex(prebuilt, entries.length + 1, sourceHash)).toBeNull();
+    expect(loadPrebuiltIndex({ ...prebuilt, metadata: {} }, entries.length, sourceHash)).toBeNull();
+  });
+
+  it('se descarta si el diccionario cambió aunque tenga las mismas entradas', () => {
+    const otherHash = createHash('sha256').update(Buffer.concat([source, Buffer.from(' ')])).digest('hex');
+    expect(loadPrebuiltIndex(prebuilt, entries.length, otherHash)).toBeNull();
+    expect(loadPrebuiltIndex(prebuilt, entries.length, null)).toBeNull();
+  });
+});
+
+describe('Chunks del diccionario', () => {
+  const baseUrl = new URL('../../../public/dictionaries/spanish_freq/', import.meta.url);
+  const source = readFileSync(new URL('../spanish_freq.json', baseUrl));
+  const manifest = JSON.parse(readFileSync(new URL('manifest.json', baseUrl), 'utf8'));
+
+  it('salen del spanish_freq.json actual', () => {
+    expect(manifest.source_sha256).toBe(createHash('sha256').update(source).digest('hex'));
+  });
+
+  it('cada chunk coincide con su hash y juntos reproducen las entradas', () => {
+    const entries = manifest.chunks.flatMap((chunk) => {
+      const data = readFileSync(new URL(chunk.file, baseUrl));
+      expect(createHash('sha256').update(data).digest('hex').slice(0, chunk.hash.length)).toBe(chunk.hash);
+      return JSON.parse(data.toString('utf8'));
+    });
+
+    expect(entries).toEqual(JSON.parse(source.toString('utf8')).entries);
+    expect(entries.length).toBe(manifest.entries_count);
+  });
+});
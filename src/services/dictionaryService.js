@@ -15,6 +15,8 @@ let dictionaryIndex = {
   byPinyin: new Map(),
   bySpanish: new Map()
 };
+// index_spanish de los diccionarios traducidos (translate_to_spanish.py)
+let spanishPostings = null;
 let isLoaded = false;
 let loadingPromise = null;
 
@@ -35,16 +37,41 @@ export async function loadDictionary() {
     try {
       logger.info('Cargando diccionario por frecuencia (español→chino)...', 'dictionaryService');
 
-      const response = await fetch('/dictionaries/spanish_freq.json');
-      if (!response.ok) {
-        throw new Error(`HTTP ${response.status}`);
-      }
+      // El índice precalculado es opcional: se pide en paralelo y sin fallar
+      const [chunked, prebuiltIndex] = await Promise.all([
+        fetchChunkedDictionary('/dictionaries/spanish_freq/manifest.json'),
+        fetchPrebuiltIndex('/dictionaries/spanish_freq.index.json')
+      ]);
+
+      let sourceHash = null;
+      if (chunked) {
+        // El manifest lleva el sha256 del archivo del que salieron los chunks
+        dictionaryCache = chunked.entries;
+        spanishPostings = null;
+        sourceHash = chunked.sourceHash;
+      } else {
+        const response = await fetch('/dictionaries/spanish_freq.json');
+        if (!response.ok) {
+          throw new Error(`HTTP ${response.status}`);
+        }
 
-      const data = await response.json();
-      dictionaryCache = data.entries;
+        // Bytes crudos: el índice precalculado se valida con su sha256
+        const buffer = await response.arrayBuffer();
+        const data = JSON.parse(new TextDecoder().decode(buffer));
+        dictionaryCache = data.entries;
+        spanishPostings = data.index_spanish || null;
+        sourceHash = prebuiltIndex ? await sha256Hex(buffer) : null;
+      }
 
-      // Construir índices para búsqueda rápida
-      buildSearchIndex(dictionaryCache);
+      // Usar el índice precalculado si corresponde a este archivo; si no, construirlo
+      const loadedIndex = prebuiltIndex &&
+        loadPrebuiltIndex(prebuiltIndex, dictionaryCache.length, sourceHash);
+      if (loadedIndex) {
+        dictionaryIndex = loadedIndex;
+        logger.info(`Índices precalculados: ${loadedIndex.bySimplified.size} chino, ${loadedIndex.bySpanish.size} español`, 'dictionaryService');
+      } else {
+        buildSearchIndex(dictionaryCache);
+      }
 
       isLoaded = true;
       logger.info(`Diccionario cargado: ${dictionaryCache.length} entradas`, 'dictionaryService');
@@ -61,18 +88,207 @@ export async function loadDictionary() {
 }
 
 /**
- * Construye índices de búsqueda para acceso O(1)
+ * Descarga el diccionario en chunks (scripts/dictionary/chunked_dict.py)
+ *
+ * El manifest se pide siempre a la red; los chunks se llaman por el hash
+ * de su contenido y el service worker los sirve CacheFirst, así que tras
+ * un nuevo build solo se descargan los chunks que cambiaron. Cada chunk
+ * se comprueba contra su hash: uno corrupto, o sin Web Crypto para
+ * comprobarlo, hace volver al archivo monolítico.
+ * @param {string} url - URL del manifest.json
+ * @returns {Promise<Object|null>} { entries, sourceHash } o null si no hay
+ *   chunks (o están incompletos) y hay que usar el archivo monolítico
+ */
+async function fetchChunkedDictionary(url) {
+  try {
+    const response = await fetch(url, { cache: 'no-cache' });
+    if (!response.ok) {
+      return null;
+    }
+    const manifest = await response.json();
+    if (manifest?.format !== 'chunked' || !Array.isArray(manifest.chunks)) {
+      return null;
+    }
+
+    const baseUrl = url.slice(0, url.lastIndexOf('/') + 1);
+    const chunks = await Promise.all(manifest.chunks.map(async (chunk) => {
+      const chunkResponse = await fetch(baseUrl + chunk.file);
+      if (!chunkResponse.ok) {
+        throw new Error(`${chunk.file}: HTTP ${chunkResponse.status}`);
+      }
+      // El nombre del chunk es el sha256 de su contenido (HASH_LENGTH = 16)
+      const buffer = await chunkResponse.arrayBuffer();
+      const hash = await sha256Hex(buffer);
+      if (!hash || hash.slice(0, chunk.hash.length) !== chunk.hash) {
+        throw new Error(`${chunk.file}: el contenido no coincide con su hash`);
+      }
+      const entries = JSON.parse(new TextDecoder().decode(buffer));
+      if (entries.length !== chunk.entries) {
+        throw new Error(`${chunk.file}: ${entries.length} entradas, el manifest dice ${chunk.entries}`);
+      }
+      return entries;
+    }));
+
+    const entries = chunks.flat();
+    if (entries.length !== manifest.entries_count) {
+      throw new Error(`${entries.length} entradas, el manifest dice ${manifest.entries_count}`);
+    }
+    logger.info(`Diccionario en ${chunks.length} chunks (build ${manifest.build})`, 'dictionaryService');
+    return { entries, sourceHash: manifest.source_sha256 || null };
+  } catch (error) {
+    logger.warn('Chunks del diccionario no disponibles, se usa el archivo completo', 'dictionaryService');
+    return null;
+  }
+}
+
+/**
+ * Descarga el índice precalculado (scripts/dictionary/client_index.py)
+ * @param {string} url - URL del índice
+ * @returns {Promise<Object|null>} JSON del índice o null si no está disponible
+ */
+async function fetchPrebuiltIndex(url) {
+  try {
+    const response = await fetch(url);
+    return response.ok ? await response.json() : null;
+  } catch (error) {
+    logger.warn('Índice precalculado no disponible, se construirá al cargar', 'dictionaryService');
+    return null;
+  }
+}
+
+/**
+ * sha256 en hexadecimal (file_sha256 en client_index.py)
+ * @param {ArrayBuffer} buffer
+ * @returns {Promise<string|null>} Hash o null si Web Crypto no está disponible
+ */
+async function sha256Hex(buffer) {
+  if (!globalThis.crypto?.subtle) {
+    return null;
+  }
+  const hashBuffer = await crypto.subtle.digest('SHA-256', buffer);
+  return Array.from(new Uint8Array(hashBuffer))
+    .map(b => b.toString(16).padStart(2, '0'))
+    .join('');
+}
+
+/**
+ * Convierte el índice precalculado (pares [clave, índices]) en Maps
+ * @param {Object} data - JSON generado por client_index.py
+ * @param {number} entriesCount - Número de entradas cargadas
+ * @param {string|null} sourceHash - sha256 del archivo del diccionario cargado
+ * @returns {Object|null} Índices o null si no corresponde a ese archivo
+ */
+export function loadPrebuiltIndex(data, entriesCount, sourceHash) {
+  const metadata = data?.metadata;
+  if (metadata?.format !== 'client-index' || metadata.entries_count !== entriesCount ||
+      !sourceHash || metadata.source_sha256 !== sourceHash) {
+    return null;
+  }
+  return {
+    bySimplified: new Map(data.bySimplified),
+    byTraditional: new Map(data.byTraditional),
+    byPinyin: new Map(data.byPinyin),
+    bySpanish: new Map(data.bySpanish)
+  };
+}
+
+/**
+ * Limpia palabras para los índices: sin signos, al menos 2 caracteres
+ * @param {Array<string>} words
+ * @returns {Array<string>}
+ */
+function cleanIndexWords(words) {
+  return words
+    .map(word => word.replace(/[^\w\u00C0-\u017F]/g, ''))
+    .filter(cleanWord => cleanWord.length >= 2);
+}
+
+/**
+ * Minúsculas y sin acentos ni diéresis, conservando la ñ
+ * (normalize_spanish en scripts/dictionary/spanish_text.py)
+ * @param {string} text
+ * @returns {string} Texto normalizado
+ */
+export function foldSpanish(text) {
+  return text.toLowerCase().replace(/[\u00C0-\u024F]/g, (char) => {
+    if (char === 'ñ' || char === 'Ñ') {
+      return char;
+    }
+    const base = char.normalize('NFD')[0];
+    return base !== char && base < '\u0080' ? base : char;
+  });
+}
+
+/**
+ * Todas las palabras de una definición o consulta, sin acentos (claves
+ * de index_spanish en translate_to_spanish.py)
+ * @param {string} text
+ * @returns {Array<string>} Palabras normalizadas
+ */
+export function spanishTerms(text) {
+  if (!text || typeof text !== 'string') {
+    return [];
+  }
+  const cleaned = foldSpanish(text).replace(/^\s*\([^)]*\)\s*/, '').trim();
+  return cleanIndexWords(cleaned.split(/[\s,;\/()]+/));
+}
+
+/**
+ * Entradas que contienen todas las palabras de la consulta, en el orden
+ * de relevancia de las postings de la primera palabra
+ * @param {Object} postings - index_spanish (palabra -> índices ordenados)
+ * @param {string} query
+ * @returns {Array<number>} Índices de entradas (vacío si falta alguna palabra)
+ */
+export function rankedSpanishMatches(postings, query) {
+  const terms = spanishTerms(query);
+  const lists = terms.map(term => postings[term]);
+  if (lists.length === 0 || lists.some(list => !list)) {
+    return [];
+  }
+  const others = lists.slice(1).map(list => new Set(list));
+  return lists[0].filter(idx => others.every(set => set.has(idx)));
+}
+
+/**
+ * Palabras en español que se indexan de una entrada:
+ * SOLO primera definición, SOLO palabras principales
+ * @param {Array} definitions - Definiciones en español
+ * @returns {Array<string>} Hasta 3 palabras normalizadas
+ */
+export function spanishIndexWords(definitions) {
+  if (!Array.isArray(definitions) || definitions.length === 0) {
+    return [];
+  }
+  const firstDef = definitions[0];
+  if (!firstDef || typeof firstDef !== 'string') {
+    return [];
+  }
+
+  // Limpiar prefijos comunes (jerga, fig., lit., etc.)
+  const cleanedDef = firstDef.replace(/^\s*\([^)]*\)\s*/, '').trim();
+
+  // Extraer las primeras 3 palabras significativas de la definición
+  const words = cleanedDef.toLowerCase().split(/[,;\/]|(?:\()/)[0].trim().split(/\s+/);
+
+  return cleanIndexWords(words.slice(0, 3));
+}
+
+/**
+ * Crea los índices de búsqueda para acceso O(1)
+ * (client_index.py genera exactamente las mismas estructuras)
  * @param {Array} entries - Entradas del diccionario
+ * @returns {Object} Índices bySimplified/byTraditional/byPinyin/bySpanish
  */
-function buildSearchIndex(entries) {
-  dictionaryIndex = {
+export function createSearchIndex(entries) {
+  const index = {
     bySimplified: new Map(),
     byTraditional: new Map(),
     byPinyin: new Map(),
     bySpanish: new Map()
   };
 
-  entries.forEach((entry, index) => {
+  entries.forEach((entry, i) => {
     // Normalizar formato: soportar ambos formatos (s/t/p/d y simplified/traditional/pinyin/definitions_es)
     const simplified = entry.s || entry.simplified;
     const traditional = entry.t || entry.traditional;
@@ -85,52 +301,47 @@ function buildSearchIndex(entries) {
     }
 
     // Índice por caracteres simplificados
-    if (!dictionaryIndex.bySimplified.has(simplified)) {
-      dictionaryIndex.bySimplified.set(simplified, []);
+    if (!index.bySimplified.has(simplified)) {
+      index.bySimplified.set(simplified, []);
     }
-    dictionaryIndex.bySimplified.get(simplified).push(index);
+    index.bySimplified.get(simplified).push(i);
 
     // Índice por caracteres tradicionales
-    if (!dictionaryIndex.byTraditional.has(traditional)) {
-      dictionaryIndex.byTraditional.set(traditional, []);
+    if (!index.byTraditional.has(traditional)) {
+      index.byTraditional.set(traditional, []);
     }
-    dictionaryIndex.byTraditional.get(traditional).push(index);
+    index.byTraditional.get(traditional).push(i);
 
     // Índice por pinyin (normalizado sin espacios y sin tonos)
     const pinyinKey = normalizePinyin(pinyin);
-    if (pinyinKey && !dictionaryIndex.byPinyin.has(pinyinKey)) {
-      dictionaryIndex.byPinyin.set(pinyinKey, []);
+    if (pinyinKey && !index.byPinyin.has(pinyinKey)) {
+      index.byPinyin.set(pinyinKey, []);
     }
     if (pinyinKey) {
-      dictionaryIndex.byPinyin.get(pinyinKey).push(index);
+      index.byPinyin.get(pinyinKey).push(i);
     }
 
-    // Índice por palabras en español - SOLO primera definición, SOLO palabras principales
-    if (Array.isArray(definitions) && definitions.length > 0) {
-      const firstDef = definitions[0];
-      if (firstDef && typeof firstDef === 'string') {
-        // Limpiar prefijos comunes (jerga, fig., lit., etc.)
-        const cleanedDef = firstDef.replace(/^\s*\([^)]*\)\s*/, '').trim();
-
-        // Extraer las primeras 3 palabras significativas de la definición
-        const words = cleanedDef.toLowerCase().split(/[,;\/]|(?:\()/)[0].trim().split(/\s+/);
-
-        // Indexar solo las primeras 3 palabras de la primera definición
-        words.slice(0, 3).forEach(word => {
-          const cleanWord = word.replace(/[^\w\u00C0-\u017F]/g, '');
-          if (cleanWord.length >= 2) {
-            if (!dictionaryIndex.bySpanish.has(cleanWord)) {
-              dictionaryIndex.bySpanish.set(cleanWord, []);
-            }
-            if (!dictionaryIndex.bySpanish.get(cleanWord).includes(index)) {
-              dictionaryIndex.bySpanish.get(cleanWord).push(index);
-            }
-          }
-        });
+    // Índice por palabras en español (primeras palabras de la primera definición)
+    spanishIndexWords(definitions).forEach(cleanWord => {
+      if (!index.bySpanish.has(cleanWord)) {
+        index.bySpanish.set(cleanWord, []);
       }
-    }
+      if (!index.bySpanish.get(cleanWord).includes(i)) {
+        index.bySpanish.get(cleanWord).push(i);
+      }
+    });
   });
 
+  return index;
+}
+
+/**
+ * Construye los índices de búsqueda del diccionario cargado
+ * @param {Array} entries - Entradas del diccionario
+ */
+function buildSearchIndex(entries) {
+  dictionaryIndex = createSearchIndex(entries);
+
   logger.info(`Índices construidos: ${dictionaryIndex.bySimplified.size} chino, ${dictionaryIndex.bySpanish.size} español`, 'dictionaryService');
 }
 
@@ -139,7 +350,7 @@ function buildSearchIndex(entries) {
  * @param {string} pinyin - Pinyin con marcas de tono
  * @returns {string} Pinyin normalizado
  */
-function normalizePinyin(pinyin) {
+export function normalizePinyin(pinyin) {
   if (!pinyin || typeof pinyin !== 'string') {
     return '';
   }
@@ -322,9 +533,18 @@ function searchByPinyin(query, limit, fuzzy) {
 
 /**
  * Búsqueda por español - ESTRATEGIA SIMPLE
- * Buscar palabra exacta en TODAS las definiciones + ordenar solo por longitud
+ * Con index_spanish, sus postings ya ordenadas por relevancia; si no (o
+ * sin resultados), buscar palabra exacta en TODAS las definiciones +
+ * ordenar solo por longitud
  */
 function searchBySpanish(query, limit, fuzzy) {
+  if (spanishPostings) {
+    const matches = rankedSpanishMatches(spanishPostings, query);
+    if (matches.length > 0) {
+      return matches.slice(0, limit).map(idx => formatEntry(dictionaryCache[idx]));
+    }
+  }
+
   const normalizedQuery = query.toLowerCase().trim();
   const candidates = [];
 
@@ -0,0 +1,176 @@
+#!/usr/bin/env python3
+
+"""
+Tests de regresión de audio_batch.run_batch contra tts_stub_server.py
+
+generate-audio-web.py apunta al servidor local (sin red): se comprueba
+que los clips ya generados se omiten, que la caché evita peticiones y
+que los fallos no quedan en el índice.
+
+Ejecutar: python -m pytest test_audio_batch.py
+"""
+
+import threading
+
+import pytest
+
+import audio_batch
+from audio_cache import AudioCache
+from tts_stub_server import _wait_for_losers, load_web_generator, make_server
+
+@pytest.fixture
+def stub_server():
+    server = make_server(latency=0, failure_rate=0, seed=0)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    yield server
+    server.shutdown()
+    server.server_close()
+
+@pytest.fixture
+def state(stub_server):
+    return stub_server.RequestHandlerClass.state
+
+@pytest.fixture
+def web(stub_server, monkeypatch):
+    module = load_web_generator()
+    host, port = stub_server.server_address[:2]
+    module.VOICERSS_URL = f'http://{host}:{port}/voicerss/'
+    module.TTSMP3_URL = f'http://{host}:{port}/makemp3_new.php'
+    module.REQUEST_DELAY = 0
+    # Sin la pausa antes de pasar a ttsMP3
+    monkeypatch.setattr(module.time, 'sleep', lambda seconds: None)
+    return module
+
+@pytest.fixture(autouse=True)
+def index_dir(tmp_path, monkeypatch):
+    monkeypatch.setattr(audio_batch, 'INDEX_DIR', tmp_path / 'index')
+
+def make_phrases(count):
+    return [audio_batch.make_phrase(f'Frase de prueba número {i}') for i in range(count)]
+
+def run(web, phrases, output_dir, **options):
+    options.setdefault('params', web.TTS_PARAMS)
+    return audio_batch.run_batch(phrases, web.generate_audio, web.BACKENDS,
+                                 output_dir=output_dir, delay=0, **options)
+
+def total_requests(state):
+    return sum(counters['requests'] for counters in state.snapshot().values())
+
+def test_rerun_skips_generated_clips(web, state, tmp_path):
+    output_dir = tmp_path / 'audio'
+    phrases = make_phrases(5)
+
+    stats = run(web, phrases, output_dir)
+    assert stats['generated'] == 5
+    assert stats['failed'] == []
+    assert all((output_dir / phrase['filename']).exists() for phrase in phrases)
+    requests = total_requests(state)
+
+    stats = run(web, phrases, output_dir)
+    assert (stats['skipped'], stats['generated']) == (5, 0)
+    assert total_requests(state) == requests
+
+def test_index_stays_out_of_output_dir(web, tmp_path):
+    output_dir = tmp_path / 'audio'
+    run(web, make_phrases(1), output_dir)
+    assert audio_batch.index_path(output_dir).exists()
+    assert not (output_dir / audio_batch.LEGACY_INDEX_NAME).exists()
+
+def test_legacy_index_is_migrated(web, tmp_path):
+    output_dir = tmp_path / 'audio'
+    phrases = make_phrases(2)
+    run(web, phrases, output_dir)
+    path = audio_batch.index_path(output_dir)
+    path.rename(output_dir / audio_batch.LEGACY_INDEX_NAME)
+
+    stats = run(web, phrases, output_dir)
+    assert stats['skipped'] == 2
+    assert path.exists()
+    assert not (output_dir / audio_batch.LEGACY_INDEX_NAME).exists()
+
+def test_voice_change_regenerates(web, tmp_path):
+    output_dir = tmp_path / 'audio'
+    phrases = make_phrases(3)
+    run(web, phrases, output_dir)
+
+    params = {**web.TTS_PARAMS, 'voicerss': 'es-mx', 'ttsmp3': 'Mia'}
+    stats = run(web, phrases, output_dir, params=params)
+    assert (stats['skipped'], stats['generated']) == (0, 3)
+
+def test_force_regenerates(web, tmp_path):
+    output_dir = tmp_path / 'audio'
+    phrases = make_phrases(2)
+    run(web, phrases, output_dir)
+    stats = run(web, phrases, output_dir, force=True)
+    assert (stats['skipped'], stats['generated']) == (0, 2)
+
+def test_repeated_text_is_generated_once(web, state, tmp_path):
+    output_dir = tmp_path / 'audio'
+    phrases = [audio_batch.make_phrase('Hola', 'hola.mp3'),
+               audio_batch.make_phrase('Hola', 'saludo.mp3')]
+
+    stats = run(web, phrases, output_dir)
+    assert (stats['unique'], stats['generated']) == (1, 1)
+    assert total_requests(state) == 1
+    assert (output_dir / 'hola.mp3').read_bytes() == (output_dir / 'saludo.mp3').read_bytes()
+
+def test_fallback_backend_is_recorded(web, state, tmp_path):
+    output_dir = tmp_path / 'audio'
+    phrases = make_phrases(2)
+    # VoiceRSS inalcanzable: los clips los genera ttsMP3
+    web.VOICERSS_URL = 'http://127.0.0.1:1/'
+    stats = run(web, phrases, output_dir)
+    assert stats['generated'] == 2
+    assert set(state.snapshot()) == {'ttsmp3'}
+
+    # Con la clave de ttsMP3 en el índice, no se vuelve a pedir
+    stats = run(web, phrases, output_dir)
+    assert stats['skipped'] == 2
+
+def test_failed_clips_are_retried(web, state, tmp_path):
+    output_dir = tmp_path / 'audio'
+    phrases = make_phrases(2)
+    state.failure_rate = 1.0
+    stats = run(web, phrases, output_dir)
+    assert stats['generated'] == 0
+    assert sorted(stats['failed']) == sorted(phrase['filename'] for phrase in phrases)
+
+    state.failure_rate = 0.0
+    stats = run(web, phrases, output_dir)
+    assert (stats['skipped'], stats['generated']) == (0, 2)
+
+def test_cache_avoids_requests(web, state, tmp_path):
+    cache = AudioCache(tmp_path / 'cache', max_bytes=None)
+    phrases = make_phrases(4)
+
+    stats = run(web, phrases, tmp_path / 'first', cache=cache)
+    assert stats['generated'] == 4
+    requests = total_requests(state)
+
+    # Otro directorio de salida: todo sale de la caché
+    stats = run(web, phrases, tmp_path / 'second', cache=cache)
+    assert (stats['cached'], stats['generated']) == (4, 0)
+    assert total_requests(state) == requests
+    for phrase in phrases:
+        first = tmp_path / 'first' / phrase['filename']
+        second = tmp_path / 'second' / phrase['filename']
+        assert second.read_bytes() == first.read_bytes()
+
+    # Y quedan en el índice de ese directorio
+    stats = run(web, phrases, tmp_path / 'second', cache=cache)
+    assert stats['skipped'] == 4
+
+def test_concurrent_mode(web, state, tmp_path):
+    output_dir = tmp_path / 'audio'
+    phrases = make_phrases(8)
+    synthesize = web.make_concurrent_synthesizer(concurrency=2, rate=100, retries=2)
+
+    stats = audio_batch.run_batch(phrases, synthesize, web.BACKENDS, web.TTS_PARAMS,
+                                  output_dir, workers=4)
+    _wait_for_losers()
+    assert stats['generated'] == 8
+    assert all(counters['max_in_flight'] <= 2 for counters in state.snapshot().values())
+
+    stats = run(web, phrases, output_dir)
+    assert stats['skipped'] == 8
@@ -0,0 +1,244 @@
+#!/usr/bin/env python3
+
+"""
+Servidor HTTP local que imita VoiceRSS y ttsMP3 para probar generate-audio-web.py
+
+Latencia, tasa de errores y límite de peticiones por segundo configurables
+(por encima del límite responde 429, como los servicios reales). Registra
+cuántas peticiones hubo a la vez por backend para comprobar los límites del
+modo concurrente.
+
+Ejecutar: python3 tts_stub_server.py --port 8765 --latency 0.3
+          python3 generate-audio-web.py --workers 8 -o /tmp/audio \\
+              --voicerss-url http://127.0.0.1:8765/voicerss/ \\
+              --ttsmp3-url http://127.0.0.1:8765/makemp3_new.php
+
+Benchmark (secuencial vs concurrente, con el servidor en segundo plano):
+          python3 tts_stub_server.py --bench 40 --latency 0.3 --failure-rate 0.1
+"""
+
+import sys
+import json
+import time
+import random
+import argparse
+import tempfile
+import threading
+import importlib.util
+import urllib.parse
+from pathlib import Path
+from collections import defaultdict, deque
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+# Cabecera de un frame MP3 (MPEG-1 Layer III, 128 kbps, 44.1 kHz) + relleno
+FAKE_MP3_HEADER = b'\xff\xfb\x90\x64'
+FAKE_MP3_SIZE = 4096
+
+class StubState:
+    """Configuración y contadores compartidos por los hilos del servidor"""
+
+    def __init__(self, latency=0.2, failure_rate=0.0, max_rate=None, seed=None):
+        self.latency = latency
+        self.failure_rate = failure_rate
+        self.max_rate = max_rate
+        self.random = random.Random(seed)
+        self.lock = threading.Lock()
+        self.reset()
+
+    def reset(self):
+        with self.lock:
+            self.requests = defaultdict(int)
+            self.errors = defaultdict(int)
+            self.throttled = defaultdict(int)
+            self.in_flight = defaultdict(int)
+            self.max_in_flight = defaultdict(int)
+            self.recent = defaultdict(deque)
+
+    def enter(self, backend):
+        """Registra una petición; devuelve el código de error a simular o None"""
+        now = time.monotonic()
+        with self.lock:
+            self.requests[backend] += 1
+            self.in_flight[backend] += 1
+            self.max_in_flight[backend] = max(self.max_in_flight[backend], self.in_flight[backend])
+            recent = self.recent[backend]
+            while recent and now - recent[0] >= 1:
+                recent.popleft()
+            recent.append(now)
+            if self.max_rate and len(recent) > self.max_rate:
+                self.throttled[backend] += 1
+                return 429
+            if self.random.random() < self.failure_rate:
+                self.errors[backend] += 1
+                return 503
+        return None
+
+    def leave(self, backend):
+        with self.lock:
+            self.in_flight[backend] -= 1
+
+    def snapshot(self):
+        with self.lock:
+            return {name: {'requests': self.requests[name], 'errors': self.errors[name],
+                           'throttled': self.throttled[name],
+                           'max_in_flight': self.max_in_flight[name]}
+                    for name in sorted(self.requests)}
+
+def fake_mp3(text):
+    body = FAKE_MP3_HEADER + text.encode('utf-8')
+    return body + b'\x00' * max(0, FAKE_MP3_SIZE - len(body))
+
+class StubHandler(BaseHTTPRequestHandler):
+    state = None  # StubState, lo asigna make_server
+
+    def log_message(self, format, *args):
+        pass
+
+    def _send(self, status, body, content_type='audio/mpeg'):
+        self.send_response(status)
+        self.send_header('Content-Type', content_type)
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def _simulate(self, backend):
+        error = self.state.enter(backend)
+        try:
+            time.sleep(self.state.latency)
+        finally:
+            self.state.leave(backend)
+        if error:
+            self._send(error, b'stub error', 'text/plain')
+        return error is None
+
+    def do_GET(self):
+        url = urllib.parse.urlsplit(self.path)
+        query = urllib.parse.parse_qs(url.query)
+
+        if url.path == '/stats':
+            self._send(200, json.dumps(self.state.snapshot()).encode('utf-8'), 'application/json')
+        elif url.path.startswith('/audio/'):
+            # Descarga del MP3 de ttsMP3 (sin latencia: es estático)
+            text = urllib.parse.unquote(url.path[len('/audio/'):-len('.mp3')])
+            self._send(200, fake_mp3(text))
+        elif 'src' in query:
+            # VoiceRSS: GET con ?src=texto
+            if self._simulate('voicerss'):
+                self._send(200, fake_mp3(query['src'][0]))
+        else:
+            self._send(200, b'ERROR: The text is not specified!', 'text/plain')
+
+    def do_POST(self):
+        length = int(self.headers.get('Content-Length') or 0)
+        form = urllib.parse.parse_qs(self.rfile.read(length).decode('utf-8'))
+        if not self.path.endswith('makemp3_new.php'):
+            self._send(404, b'not found', 'text/plain')
+            return
+        if self._simulate('ttsmp3'):
+            host, port = self.server.server_address[:2]
+            text = urllib.parse.quote(form.get('msg', [''])[0], safe='')
+            body = json.dumps({'Error': 0, 'URL': f'http://{host}:{port}/audio/{text}.mp3'})
+            self._send(200, body.encode('utf-8'), 'application/json')
+
+def make_server(host='127.0.0.1', port=0, **options):
+    """ThreadingHTTPServer con su propio StubState (port=0: puerto libre)"""
+    handler = type('Handler', (StubHandler,), {'state': StubState(**options)})
+    server = ThreadingHTTPServer((host, port), handler)
+    server.daemon_threads = True
+    return server
+
+def load_web_generator():
+    path = Path(__file__).with_name('generate-audio-web.py')
+    spec = importlib.util.spec_from_file_location('generate_audio_web', path)
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+def _wait_for_losers():
+    """Espera a los candidatos perdedores de race() que siguen en segundo plano"""
+    for thread in threading.enumerate():
+        if thread.name.startswith('ThreadPoolExecutor') and thread is not threading.current_thread():
+            thread.join()
+
+def run_bench(server, count, workers, concurrency, rate, retries, hedge_delay):
+    """Mide clips/s secuencial vs concurrente contra el servidor local"""
+    import io
+    import contextlib
+    import audio_batch
+
+    web = load_web_generator()
+    host, port = server.server_address[:2]
+    web.VOICERSS_URL = f'http://{host}:{port}/voicerss/'
+    web.TTSMP3_URL = f'http://{host}:{port}/makemp3_new.php'
+    web.REQUEST_DELAY = 0
+    state = server.RequestHandlerClass.state
+
+    phrases = [audio_batch.make_phrase(f'Frase de prueba número {i}') for i in range(count)]
+    modes = [
+        ('secuencial', 1, web.generate_audio),
+        (f'concurrente ({workers} workers)', workers,
+         web.make_concurrent_synthesizer(concurrency, rate, retries, hedge_delay)),
+    ]
+
+    print(f'🧪 {count} clips · latencia {state.latency}s · errores {state.failure_rate:.0%}')
+    print(f'   Límites por backend: {concurrency} a la vez, {rate} peticiones/s\n')
+    for label, mode_workers, synthesize in modes:
+        state.reset()
+        with tempfile.TemporaryDirectory() as output_dir:
+            with contextlib.redirect_stdout(io.StringIO()):
+                stats = audio_batch.run_batch(phrases, synthesize, web.BACKENDS, web.TTS_PARAMS,
+                                              output_dir, delay=web.REQUEST_DELAY,
+                                              workers=mode_workers)
+                _wait_for_losers()
+        seconds = stats['seconds'] or 1e-9
+        print(f"⏱️  {label}: {stats['generated']}/{count} clips en {seconds:.2f}s "
+              f"({stats['generated'] / seconds:.1f} clips/s), {len(stats['failed'])} fallidos")
+        for name, counters in state.snapshot().items():
+            within = '✅' if mode_workers == 1 or counters['max_in_flight'] <= concurrency else '❌'
+            print(f"   {name}: {counters['requests']} peticiones, {counters['errors']} errores, "
+                  f"{counters['throttled']} 429, máx. simultáneas {counters['max_in_flight']} {within}")
+        print('')
+
+def main():
+    parser = argparse.ArgumentParser(description='Servidor local que imita VoiceRSS/ttsMP3')
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=8765, help='Puerto (default: 8765; 0 = libre)')
+    parser.add_argument('--latency', type=float, default=0.2, help='Segundos por petición (default: 0.2)')
+    parser.add_argument('--failure-rate', type=float, default=0.0,
+                        help='Fracción de peticiones que fallan con 503 (default: 0)')
+    parser.add_argument('--max-rate', type=float, help='Peticiones/s por backend antes de responder 429')
+    parser.add_argument('--seed', type=int, help='Semilla de los fallos simulados')
+    parser.add_argument('--bench', type=int, metavar='N',
+                        help='Generar N clips secuencial y concurrente, y salir')
+    parser.add_argument('--workers', type=int, default=8, help='Con --bench (default: 8)')
+    parser.add_argument('--backend-concurrency', type=int, default=4, help='Con --bench (default: 4)')
+    parser.add_argument('--rate', type=float, default=20.0, help='Con --bench: peticiones/s por backend (default: 20)')
+    parser.add_argument('--retries', type=int, default=3, help='Con --bench (default: 3)')
+    parser.add_argument('--hedge-delay', type=float, default=0, help='Con --bench (default: 0)')
+    args = parser.parse_args()
+
+    server = make_server(args.host, 0 if args.bench else args.port, latency=args.latency,
+                         failure_rate=args.failure_rate, max_rate=args.max_rate, seed=args.seed)
+    host, port = server.server_address[:2]
+
+    if args.bench:
+        threading.Thread(target=server.serve_forever, daemon=True).start()
+        try:
+            run_bench(server, args.bench, args.workers, args.backend_concurrency,
+                      args.rate, args.retries, args.hedge_delay)
+        finally:
+            server.shutdown()
+        return
+
+    print(f'🧪 Stub TTS en http://{host}:{port}')
+    print(f'   --voicerss-url http://{host}:{port}/voicerss/')
+    print(f'   --ttsmp3-url http://{host}:{port}/makemp3_new.php')
+    print(f'   Estadísticas: http://{host}:{port}/stats')
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        print('\n👋 Servidor detenido')
+        sys.exit(0)
+
+if __name__ == '__main__':
+    main()
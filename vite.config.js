@@ -91,6 +91,21 @@ export default defineConfig({
               }
             }
           },
+          {
+            // Chunks del diccionario: el nombre es el hash del contenido, nunca cambian
+            urlPattern: /\/dictionaries\/.+\/chunks\/[0-9a-f]+\.json$/,
+            handler: 'CacheFirst',
+            options: {
+              cacheName: 'dictionary-chunks-cache',
+              expiration: {
+                maxEntries: 1000,
+                maxAgeSeconds: 60 * 60 * 24 * 365 // 1 año
+              },
+              cacheableResponse: {
+                statuses: [0, 200]
+              }
+            }
+          },
           {
             // Firebase Storage - CacheFirst con revalidación
             urlPattern: /^https:\/\/firebasestorage\.googleapis\.com\/.*/i,